@@ -0,0 +1,188 @@
+"""Replays a file of stock updates through the alerts of a config file and prints throughput stats.
+
+The config file is a JSON object whose "alerts" list holds one object per alert:
+
+    {"alerts": [{"description": "GOOG above 500", "rule": {"symbol": "GOOG", "comparison": "gt", "threshold": 500},
+                 "action": "print", "mode": "edge", "cooldown": 0}]}
+
+A rule is either a threshold rule, with the symbol, comparison, threshold and upper arguments of ThresholdRule, or a
+composite {"and": [rules]}, {"or": [rules]} or {"not": rule}. An action is "print" or {"email": recipient}. The mode
+and cooldown of an alert are optional.
+
+Actions are handed to an ActionDispatcher, so a slow or failing email does not hold up or stop the replay; failed
+actions are retried, then logged and counted in the stats. Updates with a negative price are skipped and counted.
+
+The stock_alerter modules are imported once the arguments are parsed, and only those the replay needs, since the
+command is run by short batch jobs whose cold start would otherwise dominate.
+
+"""
+import argparse
+import json
+import sys
+import time
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m stock_alerter",
+                                     description="Replays stock updates through the alerts of a config file.")
+    parser.add_argument("filename", help="the file of stock updates, as read by FileReader or TickFileReader")
+    parser.add_argument("--config", help="the JSON file of the alerts; without one, updates are replayed only")
+    parser.add_argument("--format", choices=("csv", "ticks"),
+                        help="the format of the file; defaults to ticks for a .ticks file and to csv otherwise")
+    parser.add_argument("--offset", type=int, default=0, help="the number of updates to skip")
+    parser.add_argument("--batch-size", type=int, help="the number of updates applied per batch")
+    parser.add_argument("--bars", type=float, metavar="SECONDS",
+                        help="aggregate the updates into bars of this many seconds before the stocks see them")
+    args = parser.parse_args(argv)
+    if args.offset < 0:
+        parser.error("--offset should not be negative")
+    if args.batch_size is not None and args.batch_size < 1:
+        parser.error("--batch-size should be positive")
+    if args.bars is not None and args.bars <= 0:
+        parser.error("--bars should be positive")
+    try:
+        open(args.filename, "rb").close()
+    except OSError as error:
+        parser.error("cannot open {}: {!r}".format(args.filename, error))
+
+    from stock_alerter.exchange import Exchange
+    from stock_alerter.processor import Processor
+
+    exchange = Exchange()
+    try:
+        config = {}
+        if args.config:
+            with open(args.config) as fp:
+                config = json.load(fp)
+            if not isinstance(config, dict):
+                raise ValueError("the config should be a JSON object")
+        dispatcher = None
+        if config.get("alerts"):
+            from stock_alerter.dispatch import ActionDispatcher
+            dispatcher = ActionDispatcher()
+        load_alerts(config, exchange, dispatcher)
+    except (OSError, AttributeError, KeyError, TypeError, ValueError) as error:
+        parser.error("invalid config {}: {!r}".format(args.config, error))
+
+    reader = _CountingReader(_open_reader(args.filename, args.format, args.offset))
+    source = reader
+    if args.bars:
+        from datetime import timedelta
+
+        from stock_alerter.bars import BarResampler
+        source = BarResampler(reader, timedelta(seconds=args.bars))
+
+    if dispatcher is not None:
+        dispatcher.start()
+    try:
+        start = time.perf_counter()
+        Processor(source, exchange, args.batch_size).process()
+        elapsed = time.perf_counter() - start
+    except (OSError, ValueError) as error:
+        sys.exit("replay of {} stopped: {!r}".format(args.filename, error))
+    finally:
+        if dispatcher is not None:
+            dispatcher.close()
+
+    executed, failed = (dispatcher.executed, dispatcher.failed) if dispatcher is not None else (0, 0)
+    print("replayed {} updates of {} symbols in {:.3f}s ({:.0f} updates/s), {} skipped for a negative price, "
+          "{} alert actions executed, {} failed".format(reader.count, len(exchange), elapsed,
+                                                       reader.count / elapsed if elapsed else 0, reader.skipped,
+                                                       executed, failed), file=sys.stderr)
+
+
+def load_alerts(config, exchange, dispatcher=None):
+    """Creates the alerts of a config and connects them to an exchange.
+
+    Alerts on a single threshold rule in edge mode are added to a ThresholdEngine, which only checks the thresholds a
+    price crossed, and the others to an AlertEngine.
+
+    Args:
+        config (dict): The parsed config file.
+        exchange: The list of stocks.
+        dispatcher (Optional[ActionDispatcher]): The dispatcher the actions are handed to. Without one, actions are
+            executed as soon as their alert triggers.
+
+    Returns:
+        The list of alerts.
+
+    Raises:
+        KeyError: If a required key is missing.
+        ValueError: If a rule, an action or a mode is not valid.
+
+    """
+    from stock_alerter.alert import Alert, AlertEngine
+    from stock_alerter.threshold import ThresholdEngine
+
+    threshold_engine = ThresholdEngine(exchange)
+    alert_engine = AlertEngine(exchange)
+    alerts = []
+    for entry in config.get("alerts", ()):
+        rule = _load_rule(entry["rule"])
+        action = _load_action(entry.get("action", "print"))
+        if dispatcher is not None:
+            from stock_alerter.dispatch import DispatchedAction
+            action = DispatchedAction(action, dispatcher)
+        alert = Alert(entry["description"], rule, action, entry.get("mode", "level"), entry.get("cooldown", 0))
+        if alert.mode == "edge" and hasattr(rule, "boundaries"):
+            threshold_engine.add(alert)
+        else:
+            alert_engine.add(alert)
+        alerts.append(alert)
+    return alerts
+
+
+def _load_rule(spec):
+    from stock_alerter.rule import AndRule, NotRule, OrRule, ThresholdRule
+
+    if "and" in spec:
+        return AndRule(*[_load_rule(component) for component in spec["and"]])
+    if "or" in spec:
+        return OrRule(*[_load_rule(component) for component in spec["or"]])
+    if "not" in spec:
+        return NotRule(_load_rule(spec["not"]))
+    return ThresholdRule(spec["symbol"], spec["comparison"], spec["threshold"], spec.get("upper"))
+
+
+def _load_action(spec):
+    if spec == "print":
+        from stock_alerter.action import PrintAction
+        return PrintAction()
+    if isinstance(spec, dict) and "email" in spec:
+        from stock_alerter.action import EmailAction
+        return EmailAction(spec["email"])
+    raise ValueError("unknown action {!r}".format(spec))
+
+
+def _open_reader(filename, file_format, offset):
+    if file_format == "ticks" or file_format is None and filename.endswith(".ticks"):
+        from stock_alerter.tickfile import TickFileReader
+        return TickFileReader(filename, offset)
+    from stock_alerter.reader import FileReader
+    return FileReader(filename, offset)
+
+
+class _CountingReader:
+    def __init__(self, reader):
+        self.reader = reader
+        self.count = 0
+        self.skipped = 0
+
+    def get_updates(self):
+        """A generator returning the updates of the reader, skipping those with a negative price, which a stock rejects.
+
+        """
+        count = skipped = 0
+        try:
+            for count, update in enumerate(self.reader.get_updates(), 1):
+                if update[2] < 0:
+                    skipped += 1
+                    continue
+                yield update
+        finally:
+            self.count = count
+            self.skipped = skipped
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,16 @@
-import smtplib
-from email.mime.text import MIMEText
+# logging, smtplib, email and asyncio are imported where they are used, so that importing PrintAction stays cheap.
+import threading
+import time
+
+
+def create_message(from_email, to_email, subject, content):
+    from email.mime.text import MIMEText
+
+    message = MIMEText(content)
+    message["Subject"] = subject
+    message["From"] = from_email
+    message["To"] = to_email
+    return message
 
 
 class PrintAction:
@@ -15,12 +26,344 @@ class EmailAction:
         self.to_email = to
 
     def execute(self, content):
-        message = MIMEText(content)
-        message["Subject"] = "New Stock Alert"
-        message["From"] = "alerts@stocks.com"
-        message["To"] = self.to_email
+        import smtplib
+
+        message = create_message(self.from_email, self.to_email, "New Stock Alert", content)
         smtp = smtplib.SMTP("email.stocks.com")
         try:
             smtp.send_message(message)
         finally:
             smtp.quit()
+
+
+class SMTPConnectionPool:
+    def __init__(self, host="email.stocks.com", port=0, size=2, max_idle=60):
+        """Keeps SMTP connections open between messages instead of connecting for each one.
+
+        Up to size idle connections are kept. A connection idle for longer than max_idle seconds is assumed to have
+        been dropped by the server and is replaced, and a message that fails on a connection the server has closed is
+        retried once on a new connection. Safe to share between threads.
+
+        Args:
+            host (str): The SMTP server.
+            port (int): The SMTP port, 0 for the standard one.
+            size (int): The number of idle connections kept open.
+            max_idle (float): The number of seconds a connection may stay idle and still be reused.
+
+        """
+        self.host = host
+        self.port = port
+        self.size = size
+        self.max_idle = max_idle
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def send(self, message):
+        """Sends a message on a pooled connection.
+
+        Args:
+            message (email.message.Message): The message to send.
+
+        """
+        import smtplib
+
+        smtp = self._acquire()
+        try:
+            smtp.send_message(message)
+        except smtplib.SMTPServerDisconnected:
+            self._discard(smtp)
+            smtp = self._connect()
+            try:
+                smtp.send_message(message)
+            except Exception:
+                self._discard(smtp)
+                raise
+        except Exception:
+            self._discard(smtp)
+            raise
+        self._release(smtp)
+
+    def close(self):
+        """Closes every idle connection.
+
+        """
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for smtp, _ in idle:
+            self._discard(smtp)
+
+    def _connect(self):
+        import smtplib
+
+        return smtplib.SMTP(self.host, self.port)
+
+    def _acquire(self):
+        now = time.monotonic()
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                smtp, released_at = self._idle.pop()
+            if now - released_at <= self.max_idle:
+                return smtp
+            self._discard(smtp)
+        return self._connect()
+
+    def _release(self, smtp):
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append((smtp, time.monotonic()))
+                return
+        self._discard(smtp)
+
+    @staticmethod
+    def _discard(smtp):
+        import smtplib
+
+        try:
+            smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            smtp.close()
+
+
+class EmailDigest:
+    from_email = "alerts@stocks.com"
+
+    def __init__(self, pool=None, window=0):
+        """Delivers alert emails through an SMTPConnectionPool, coalescing alerts to the same recipient.
+
+        The first alert to a recipient opens a window of the given number of seconds. Alerts arriving within it are
+        collected, and when it closes they are sent together as one digest message. With a window of 0 every alert is
+        sent at once.
+
+        Args:
+            pool (Optional[SMTPConnectionPool]): The connections to send on. Defaults to a new pool.
+            window (float): The number of seconds alerts to a recipient are collected for.
+
+        """
+        self.pool = pool if pool is not None else SMTPConnectionPool()
+        self.window = window
+        self._digests = {}
+        self._timers = {}
+        self._lock = threading.Lock()
+
+    def send(self, to_email, content):
+        """Sends an alert to a recipient, or adds it to the recipient's open digest.
+
+        Args:
+            to_email (str): The recipient.
+            content (str): The alert.
+
+        """
+        if self.window <= 0:
+            self._deliver(to_email, [content])
+            return
+        with self._lock:
+            digest = self._digests.get(to_email)
+            if digest is None:
+                digest = self._digests[to_email] = []
+                timer = self._timers[to_email] = threading.Timer(self.window, self._expire, (to_email,))
+                timer.daemon = True
+                timer.start()
+            digest.append(content)
+
+    def flush(self, to_email=None):
+        """Sends the open digest of a recipient, or of every recipient if none is given, without waiting.
+
+        Args:
+            to_email (Optional[str]): The recipient.
+
+        """
+        with self._lock:
+            recipients = list(self._digests) if to_email is None else [to_email]
+            digests = [(recipient, self._digests.pop(recipient, None)) for recipient in recipients]
+            for recipient in recipients:
+                timer = self._timers.pop(recipient, None)
+                if timer is not None:
+                    timer.cancel()
+        for recipient, digest in digests:
+            if digest:
+                self._deliver(recipient, digest)
+
+    def close(self):
+        """Sends every open digest and closes the pooled connections.
+
+        """
+        self.flush()
+        self.pool.close()
+
+    def _deliver(self, to_email, contents):
+        if len(contents) == 1:
+            subject = "New Stock Alert"
+        else:
+            subject = "{} New Stock Alerts".format(len(contents))
+        self.pool.send(create_message(self.from_email, to_email, subject, "\n".join(contents)))
+
+    def _expire(self, to_email):
+        try:
+            self.flush(to_email)
+        except Exception:
+            _logger().exception("digest to %s failed", to_email)
+
+
+class PooledEmailAction:
+    def __init__(self, to, digest):
+        """An EmailAction sending through a shared EmailDigest instead of a connection of its own.
+
+        Args:
+            to (str): The recipient.
+            digest (EmailDigest): The digest delivering the alerts.
+
+        """
+        self.to_email = to
+        self.digest = digest
+
+    def execute(self, content):
+        self.digest.send(self.to_email, content)
+
+
+class AsyncActionExecutor:
+    def __init__(self, max_concurrency=10, max_pending=1000):
+        """Runs actions in the background of an asyncio event loop with bounded concurrency.
+
+        Actions with a coroutine execute method are awaited, others run on a pool of max_concurrency threads, so a slow
+        action such as an EmailAction never blocks the loop. Failures are logged and do not stop other actions. Use as
+        an asynchronous context manager, which waits for all submitted actions on exit.
+
+        Args:
+            max_concurrency (int): The number of actions executed at the same time.
+            max_pending (int): The number of submitted actions above which the executor counts as full.
+
+        """
+        self.max_concurrency = max_concurrency
+        self.max_pending = max_pending
+        self._queue = None
+        self._workers = []
+        self._threads = None
+        self._capacity = None
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    def start(self):
+        """Starts the worker tasks on the running event loop.
+
+        """
+        import asyncio
+        from concurrent.futures import ThreadPoolExecutor
+
+        self._queue = asyncio.Queue()
+        self._capacity = asyncio.Event()
+        self._capacity.set()
+        self._threads = ThreadPoolExecutor(self.max_concurrency)
+        self._workers = [asyncio.ensure_future(self._work()) for _ in range(self.max_concurrency)]
+
+    async def close(self):
+        """Waits for every submitted action to finish and stops the worker tasks.
+
+        Does nothing if the executor was never started, or is already closed.
+
+        """
+        import asyncio
+
+        if self._queue is None:
+            return
+        await self._queue.join()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._threads.shutdown()
+        self._queue = None
+        self._workers = []
+        self._threads = None
+
+    def submit(self, action, content):
+        """Queues an action for execution without waiting for it.
+
+        Args:
+            action (Action): The action to execute.
+            content (str): The content passed to the action.
+
+        """
+        self._queue.put_nowait((action, content))
+        if self.is_full():
+            self._capacity.clear()
+
+    def is_full(self):
+        return self._queue.qsize() >= self.max_pending
+
+    async def wait_for_capacity(self):
+        """Waits until fewer than max_pending actions are queued.
+
+        """
+        await self._capacity.wait()
+
+    async def _work(self):
+        import asyncio
+        import inspect
+
+        loop = asyncio.get_running_loop()
+        while True:
+            action, content = await self._queue.get()
+            if not self.is_full():
+                self._capacity.set()
+            try:
+                if inspect.iscoroutinefunction(action.execute):
+                    await action.execute(content)
+                else:
+                    await loop.run_in_executor(self._threads, action.execute, content)
+            except Exception:
+                _logger().exception("action %r failed for %r", action, content)
+            finally:
+                self._queue.task_done()
+
+
+class AsyncAction:
+    def __init__(self, action, executor):
+        """Wraps an action so that executing it hands it to an AsyncActionExecutor and returns at once.
+
+        Args:
+            action (Action): The wrapped action.
+            executor (AsyncActionExecutor): The executor running the action.
+
+        """
+        self.action = action
+        self.executor = executor
+
+    def execute(self, content):
+        self.executor.submit(self.action, content)
+
+
+class RateLimitedAction:
+    def __init__(self, action, limiter):
+        """Wraps an action so that executions beyond the rate allowed by a limiter are dropped.
+
+        Caps an action shared by many alerts, such as the EmailAction of one recipient, as a whole.
+
+        Args:
+            action (Action): The wrapped action.
+            limiter (TokenBucket): Caps the rate at which the action runs.
+
+        Attributes:
+            dropped (int): The number of executions dropped.
+
+        """
+        self.action = action
+        self.limiter = limiter
+        self.dropped = 0
+
+    def execute(self, content):
+        if self.limiter.consume():
+            self.action.execute(content)
+        else:
+            self.dropped += 1
+
+
+def _logger():
+    import logging
+
+    return logging.getLogger(__name__)
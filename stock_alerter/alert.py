@@ -1,25 +1,56 @@
+import time
+
+from stock_alerter import metrics
+from stock_alerter.symbols import put, symbol_id
+
+
 class Alert:
-    def __init__(self, description, rule, action):
+    MODES = ("level", "edge")
+
+    def __init__(self, description, rule, action, mode="level", cooldown=0, limiter=None, clock=time.monotonic):
         """Maps a Rule object to an Action, and triggers it when appropriate.
 
-        Triggers the action if the rule matches on any stock update.
+        In level mode the action is triggered on every stock update while the rule matches. In edge mode it is only
+        triggered by the update that makes the rule match after it did not. Either way, a trigger is dropped if the
+        action last ran less than cooldown seconds before, or if the limiter refuses it, so the state kept per alert is
+        the last result of the rule and the time the action last ran.
 
         Args:
             description (str): Brief description of the alert.
             rule (Rule): The rule the alert is checking.
             action (Action): The action taken if the rule is matched.
+            mode (str): "level" or "edge".
+            cooldown (float): The number of seconds after the action runs during which it is not run again.
+            limiter (Optional[TokenBucket]): Caps the rate at which the action runs. May be shared between alerts.
+            clock: A function returning the current time in seconds, used for the cooldown.
 
         Attributes:
             description (str): Brief description of the alert.
             rule (Rule): The rule the alert is checking.
             action (Action): The action taken if the rule is matched.
             exchange: The list of dependent stocks added when connect is executed.
+            mode (str): "level" or "edge".
+            cooldown (float): The number of seconds after the action runs during which it is not run again.
+            limiter (Optional[TokenBucket]): Caps the rate at which the action runs.
+            matched (bool): The last result of the rule.
+            last_executed (Optional[float]): The clock time at which the action last ran, kept only with a cooldown.
+
+        Raises:
+            ValueError: If the mode is unknown.
 
         """
+        if mode not in self.MODES:
+            raise ValueError("unknown mode {!r}".format(mode))
         self.description = description
         self.rule = rule
         self.action = action
         self.exchange = None
+        self.mode = mode
+        self.cooldown = cooldown
+        self.limiter = limiter
+        self.clock = clock
+        self.matched = False
+        self.last_executed = None
 
     def connect(self, exchange):
         """Connects all dependent stocks to their update_event event.
@@ -34,14 +65,206 @@ class Alert:
         self.exchange = exchange
         dependent_stocks = self.rule.depends_on()
         for stock in dependent_stocks:
-            exchange[stock].updated.connect(self.check_rule)
+            exchange[stock].update_event.connect(self.check_rule)
+
+    def symbol_groups(self):
+        """Returns the sets of symbols whose stocks the alert reads together, which is the one its rule depends on.
+
+        """
+        return [self.rule.depends_on()]
 
-    def check_rule(self):
+    def disconnect(self):
+        """Disconnects the alert from the update_event of its dependent stocks, so it is no longer checked.
+
+        """
+        for stock in self.rule.depends_on():
+            self.exchange[stock].update_event.disconnect(self.check_rule)
+
+    def check_rule(self, stock=None):
         """Checks if a stock's update causes a rule to be matched.
 
-        If the rule is matched, it calls the execute method on the Action
-        instance. If the rule doesn't match, then nothing happens.
+        If the rule is matched, it triggers the alert. If the rule doesn't match, then nothing happens.
+
+        Args:
+            stock (Optional[Stock]): The updated stock, as passed by its update_event.
+
+        """
+        collector = metrics.collector
+        if collector is None:
+            self.trigger(self.rule.matches(self.exchange))
+            return
+        start = time.perf_counter()
+        matched = self.rule.matches(self.exchange)
+        matched_at = time.perf_counter()
+        collector.observe("rule.matches", matched_at - start)
+        if self.trigger(matched):
+            collector.observe("action.execute", time.perf_counter() - matched_at)
+        elapsed = time.perf_counter() - start
+        collector.observe("alert.check_rule", elapsed)
+        collector.observe_alert(self.description, elapsed)
+
+    def trigger(self, matched):
+        """Records the latest result of the rule and executes the action if the mode, cooldown and limiter allow it.
+
+        Args:
+            matched (bool): The latest result of the rule.
+
+        Returns:
+            True if the action was executed, False if not.
+
+        """
+        was_matched = self.matched
+        self.matched = matched
+        if not matched or (was_matched and self.mode == "edge"):
+            return False
+        if self.cooldown:
+            now = self.clock()
+            if self.last_executed is not None and now - self.last_executed < self.cooldown:
+                return False
+        else:
+            now = None
+        if self.limiter is not None and not self.limiter.consume():
+            return False
+        self.last_executed = now
+        self.action.execute(self.description)
+        return True
+
+
+class AlertEngine:
+    def __init__(self, exchange):
+        """Evaluates many alerts, re-evaluating only the parts of their rules that depend on an updated stock.
+
+        The rule of each alert is split into leaves, such as PriceRules, and composites that have component rules,
+        such as AndRules. An index maps the ID of each symbol to the leaves depending on it, as reported by
+        depends_on, and the result of every leaf and composite is cached. When a stock is updated only the leaves
+        indexed under its symbol are matched again, and a composite is recombined from the cached results of its
+        components only when one of them changed. The result of the rule of each alert is then passed to Alert.trigger
+        on each update of a stock the alert depends on, so the mode, cooldown and limiter of the alert apply as they do
+        for Alert.check_rule.
+
+        Args:
+            exchange: The list of stocks.
+
+        Attributes:
+            exchange: The list of stocks.
+            alerts (list): The alerts added to the engine.
+
+        """
+        self.exchange = exchange
+        self.alerts = []
+        self._leaves_by_id = []
+        self._roots_by_id = []
+
+    def add(self, alert):
+        """Adds an alert, connecting the engine to the update_event of each stock the alert depends on.
+
+        Args:
+            alert (Alert): The alert being added.
+
+        """
+        root = self._add_node(alert.rule, None)
+        self.alerts.append(alert)
+        for symbol in alert.rule.depends_on():
+            roots = self._slot(self._roots_by_id, symbol)
+            if not roots:
+                self._slot(self._leaves_by_id, symbol)
+                self.exchange[symbol].update_event.connect(self.on_update)
+            roots.append((alert, root))
+
+    def symbol_groups(self):
+        """Returns the sets of symbols whose stocks the engine reads together, one per alert.
 
         """
-        if self.rule.matches(self.exchange):
-            self.action.execute(self.description)
+        return [alert.rule.depends_on() for alert in self.alerts]
+
+    def _add_node(self, rule, parent):
+        node = _RuleNode(rule, parent)
+        components = getattr(rule, "rules", None)
+        if components is None:
+            node.value = rule.matches(self.exchange)
+            for symbol in rule.depends_on():
+                self._slot(self._leaves_by_id, symbol).append(node)
+        else:
+            node.components = [self._add_node(component, node) for component in components]
+            node.value = rule.combine(component.value for component in node.components)
+        return node
+
+    @staticmethod
+    def _slot(lists, symbol):
+        """Returns the list of a symbol in a list of lists indexed by symbol ID, creating it if needed.
+
+        """
+        index = symbol_id(symbol)
+        if index < len(lists) and lists[index] is not None:
+            return lists[index]
+        put(lists, index, [])
+        return lists[index]
+
+    def on_update(self, stock):
+        """Re-evaluates the rules depending on an updated stock and executes the actions of the alerts that match.
+
+        Args:
+            stock (Stock): The updated stock.
+
+        """
+        collector = metrics.collector
+        if collector is None:
+            self._evaluate(stock)
+            return
+        start = time.perf_counter()
+        self._evaluate_measured(stock, collector)
+        collector.observe("engine.on_update", time.perf_counter() - start)
+
+    def _evaluate(self, stock):
+        exchange = self.exchange
+        for leaf in self._leaves_by_id[stock.symbol_id]:
+            value = leaf.rule.matches(exchange)
+            if value != leaf.value:
+                self._propagate(leaf, value)
+        for alert, root in self._roots_by_id[stock.symbol_id]:
+            alert.trigger(root.value)
+
+    def _evaluate_measured(self, stock, collector):
+        """Evaluates like _evaluate, reporting each leaf match, and each alert with its action, to the collector.
+
+        The leaves are shared by the alerts, so the time reported for an alert is the time to trigger it.
+
+        """
+        exchange = self.exchange
+        for leaf in self._leaves_by_id[stock.symbol_id]:
+            start = time.perf_counter()
+            value = leaf.rule.matches(exchange)
+            collector.observe("rule.matches", time.perf_counter() - start)
+            if value != leaf.value:
+                self._propagate(leaf, value)
+        for alert, root in self._roots_by_id[stock.symbol_id]:
+            start = time.perf_counter()
+            executed = alert.trigger(root.value)
+            elapsed = time.perf_counter() - start
+            if executed:
+                collector.observe("action.execute", elapsed)
+            collector.observe_alert(alert.description, elapsed)
+
+    @staticmethod
+    def _propagate(leaf, value):
+        """Records the new result of a leaf and recombines the composites above it until one keeps its result.
+
+        """
+        leaf.value = value
+        node = leaf.parent
+        while node is not None:
+            value = node.rule.combine(component.value for component in node.components)
+            if value == node.value:
+                break
+            node.value = value
+            node = node.parent
+
+
+class _RuleNode:
+    __slots__ = ("rule", "parent", "components", "value")
+
+    def __init__(self, rule, parent):
+        self.rule = rule
+        self.parent = parent
+        self.components = None
+        self.value = False
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""Aggregation of stock updates into OHLCV bars.
+
+A BarResampler sits between a reader and a Processor. It reads the ticks of the reader and emits one bar per symbol
+and interval, so stocks store and evaluate a bar close where they would otherwise handle every tick.
+
+"""
+import collections
+from datetime import datetime, time, timedelta
+
+ONE_DAY = timedelta(days=1)
+
+Bar = collections.namedtuple("Bar", ["symbol", "start", "open", "high", "low", "close", "volume"])
+
+# Positions in the list holding the state of an open bar.
+_START, _END, _OPEN, _HIGH, _LOW, _CLOSE, _VOLUME, _CLOSE_TIMESTAMP, _EMITTED, _SYMBOL = range(10)
+
+
+class BarResampler:
+    def __init__(self, reader, interval=timedelta(minutes=1)):
+        """A reader aggregating the updates of another reader into bars of a fixed interval, per symbol.
+
+        Bars are aligned on midnight and never straddle it, so the last bar of a day may be shorter than interval and
+        the close of a day's last bar is the day's closing price. The volume of a bar is its number of ticks, as feeds
+        do not carry traded volumes.
+
+        A bar is emitted once a tick at or after its end is read, whatever its symbol, or when the reader is exhausted,
+        so bars come out in the order of their end. A tick older than the bar open for its symbol, or belonging to a
+        bar already emitted, arrived too late to be aggregated and is only counted in late.
+
+        Args:
+            reader: The source of stock updates, in timestamp order or close to it.
+            interval (datetime.timedelta): The length of a bar.
+
+        Attributes:
+            reader: The source of stock updates.
+            interval (datetime.timedelta): The length of a bar.
+            late (int): The number of ticks dropped for arriving too late.
+
+        Raises:
+            ValueError: If interval is not positive.
+
+        """
+        if interval <= timedelta(0):
+            raise ValueError("interval should be positive")
+        self.reader = reader
+        self.interval = interval
+        self.late = 0
+
+    def get_updates(self):
+        """A generator returning a (symbol, start, close) update for each bar, so the resampler can feed a Processor.
+
+        """
+        for bar in self.get_bars():
+            yield bar.symbol, bar.start, bar.close
+
+    def get_bars(self):
+        """A generator returning each completed Bar.
+
+        """
+        bars = {}
+        opened = collections.deque()
+        for symbol, timestamp, price in self.reader.get_updates():
+            while opened and opened[0][_END] <= timestamp:
+                state = opened.popleft()
+                if not state[_EMITTED]:
+                    state[_EMITTED] = True
+                    yield _bar(state)
+            state = bars.get(symbol)
+            if state is not None:
+                if timestamp < state[_END]:
+                    if state[_EMITTED] or timestamp < state[_START]:
+                        self.late += 1
+                        continue
+                    if price > state[_HIGH]:
+                        state[_HIGH] = price
+                    elif price < state[_LOW]:
+                        state[_LOW] = price
+                    if timestamp >= state[_CLOSE_TIMESTAMP]:
+                        state[_CLOSE] = price
+                        state[_CLOSE_TIMESTAMP] = timestamp
+                    state[_VOLUME] += 1
+                    continue
+                if not state[_EMITTED]:
+                    state[_EMITTED] = True
+                    yield _bar(state)
+            start, end = self._bounds(timestamp)
+            state = bars[symbol] = [start, end, price, price, price, price, 1, timestamp, False, symbol]
+            opened.append(state)
+        for state in opened:
+            if not state[_EMITTED]:
+                state[_EMITTED] = True
+                yield _bar(state)
+
+    def _bounds(self, timestamp):
+        """Returns the start and end of the bar a timestamp belongs to.
+
+        """
+        midnight = datetime.combine(timestamp.date(), time())
+        start = midnight + (timestamp - midnight) // self.interval * self.interval
+        return start, min(start + self.interval, midnight + ONE_DAY)
+
+
+def _bar(state):
+    return Bar(state[_SYMBOL], state[_START], state[_OPEN], state[_HIGH], state[_LOW], state[_CLOSE], state[_VOLUME])
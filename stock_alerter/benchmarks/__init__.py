@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+"""Benchmarks of the ingestion, signal and alert hot paths.
+
+Run the suite with ``python -m stock_alerter.benchmarks``. Results are written as JSON so that runs can be compared
+over time.
+
+"""
@@ -0,0 +1,36 @@
+import argparse
+import json
+import sys
+
+from stock_alerter.benchmarks.suite import BENCHMARKS, compare, run
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m stock_alerter.benchmarks",
+                                     description="Benchmarks the stock_alerter hot paths and prints JSON results.")
+    parser.add_argument("--benchmark", action="append", choices=sorted(BENCHMARKS),
+                        help="a benchmark to run, may be repeated; defaults to all of them")
+    parser.add_argument("--scale", type=float, default=1.0, help="the factor applied to every problem size")
+    parser.add_argument("--output", help="the file to write the JSON results to instead of standard output")
+    parser.add_argument("--compare", metavar="BASELINE", help="a JSON results file to compare the run against")
+    args = parser.parse_args(argv)
+
+    results = run(args.benchmark, args.scale)
+    if args.output:
+        with open(args.output, "w") as fp:
+            json.dump(results, fp, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+    if args.compare:
+        with open(args.compare) as fp:
+            baseline = json.load(fp)
+        for entry, ratio in compare(baseline, results):
+            params = ", ".join("{}={}".format(name, value) for name, value in sorted(entry["params"].items()))
+            print("{} {} ({}): {:.2f}x baseline".format(entry["benchmark"], entry["metric"], params, ratio),
+                  file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""Synthetic stock update feeds for benchmarks.
+
+"""
+import random
+from datetime import datetime, timedelta
+
+START = datetime(2014, 1, 1, 9, 30)
+
+
+def symbols(num_symbols):
+    """Returns num_symbols distinct stock symbols.
+
+    """
+    return ["S{:05d}".format(i) for i in range(num_symbols)]
+
+
+def generate_updates(num_symbols, num_ticks, interval=timedelta(seconds=1), start=START, seed=0):
+    """A generator returning a feed of num_ticks updates over num_symbols symbols, in timestamp order.
+
+    Symbols tick in turn, every interval, and each price follows its own random walk that never drops below 1.
+
+    Args:
+        num_symbols (int): The number of symbols.
+        num_ticks (int): The number of updates.
+        interval (datetime.timedelta): The time between two updates.
+        start (datetime.datetime): The timestamp of the first update.
+        seed (int): The seed of the random walks.
+
+    """
+    rng = random.Random(seed)
+    names = symbols(num_symbols)
+    prices = [rng.randint(10, 1000) for _ in names]
+    timestamp = start
+    for tick in range(num_ticks):
+        index = tick % num_symbols
+        prices[index] = max(1, prices[index] + rng.randint(-3, 3))
+        yield names[index], timestamp, prices[index]
+        timestamp += interval
+
+
+def write_csv(filename, updates):
+    """Writes updates in the format read by FileReader.
+
+    Args:
+        filename (str): The name of the file to write.
+        updates: The (symbol, timestamp, price) updates.
+
+    """
+    with open(filename, "w") as fp:
+        for symbol, timestamp, price in updates:
+            fp.write("{},{},{}\n".format(symbol, timestamp.strftime("%Y-%m-%dT%H:%M:%S.%f"), price))
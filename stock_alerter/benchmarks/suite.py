@@ -0,0 +1,327 @@
+# -*- coding: utf-8 -*-
+"""The benchmarks of the suite.
+
+Each benchmark takes a scale, which multiplies its problem sizes, and returns a list of result dicts. A result names
+the benchmark and the metric measured, gives its value and unit, and lists the parameters it was measured with.
+
+"""
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from stock_alerter.alert import Alert
+from stock_alerter.bars import BarResampler
+from stock_alerter.benchmarks.feeds import generate_updates, symbols, write_csv
+from stock_alerter.event import Event
+from stock_alerter.exchange import Exchange
+from stock_alerter.indicators import (ExponentialMovingAverage, RollingMaximum, RollingMinimum,
+                                      SimpleMovingAverage)
+from stock_alerter.processor import Processor
+from stock_alerter.reader import FileReader, ListReader
+from stock_alerter.rule import PriceRule, ThresholdRule
+from stock_alerter.stock import Stock
+from stock_alerter.threshold import ThresholdEngine
+from stock_alerter.tickfile import TickFileReader, convert
+from stock_alerter.timeseries import ArrayTimeSeries, TimeSeries
+
+BENCHMARKS = {}
+
+
+def benchmark(function):
+    """Registers a benchmark function under its name.
+
+    """
+    BENCHMARKS[function.__name__] = function
+    return function
+
+
+def result(name, metric, value, unit, **params):
+    return {"benchmark": name, "metric": metric, "value": value, "unit": unit, "params": params}
+
+
+def best_time(function, repeat=3):
+    """Returns the shortest of repeat timings of function, in seconds.
+
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def scaled(size, scale):
+    return max(int(size * scale), 1)
+
+
+class NullAction:
+    def __init__(self):
+        self.executed = 0
+
+    def execute(self, content):
+        self.executed += 1
+
+
+@benchmark
+def file_reader(scale):
+    """Measures the parse throughput of FileReader and TickFileReader.
+
+    """
+    num_ticks = scaled(200000, scale)
+    directory = tempfile.mkdtemp()
+    csv_filename = os.path.join(directory, "updates.csv")
+    tick_filename = os.path.join(directory, "updates.ticks")
+    try:
+        write_csv(csv_filename, generate_updates(100, num_ticks))
+        convert(csv_filename, tick_filename)
+        results = []
+        for reader in (FileReader(csv_filename), TickFileReader(tick_filename)):
+            elapsed = best_time(lambda: sum(1 for _ in reader.get_updates()))
+            results.append(result("file_reader", "throughput", num_ticks / elapsed, "ticks/s",
+                                  reader=type(reader).__name__, ticks=num_ticks))
+        return results
+    finally:
+        for filename in (csv_filename, tick_filename):
+            if os.path.exists(filename):
+                os.remove(filename)
+        os.rmdir(directory)
+
+
+@benchmark
+def processor(scale):
+    """Measures Processor.process throughput as the number of symbols and of alerts grows.
+
+    """
+    num_ticks = scaled(100000, scale)
+    results = []
+    for num_symbols in (10, 100, 1000):
+        updates = list(generate_updates(num_symbols, num_ticks))
+        for num_alerts in (0, 100, 1000):
+            exchange = {symbol: Stock(symbol) for symbol in symbols(num_symbols)}
+            names = symbols(num_symbols)
+            action = NullAction()
+            for i in range(num_alerts):
+                threshold = 10 + i % 1000
+                rule = PriceRule(names[i % num_symbols], lambda stock, threshold=threshold: stock.price > threshold)
+                Alert("alert {}".format(i), rule, action).connect(exchange)
+            start = time.perf_counter()
+            Processor(ListReader(updates), exchange).process()
+            elapsed = time.perf_counter() - start
+            results.append(result("processor", "throughput", num_ticks / elapsed, "ticks/s",
+                                  symbols=num_symbols, alerts=num_alerts, ticks=num_ticks))
+    return results
+
+
+@benchmark
+def threshold_alerts(scale):
+    """Measures Processor.process throughput with many threshold alerts per symbol, connected one by one or indexed.
+
+    """
+    num_symbols = 10
+    num_ticks = scaled(20000, scale)
+    updates = list(generate_updates(num_symbols, num_ticks))
+    names = symbols(num_symbols)
+    results = []
+    for num_alerts in (1000, 10000):
+        for mode in ("alert", "engine"):
+            exchange = {symbol: Stock(symbol) for symbol in names}
+            engine = ThresholdEngine(exchange)
+            action = NullAction()
+            for i in range(num_alerts):
+                alert = Alert("alert {}".format(i), ThresholdRule(names[i % num_symbols], "gt", 10 + i % 1000), action)
+                if mode == "alert":
+                    alert.connect(exchange)
+                else:
+                    engine.add(alert)
+            start = time.perf_counter()
+            Processor(ListReader(updates), exchange).process()
+            elapsed = time.perf_counter() - start
+            results.append(result("threshold_alerts", "throughput", num_ticks / elapsed, "ticks/s",
+                                  mode=mode, alerts=num_alerts, ticks=num_ticks))
+    return results
+
+
+class BaselineEvent:
+    def __init__(self):
+        """The original Event, which kept its listeners in a list and called them in a plain loop, as a reference for
+        the cost of Event.fire.
+
+        """
+        self.listeners = []
+
+    def connect(self, listener, weak=False):
+        self.listeners.append(listener)
+
+    def fire(self, *args, **kwargs):
+        for listener in self.listeners:
+            listener(*args, **kwargs)
+
+
+@benchmark
+def event_fire(scale):
+    """Measures the latency of Event.fire as the number of listeners grows, for strong and weak listeners, against the
+    original Event.
+
+    """
+    results = []
+    fires = scaled(20000, scale)
+    for num_listeners in (1, 10, 100):
+        for event_class, weak in ((BaselineEvent, False), (Event, False), (Event, True)):
+            actions = [NullAction() for _ in range(num_listeners)]
+            event = event_class()
+            for action in actions:
+                event.connect(action.execute, weak=weak)
+
+            def fire_all():
+                for _ in range(fires):
+                    event.fire("content")
+
+            elapsed = best_time(fire_all)
+            results.append(result("event_fire", "latency", elapsed / fires * 1e9, "ns/fire",
+                                  listeners=num_listeners, weak=weak, event=event_class.__name__))
+    return results
+
+
+@benchmark
+def crossover_signal(scale):
+    """Measures the latency of Stock.get_crossover_signal as the price history grows.
+
+    """
+    results = []
+    calls = scaled(1000, scale)
+    for num_days in (30, 365, 1825):
+        stock = Stock("GOOG")
+        ticks_per_day = 8
+        interval = timedelta(hours=24 / ticks_per_day)
+        for _, timestamp, price in generate_updates(1, num_days * ticks_per_day, interval=interval):
+            stock.update(timestamp, price)
+        on_dates = [stock.history[-1].timestamp - timedelta(days=i) for i in range(min(calls, num_days - 12))]
+        elapsed = best_time(lambda: [stock.get_crossover_signal(on_date) for on_date in on_dates])
+        results.append(result("crossover_signal", "latency", elapsed / len(on_dates) * 1e6, "us/call",
+                              days=num_days, ticks=num_days * ticks_per_day))
+    return results
+
+
+@benchmark
+def indicators(scale):
+    """Measures Stock.update throughput as the number of indicators per stock grows.
+
+    """
+    results = []
+    num_ticks = scaled(50000, scale)
+    ticks_per_day = 8
+    updates = list(generate_updates(1, num_ticks, interval=timedelta(hours=24 / ticks_per_day)))
+    for num_indicators in (0, 4, 40):
+        stock = Stock("GOOG")
+        for i in range(num_indicators // 4):
+            span = 10 * (i + 1)
+            stock.indicators.add("sma{}".format(span), SimpleMovingAverage(span))
+            stock.indicators.add("ema{}".format(span), ExponentialMovingAverage(span))
+            stock.indicators.add("min{}".format(span), RollingMinimum(span))
+            stock.indicators.add("max{}".format(span), RollingMaximum(span))
+        start = time.perf_counter()
+        for _, timestamp, price in updates:
+            stock.update(timestamp, price)
+        elapsed = time.perf_counter() - start
+        results.append(result("indicators", "throughput", num_ticks / elapsed, "ticks/s",
+                              indicators=num_indicators, ticks_per_day=ticks_per_day))
+    return results
+
+
+@benchmark
+def bar_resampler(scale):
+    """Measures Processor.process throughput and the memory held per symbol, fed with ticks or with minute bars.
+
+    """
+    results = []
+    num_symbols = 10
+    num_ticks = scaled(100000, scale)
+    updates = list(generate_updates(num_symbols, num_ticks, interval=timedelta(milliseconds=100)))
+    for interval in (None, timedelta(minutes=1)):
+        bars = "ticks" if interval is None else "{}s".format(int(interval.total_seconds()))
+
+        def replay():
+            reader = ListReader(updates)
+            if interval is not None:
+                reader = BarResampler(reader, interval)
+            exchange = Exchange()
+            Processor(reader, exchange).process()
+            return exchange
+
+        elapsed = best_time(replay, repeat=1)
+        tracemalloc.start()
+        before, _ = tracemalloc.get_traced_memory()
+        exchange = replay()
+        after, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results.append(result("bar_resampler", "throughput", num_ticks / elapsed, "ticks/s",
+                              bars=bars, ticks=num_ticks))
+        results.append(result("bar_resampler", "memory", (after - before) / num_symbols, "bytes",
+                              bars=bars, ticks=num_ticks))
+    return results
+
+
+@benchmark
+def memory_per_symbol(scale):
+    """Measures the memory held per symbol by each TimeSeries backend.
+
+    """
+    results = []
+    num_symbols = scaled(100, scale)
+    ticks_per_symbol = scaled(2000, scale)
+    for series_class in (TimeSeries, ArrayTimeSeries):
+        updates = list(generate_updates(num_symbols, num_symbols * ticks_per_symbol))
+        tracemalloc.start()
+        before, _ = tracemalloc.get_traced_memory()
+        exchange = {symbol: Stock(symbol, series_class()) for symbol in symbols(num_symbols)}
+        for symbol, timestamp, price in updates:
+            exchange[symbol].update(timestamp, price)
+        after, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results.append(result("memory_per_symbol", "memory", (after - before) / num_symbols, "bytes",
+                              series=series_class.__name__, ticks_per_symbol=ticks_per_symbol))
+    return results
+
+
+def run(names=None, scale=1.0):
+    """Runs benchmarks and returns their results with a description of the environment they ran in.
+
+    Args:
+        names (Optional[list]): The names of the benchmarks to run. Defaults to all of them.
+        scale (float): The factor applied to the problem sizes of every benchmark.
+
+    Raises:
+        KeyError: If a name is not a registered benchmark.
+
+    """
+    results = []
+    for name in names or BENCHMARKS:
+        results.extend(BENCHMARKS[name](scale))
+    return {
+        "started": datetime.now().isoformat(),
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "scale": scale,
+        "results": results
+    }
+
+
+def compare(baseline, current):
+    """Pairs the results of two runs and gives the ratio of each current value to its baseline value.
+
+    Returns:
+        A list of (result, ratio) pairs for the current results that have a baseline result.
+
+    """
+    def key(entry):
+        return entry["benchmark"], entry["metric"], tuple(sorted(entry["params"].items()))
+
+    baseline_values = {key(entry): entry["value"] for entry in baseline["results"]}
+    return [(entry, entry["value"] / baseline_values[key(entry)])
+            for entry in current["results"] if baseline_values.get(key(entry))]
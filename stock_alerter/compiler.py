@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""Compilation of rule trees into single evaluation functions.
+
+A rule tree made of PriceRule and ThresholdRule leaves and AndRule, OrRule and NotRule composites is matched by
+walking its objects, looking each stock up and reading its price once per leaf. compile_rule turns the tree into the
+source of one function that looks every stock up and reads its price once, then evaluates the leaves in a single
+short-circuiting expression, in which the comparisons of ThresholdRules are written inline. The components of each
+composite are ordered so that the ones expected to settle its result most cheaply come first.
+
+"""
+from stock_alerter.rule import AndRule, NotRule, OrRule, PriceRule, ThresholdRule
+
+DEFAULT_SELECTIVITY = 0.5
+
+OPERATORS = {"gt": ">", "lt": "<", "ge": ">=", "le": "<="}
+
+# Relative cost of evaluating each kind of leaf: an inline comparison, a condition call and an opaque matches call.
+INLINE_COST = 1
+CONDITION_COST = 2
+MATCHES_COST = 3
+
+
+class CompiledRule:
+    def __init__(self, rule, selectivity=None):
+        """A rule whose matches method is a function compiled from a rule tree.
+
+        Can be used anywhere the original rule is, for example in an Alert.
+
+        Args:
+            rule: The rule tree being compiled.
+            selectivity (Optional[dict]): The estimated probability that a rule matches, by rule.
+
+        Attributes:
+            rule: The rule tree being compiled.
+            matches: The compiled function of an exchange, returning True if the rule matches and False if not.
+
+        """
+        self.rule = rule
+        self.matches = compile_rule(rule, selectivity)
+
+    def depends_on(self):
+        return self.rule.depends_on()
+
+
+def compile_rule(rule, selectivity=None):
+    """Compiles a rule tree into a single function of an exchange.
+
+    The components of an AndRule are ordered by their cost divided by their chance of not matching, and those of an
+    OrRule by their cost divided by their chance of matching, which minimizes the expected cost of short-circuiting.
+    Rules missing from selectivity are assumed to match half of the time, so components are then ordered by cost.
+
+    Args:
+        rule: The rule tree being compiled.
+        selectivity (Optional[dict]): The estimated probability that a rule matches, by rule.
+
+    Returns:
+        A function of an exchange returning True if the rule matches and False if not. Its source attribute holds the
+        generated source code.
+
+    """
+    compiler = _Compiler(selectivity or {})
+    expression, _, _ = compiler.compile(rule)
+    lines = ["def evaluate(exchange):"]
+    for symbol, index in compiler.symbols.items():
+        lines.extend([
+            "    try:",
+            "        stock_{} = exchange[{!r}]".format(index, symbol),
+            "    except KeyError:",
+            "        stock_{} = None".format(index),
+            "    price_{0} = stock_{0}.price if stock_{0} is not None else None".format(index)
+        ])
+    lines.append("    return True if {} else False".format(expression))
+    source = "\n".join(lines) + "\n"
+    namespace = dict(compiler.namespace)
+    exec(compile(source, "<compiled rule>", "exec"), namespace)
+    evaluate = namespace["evaluate"]
+    evaluate.source = source
+    return evaluate
+
+
+class _Compiler:
+    def __init__(self, selectivity):
+        self.selectivity = selectivity
+        self.symbols = {}
+        self.namespace = {}
+
+    def compile(self, rule):
+        """Returns the expression evaluating rule, its estimated cost and its estimated probability of matching.
+
+        """
+        if isinstance(rule, (AndRule, OrRule)):
+            expression, cost, probability = self._compile_composite(rule, isinstance(rule, AndRule))
+        elif isinstance(rule, NotRule):
+            expression, cost, probability = self.compile(rule.rules[0])
+            expression, probability = "(not {})".format(expression), 1 - probability
+        elif isinstance(rule, ThresholdRule):
+            index = self._symbol(rule.symbol)
+            threshold = self._name("threshold", rule.threshold)
+            if rule.comparison == "between":
+                upper = self._name("threshold", rule.upper)
+                expression = "(price_{0} and {1} <= price_{0} <= {2})".format(index, threshold, upper)
+            else:
+                expression = "(price_{0} and price_{0} {1} {2})".format(index, OPERATORS[rule.comparison], threshold)
+            cost, probability = INLINE_COST, DEFAULT_SELECTIVITY
+        elif isinstance(rule, PriceRule):
+            index = self._symbol(rule.symbol)
+            condition = self._name("condition", rule.condition)
+            expression = "(price_{0} and {1}(stock_{0}))".format(index, condition)
+            cost, probability = CONDITION_COST, DEFAULT_SELECTIVITY
+        else:
+            expression = "{}.matches(exchange)".format(self._name("rule", rule))
+            cost, probability = MATCHES_COST, DEFAULT_SELECTIVITY
+        return expression, cost, self.selectivity.get(rule, probability)
+
+    def _compile_composite(self, rule, conjunction):
+        components = [self.compile(component) for component in rule.rules]
+        if not components:
+            # An empty conjunction holds and an empty disjunction does not, as all() and any() of nothing do.
+            return ("True", 0, 1.0) if conjunction else ("False", 0, 0.0)
+        if conjunction:
+            components.sort(key=lambda component: component[1] / max(1 - component[2], 1e-9))
+        else:
+            components.sort(key=lambda component: component[1] / max(component[2], 1e-9))
+        operator = " and " if conjunction else " or "
+        expression = "({})".format(operator.join(component[0] for component in components))
+        cost = sum(component[1] for component in components)
+        probability = 1.0 if conjunction else 0.0
+        for _, _, component_probability in components:
+            if conjunction:
+                probability *= component_probability
+            else:
+                probability *= 1 - component_probability
+        if not conjunction:
+            probability = 1 - probability
+        return expression, cost, probability
+
+    def _symbol(self, symbol):
+        index = self.symbols.get(symbol)
+        if index is None:
+            index = self.symbols[symbol] = len(self.symbols)
+        return index
+
+    def _name(self, prefix, value):
+        name = "{}_{}".format(prefix, len(self.namespace))
+        self.namespace[name] = value
+        return name
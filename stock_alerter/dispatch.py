@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+"""Background execution of alert actions.
+
+An ActionDispatcher runs actions on a pool of worker threads, optionally backed by worker processes, so that a slow or
+failing action never blocks or breaks the ingestion of updates. Actions are handed over through a bounded queue, failed
+executions are retried with exponential backoff, and an optional journal lets actions still queued when the process
+died be executed on the next start.
+
+The journal is a file of JSON lines. A submitted line records the id, the pickled action and the content of an action
+when it is queued, and a done line records its id once it has been executed or has run out of retries.
+
+logging and concurrent.futures are imported where they are used, as in the action module, so that the dispatcher
+stays cheap to import.
+
+"""
+import base64
+import json
+import os
+import pickle
+import queue
+import threading
+import time
+
+
+class ActionDispatcher:
+    def __init__(self, workers=4, max_pending=1000, retries=3, backoff=0.1, journal=None, processes=False):
+        """Executes actions in the background with bounded queueing, retries and an optional journal.
+
+        Submitting an action returns as soon as it is queued, and blocks only while max_pending actions are waiting,
+        so a backlog of actions slows ingestion down instead of growing without bound. An action raising an exception
+        is retried up to retries times, waiting backoff * 2 ** attempt seconds before each retry, and is then logged
+        and dropped. Use as a context manager, which waits for all submitted actions on exit.
+
+        Args:
+            workers (int): The number of actions executed at the same time.
+            max_pending (int): The number of queued actions above which submitting blocks.
+            retries (int): The number of times a failed action is retried.
+            backoff (float): The number of seconds waited before the first retry, doubled for each further one.
+            journal (Optional[str]): The name of the journal file. Actions must then be picklable.
+            processes (bool): Whether to execute actions in worker processes instead of the worker threads. Actions
+                must then be picklable.
+
+        Attributes:
+            executed (int): The number of actions executed successfully.
+            failed (int): The number of actions dropped after running out of retries.
+
+        """
+        self.workers = workers
+        self.max_pending = max_pending
+        self.retries = retries
+        self.backoff = backoff
+        self.journal = journal
+        self.processes = processes
+        self.executed = 0
+        self.failed = 0
+        self._queue = None
+        self._threads = []
+        self._pool = None
+        self._journal_file = None
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def start(self):
+        """Starts the workers, then queues the actions the journal holds that were never executed.
+
+        """
+        self._queue = queue.Queue(self.max_pending)
+        if self.processes:
+            import concurrent.futures
+
+            self._pool = concurrent.futures.ProcessPoolExecutor(self.workers)
+        self._threads = [threading.Thread(target=self._work, daemon=True) for _ in range(self.workers)]
+        for thread in self._threads:
+            thread.start()
+        if self.journal is not None:
+            pending = self._recover()
+            self._journal_file = open(self.journal, "a")
+            for action_id, action, content in pending:
+                self._queue.put((action_id, action, content))
+
+    def close(self):
+        """Waits for every submitted action to finish and stops the workers.
+
+        The journal is emptied, since every action in it has been executed or dropped.
+
+        """
+        self._queue.join()
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        if self._journal_file is not None:
+            self._journal_file.close()
+            self._journal_file = None
+            open(self.journal, "w").close()
+
+    def submit(self, action, content):
+        """Queues an action for execution, waiting while max_pending actions are already queued.
+
+        Args:
+            action (Action): The action to execute.
+            content (str): The content passed to the action.
+
+        """
+        with self._lock:
+            action_id = self._next_id
+            self._next_id += 1
+            if self._journal_file is not None:
+                self._write_journal({"id": action_id, "action": _encode(action), "content": content})
+        self._queue.put((action_id, action, content))
+
+    def _work(self):
+        for action_id, action, content in iter(self._queue.get, None):
+            try:
+                self._execute(action, content)
+            finally:
+                if self._journal_file is not None:
+                    with self._lock:
+                        self._write_journal({"id": action_id, "done": True})
+                self._queue.task_done()
+        self._queue.task_done()
+
+    def _execute(self, action, content):
+        for attempt in range(self.retries + 1):
+            try:
+                if self._pool is not None:
+                    self._pool.submit(action.execute, content).result()
+                else:
+                    action.execute(content)
+            except Exception:
+                if attempt == self.retries:
+                    _logger().exception("action %r failed for %r after %d attempts", action, content, attempt + 1)
+                    with self._lock:
+                        self.failed += 1
+                    return
+                time.sleep(self.backoff * 2 ** attempt)
+            else:
+                with self._lock:
+                    self.executed += 1
+                return
+
+    def _write_journal(self, entry):
+        self._journal_file.write(json.dumps(entry) + "\n")
+        self._journal_file.flush()
+
+    def _recover(self):
+        """Reads the actions of the journal that were never executed and rewrites the journal with only them.
+
+        A last line cut short by a crash is ignored.
+
+        Returns:
+            A list of (id, action, content) tuples, in submission order.
+
+        """
+        pending = {}
+        if os.path.exists(self.journal):
+            with open(self.journal) as fp:
+                for line in fp:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    if entry.get("done"):
+                        pending.pop(entry["id"], None)
+                    else:
+                        pending[entry["id"]] = entry
+        with open(self.journal, "w") as fp:
+            for entry in pending.values():
+                fp.write(json.dumps(entry) + "\n")
+        self._next_id = max(pending, default=-1) + 1
+        return [(action_id, _decode(entry["action"]), entry["content"]) for action_id, entry in pending.items()]
+
+
+class DispatchedAction:
+    def __init__(self, action, dispatcher):
+        """Wraps an action so that executing it hands it to an ActionDispatcher and returns at once.
+
+        Args:
+            action (Action): The wrapped action.
+            dispatcher (ActionDispatcher): The dispatcher running the action.
+
+        """
+        self.action = action
+        self.dispatcher = dispatcher
+
+    def execute(self, content):
+        self.dispatcher.submit(self.action, content)
+
+
+def _logger():
+    import logging
+
+    return logging.getLogger(__name__)
+
+
+def _encode(action):
+    return base64.b64encode(pickle.dumps(action)).decode("ascii")
+
+
+def _decode(encoded):
+    return pickle.loads(base64.b64decode(encoded))
@@ -1,23 +1,81 @@
+import functools
+import itertools
+import time
+import types
+import weakref
+
+from stock_alerter import metrics
+
+
 class Event:
-    def __init__(self):
+    def __init__(self, error_handler=None):
         """A generic class that provides signal/slot functionality.
 
+        Listeners are notified by decreasing priority, and in the order they connected within a priority. Connecting a
+        listener again only updates its priority. A listener raising an exception does not stop the others from being
+        notified. The exception is passed to error_handler if there is one, and otherwise the first one raised is
+        re-raised once every listener has been notified.
+
+        The listeners are kept in a tuple rebuilt whenever they change, so firing never copies or sorts them, and
+        listeners may connect and disconnect while the event fires. Firing does not check for a metrics collector;
+        instrument swaps in a measured fire while metrics are enabled instead.
+
+        Args:
+            error_handler: A function called with the listener and the exception when a listener raises.
+
         Attributes:
-            listeners: A list of functions registered for the event.
+            error_handler: A function called with the listener and the exception when a listener raises.
+
+        """
+        self.error_handler = error_handler
+        self._entries = {}
+        self._snapshot = ()
+        self._order = itertools.count()
+
+    @property
+    def listeners(self):
+        """The live listeners, in the order they are notified.
 
         """
-        self.listeners = []
+        listeners = []
+        for _, _, listener, reference in sorted(self._entries.values(), key=lambda entry: entry[:2]):
+            if reference is not None:
+                listener = reference()
+                if listener is None:
+                    continue
+            listeners.append(listener)
+        return listeners
 
-    def connect(self, listener):
+    def connect(self, listener, priority=0, weak=False):
         """Registers a listener function.
 
         Listener functions are registered for classes that want to get notified of the event when it is fired.
 
         Args:
             listener: The function of the class being registered.
+            priority (int): Listeners with a higher priority are notified first.
+            weak (bool): Whether to hold the listener by a weak reference, so that the event does not keep it alive.
+                It is disconnected once it has been garbage collected.
 
         """
-        self.listeners.append(listener)
+        key = _key(listener)
+        entry = self._entries.get(key)
+        order = entry[1] if entry is not None else next(self._order)
+        reference = None
+        if weak:
+            listener, reference = _weak_listener(listener, functools.partial(_discard, weakref.ref(self), key))
+        self._entries[key] = (-priority, order, listener, reference)
+        self._rebuild()
+
+    def disconnect(self, listener):
+        """Unregisters a listener function. Does nothing if it is not registered.
+
+        Args:
+            listener: The function of the class being unregistered.
+
+        """
+        if self._entries.pop(_key(listener), None) is not None:
+            self._rebuild()
 
     def fire(self, *args, **kwargs):
         """Fire the event notifying all registered functions.
@@ -28,6 +86,119 @@ class Event:
             *args: Arguments to be used as parameters in the listener functions.
             **kwargs: Keyword arguments to be used as parameters in the listener functions.
 
+        Raises:
+            Exception: The first exception raised by a listener, if there is no error_handler.
+
+        """
+        snapshot = self._snapshot
+        try:
+            for listener in snapshot:
+                listener(*args, **kwargs)
+        except Exception as exception:
+            error = self._notify_rest(snapshot, listener, exception, args, kwargs)
+            if error is not None:
+                raise error
+
+    _unmeasured_fire = fire
+
+    def _measured_fire(self, *args, **kwargs):
+        """Fires the event and reports the time it took to the metrics collector.
+
+        """
+        start = time.perf_counter()
+        try:
+            self._unmeasured_fire(*args, **kwargs)
+        finally:
+            collector = metrics.collector
+            if collector is not None:
+                collector.observe("event.fire", time.perf_counter() - start)
+
+    def _notify_rest(self, snapshot, listener, exception, args, kwargs):
+        """Handles the exception a listener raised and notifies the listeners after it, handling their exceptions too.
+
+        Kept out of fire so that firing without exceptions costs one try block rather than one per listener.
+
+        Returns:
+            The first exception raised if there is no error_handler, None otherwise.
+
         """
-        for listener in self.listeners:
-            listener(*args, **kwargs)
+        listeners = iter(snapshot[snapshot.index(listener) + 1:])
+        error = None
+        while True:
+            if self.error_handler is not None:
+                self.error_handler(listener, exception)
+            elif error is None:
+                error = exception
+            try:
+                for listener in listeners:
+                    listener(*args, **kwargs)
+                return error
+            except Exception as raised:
+                exception = raised
+
+    def _rebuild(self):
+        entries = sorted(self._entries.values(), key=lambda entry: entry[:2])
+        self._snapshot = tuple(listener for _, _, listener, _ in entries)
+
+
+def instrument(enabled):
+    """Makes Event.fire report its latency to the metrics collector, or stop reporting it.
+
+    Called by metrics.enable and metrics.disable.
+
+    Args:
+        enabled (bool): Whether fire is measured.
+
+    """
+    Event.fire = Event._measured_fire if enabled else Event._unmeasured_fire
+
+
+def _key(listener):
+    """Returns a key identifying a listener without referencing it, equal for every bound method of one function and
+    instance.
+
+    """
+    function = getattr(listener, "__func__", None)
+    if function is not None:
+        return id(listener.__self__), id(function)
+    return id(listener)
+
+
+def _discard(event_reference, key, _):
+    event = event_reference()
+    if event is not None:
+        event._entries.pop(key, None)
+        event._rebuild()
+
+
+def _weak_listener(listener, on_collected):
+    """Returns a function calling listener through a weak reference, and a function returning listener or None once
+    it has been garbage collected.
+
+    A bound method is referenced through its instance, as the method object itself is created anew on each access, and
+    its function is called directly rather than through a new bound method.
+
+    """
+    function = getattr(listener, "__func__", None)
+    if function is None:
+        reference = weakref.ref(listener, on_collected)
+
+        def call(*args, **kwargs):
+            target = reference()
+            if target is not None:
+                target(*args, **kwargs)
+
+        return call, reference
+
+    instance_reference = weakref.ref(listener.__self__, on_collected)
+
+    def call_method(*args, **kwargs):
+        instance = instance_reference()
+        if instance is not None:
+            function(instance, *args, **kwargs)
+
+    def resolve():
+        instance = instance_reference()
+        return types.MethodType(function, instance) if instance is not None else None
+
+    return call_method, resolve
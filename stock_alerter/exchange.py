@@ -0,0 +1,85 @@
+import sys
+
+from stock_alerter.stock import Stock
+from stock_alerter.symbols import put, symbol_id
+
+
+class Exchange(dict):
+    def __init__(self, stocks=(), series_factory=None):
+        """A dict of stocks by symbol that creates the stock of an unknown symbol when it is first looked up.
+
+        The exchange does not have to be populated before a feed is replayed, as each stock is created on its first
+        update. Symbols are interned, so the symbol strings of readers, rules and alerts can share one object whose hash
+        is computed once, and each stock can also be looked up by the interned ID of its symbol.
+
+        Args:
+            stocks: The stocks the exchange starts with.
+            series_factory: A function returning the series of each stock created by the exchange. Defaults to the
+                default series of Stock.
+
+        Attributes:
+            series_factory: A function returning the series of each stock created by the exchange.
+            stocks (list): The stock of each symbol ID, None for the symbols the exchange has no stock of.
+
+        """
+        super().__init__()
+        self.series_factory = series_factory
+        self.stocks = []
+        for stock in stocks:
+            self._add(stock)
+
+    def __missing__(self, symbol):
+        return self._add(self._create(symbol))
+
+    def __setitem__(self, symbol, stock):
+        symbol = sys.intern(symbol)
+        super().__setitem__(symbol, stock)
+        put(self.stocks, symbol_id(symbol), stock)
+
+    def __delitem__(self, symbol):
+        super().__delitem__(symbol)
+        self.stocks[symbol_id(symbol)] = None
+
+    def register(self, symbols):
+        """Creates the stocks of several symbols at once, skipping those already in the exchange.
+
+        Args:
+            symbols: The symbols of the stocks.
+
+        Returns:
+            The number of stocks created.
+
+        """
+        created = 0
+        for symbol in symbols:
+            if symbol not in self:
+                self._add(self._create(symbol))
+                created += 1
+        return created
+
+    def symbol_id(self, symbol):
+        """Returns the ID of a symbol, creating its stock if needed.
+
+        """
+        self[symbol]
+        return symbol_id(symbol)
+
+    def stock_by_id(self, stock_id):
+        """Returns the stock of a symbol ID.
+
+        Raises:
+            IndexError: If the exchange has no stock of the symbol.
+
+        """
+        stock = self.stocks[stock_id] if stock_id < len(self.stocks) else None
+        if stock is None:
+            raise IndexError("no stock has the symbol id {}".format(stock_id))
+        return stock
+
+    def _create(self, symbol):
+        history = self.series_factory() if self.series_factory is not None else None
+        return Stock(sys.intern(symbol), history)
+
+    def _add(self, stock):
+        self[stock.symbol] = stock
+        return stock
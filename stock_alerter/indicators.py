@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+"""Indicators computed together from the daily closing prices of a series.
+
+An IndicatorEngine keeps one buffer of the closing prices of the latest days and a set of named indicators reading from
+it. The close of a day is final once an update for a later day arrives; it is then committed to the buffer and every
+indicator folds it into its state in a single pass. Until then the close of the current day is provisional, and each
+indicator combines it with its committed state in O(1) when its value is read.
+
+"""
+import collections
+from datetime import timedelta
+
+from stock_alerter.moving_average import RollingSum
+
+ONE_DAY = timedelta(days=1)
+
+
+class IndicatorEngine:
+    def __init__(self, series):
+        """Indicators of the daily closing prices of a series, updated together as the series is updated.
+
+        Days without updates carry the previous closing price forward, as get_closing_price does.
+
+        Args:
+            series: The series of numbers the closing prices are taken from.
+
+        Attributes:
+            series: The series of numbers the closing prices are taken from.
+            indicators (dict): The indicators, by name.
+            closes (collections.deque): The committed closing prices of the latest days, as many as the longest span.
+            last_date (datetime.date): The date of the provisional closing price.
+            close: The provisional closing price of last_date.
+
+        """
+        self.series = series
+        self.indicators = {}
+        self.closes = collections.deque(maxlen=1)
+        self.last_date = None
+        self.close = None
+
+    def add(self, name, indicator):
+        """Registers an indicator, computing its state from the closing prices of the series so far.
+
+        Args:
+            name (str): The name the indicator's value is read by.
+            indicator: The indicator, such as a SimpleMovingAverage.
+
+        """
+        self.indicators[name] = indicator
+        self.rebuild()
+
+    def rebuild(self):
+        """Recomputes the buffer and the state of every indicator from the closing prices of the series.
+
+        """
+        span = max((indicator.span for indicator in self.indicators.values()), default=1)
+        self.closes = collections.deque(maxlen=span)
+        self.last_date = None
+        self.close = None
+        for indicator in self.indicators.values():
+            indicator.reset()
+        for on_date, closing_price in self.series.closing_prices():
+            self._add_close(on_date, closing_price)
+
+    def update(self, timestamp):
+        """Folds the closing price of timestamp's date into the indicators.
+
+        Meant to be called after each update of the series. An update dated before the provisional closing price
+        rebuilds the indicators from the series.
+
+        Args:
+            timestamp (datetime.datetime): The timestamp of the update made to the series.
+
+        """
+        if not self.indicators:
+            return
+        on_date = timestamp.date()
+        if self.last_date is not None and on_date < self.last_date:
+            self.rebuild()
+        else:
+            self._add_close(on_date, self.series.get_closing_price(timestamp))
+
+    def _add_close(self, on_date, closing_price):
+        if self.last_date is not None and on_date != self.last_date:
+            indicators = self.indicators.values()
+            closes = self.closes
+            close = self.close
+            for _ in range((on_date - self.last_date).days):
+                for indicator in indicators:
+                    indicator.commit(close, closes)
+                closes.append(close)
+        self.last_date = on_date
+        self.close = closing_price
+
+    def value(self, name):
+        """Returns the value of an indicator including the provisional closing price.
+
+        Returns:
+            The value, or None if there are not enough closing prices yet.
+
+        Raises:
+            KeyError: If no indicator has the name.
+
+        """
+        if self.close is None:
+            return None
+        return self.indicators[name].provisional(self.close, self.closes)
+
+    def committed_value(self, name):
+        """Returns the value of an indicator as of the last committed closing price.
+
+        Returns:
+            The value, or None if there are not enough closing prices yet.
+
+        Raises:
+            KeyError: If no indicator has the name.
+
+        """
+        return self.indicators[name].committed(self.closes)
+
+    def values(self):
+        """Returns the value of every indicator including the provisional closing price, by name.
+
+        """
+        return {name: self.value(name) for name in self.indicators}
+
+
+class SimpleMovingAverage:
+    def __init__(self, span):
+        """The average of the closing prices of the last span days, from a RollingSum over the engine's closes.
+
+        Args:
+            span (int): The number of days averaged.
+
+        """
+        self.span = span
+        self.reset()
+
+    def reset(self):
+        self.rolling_sum = RollingSum(self.span)
+
+    def commit(self, close, closes):
+        self.rolling_sum.push(close, closes)
+
+    def committed(self, closes):
+        return self.rolling_sum.total / self.span if len(closes) >= self.span else None
+
+    def provisional(self, close, closes):
+        span = self.span
+        if len(closes) >= span:
+            return (self.rolling_sum.total - closes[-span] + close) / span
+        if len(closes) == span - 1:
+            return (self.rolling_sum.total + close) / span
+        return None
+
+
+class ExponentialMovingAverage:
+    def __init__(self, span):
+        """The exponential moving average of the closing prices with a smoothing factor of 2 / (span + 1).
+
+        The average starts from the first closing price.
+
+        Args:
+            span (int): The number of days the smoothing factor corresponds to.
+
+        """
+        self.span = span
+        self.alpha = 2 / (span + 1)
+        self.reset()
+
+    def reset(self):
+        self.average = None
+
+    def commit(self, close, closes):
+        self.average = close if self.average is None else self.average + self.alpha * (close - self.average)
+
+    def committed(self, closes):
+        return self.average
+
+    def provisional(self, close, closes):
+        return close if self.average is None else self.average + self.alpha * (close - self.average)
+
+
+class RollingMinimum:
+    def __init__(self, span):
+        """The lowest closing price of the last span days.
+
+        The committed closing prices of the window that may still become the minimum are kept with their day number in
+        a deque of increasing prices, so each closing price is added and dropped once.
+
+        Args:
+            span (int): The number of days the minimum is taken over.
+
+        """
+        self.span = span
+        self.reset()
+
+    def reset(self):
+        self.candidates = collections.deque()
+        self._committed = 0
+
+    @staticmethod
+    def _better(price, other):
+        return price <= other
+
+    def commit(self, close, closes):
+        candidates = self.candidates
+        while candidates and self._better(close, candidates[-1][1]):
+            candidates.pop()
+        candidates.append((self._committed, close))
+        self._committed += 1
+        if candidates[0][0] <= self._committed - 1 - self.span:
+            candidates.popleft()
+
+    def committed(self, closes):
+        return self.candidates[0][1] if self._committed >= self.span else None
+
+    def provisional(self, close, closes):
+        if self._committed < self.span - 1:
+            return None
+        candidates = self.candidates
+        # The provisional window drops the oldest committed day, which only the first candidate can be.
+        start = 1 if candidates and candidates[0][0] <= self._committed - self.span else 0
+        if start < len(candidates) and not self._better(close, candidates[start][1]):
+            return candidates[start][1]
+        return close
+
+
+class RollingMaximum(RollingMinimum):
+    def __init__(self, span):
+        """The highest closing price of the last span days.
+
+        Args:
+            span (int): The number of days the maximum is taken over.
+
+        """
+        super().__init__(span)
+
+    @staticmethod
+    def _better(price, other):
+        return price >= other
@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+"""Optional instrumentation of the processing hot paths.
+
+Instrumentation is off by default, and the instrumented code then only checks that no collector is set, except for
+Event.fire, which is swapped for a measured version while a collector is set. enable() installs a Metrics collector,
+which the processor, events and alerts then report to:
+
+    processor.update      time to apply one update to its stock, with per-symbol update counts
+    processor.update_many time to apply one run of updates in batching mode
+    event.fire            time to notify every listener of an event
+    rule.matches          time to match the rule of an alert, or a rule shared by the alerts of an engine
+    action.execute        time to execute the action of an alert
+    alert.check_rule      time to check an alert, with counts and time per alert
+    engine.on_update      time for an AlertEngine to evaluate the alerts of an updated stock
+    threshold.on_update   time for a ThresholdEngine to find the alerts of an updated stock that started matching
+
+Timings are inclusive, so event.fire includes the alerts it triggers. Alerts evaluated by an AlertEngine or a
+ThresholdEngine are counted per alert as well, with the time to trigger them, since their rules are matched together.
+
+"""
+import json
+import sys
+import threading
+import time
+
+collector = None
+
+
+def enable(metrics=None):
+    """Starts reporting to a collector.
+
+    Args:
+        metrics (Optional[Metrics]): The collector. Defaults to a new Metrics.
+
+    Returns:
+        The collector reported to.
+
+    """
+    from stock_alerter import event
+
+    global collector
+    collector = metrics if metrics is not None else Metrics()
+    event.instrument(True)
+    return collector
+
+
+def disable():
+    """Stops reporting to the collector.
+
+    """
+    from stock_alerter import event
+
+    global collector
+    collector = None
+    event.instrument(False)
+
+
+class Histogram:
+    def __init__(self):
+        """A latency histogram with a bucket per power of two microseconds.
+
+        Attributes:
+            count (int): The number of observations.
+            total (float): The sum of the observations, in seconds.
+            minimum (float): The smallest observation, in seconds.
+            maximum (float): The largest observation, in seconds.
+            buckets (list): The number of observations below 2 ** i microseconds and at or above half that, by i.
+
+        """
+        self.count = 0
+        self.total = 0.0
+        self.minimum = None
+        self.maximum = None
+        self.buckets = []
+
+    def observe(self, seconds):
+        self.count += 1
+        self.total += seconds
+        if self.minimum is None or seconds < self.minimum:
+            self.minimum = seconds
+        if self.maximum is None or seconds > self.maximum:
+            self.maximum = seconds
+        bucket = int(seconds * 1e6).bit_length()
+        if bucket >= len(self.buckets):
+            self.buckets.extend([0] * (bucket + 1 - len(self.buckets)))
+        self.buckets[bucket] += 1
+
+    def percentile(self, fraction):
+        """Returns an upper bound of the given percentile, in seconds, or None without observations.
+
+        Args:
+            fraction (float): The percentile as a fraction, 0.99 for the 99th percentile.
+
+        """
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for bucket, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank:
+                return min(2 ** bucket / 1e6, self.maximum)
+        return self.maximum
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.total / self.count if self.count else None,
+            "min": self.minimum,
+            "max": self.maximum,
+            "p50": self.percentile(0.5),
+            "p99": self.percentile(0.99)
+        }
+
+
+class Metrics:
+    def __init__(self):
+        """Counters and latency histograms of the processing hot paths.
+
+        Attributes:
+            started (float): The time.monotonic() time at which collection started.
+            latencies (dict): The Histogram of each stage, by stage name.
+            symbol_updates (dict): The number of updates applied, by symbol.
+            alert_evaluations (dict): The number of checks and their total time in seconds, by alert description.
+
+        """
+        self.started = time.monotonic()
+        self.latencies = {}
+        self.symbol_updates = {}
+        self.alert_evaluations = {}
+        self._dumper = None
+
+    def observe(self, stage, seconds):
+        """Records the time spent in a stage.
+
+        """
+        histogram = self.latencies.get(stage)
+        if histogram is None:
+            histogram = self.latencies[stage] = Histogram()
+        histogram.observe(seconds)
+
+    def count_updates(self, symbol, count=1):
+        """Records updates applied to the stock of a symbol.
+
+        """
+        self.symbol_updates[symbol] = self.symbol_updates.get(symbol, 0) + count
+
+    def observe_alert(self, description, seconds):
+        """Records a check of an alert and the time it took.
+
+        """
+        evaluation = self.alert_evaluations.get(description)
+        if evaluation is None:
+            self.alert_evaluations[description] = [1, seconds]
+        else:
+            evaluation[0] += 1
+            evaluation[1] += seconds
+
+    def snapshot(self):
+        """Returns the metrics collected so far as a dict of plain values.
+
+        Update rates are per second since collection started. Safe to call while another thread reports, as the thread
+        started by start_dumping does: each dict is copied by a single list() call, which the reporting thread cannot
+        interleave with, before it is iterated, so reporting never has to take a lock.
+
+        """
+        elapsed = time.monotonic() - self.started
+        latencies = list(self.latencies.items())
+        symbol_updates = list(self.symbol_updates.items())
+        alert_evaluations = [(description, tuple(evaluation))
+                             for description, evaluation in list(self.alert_evaluations.items())]
+        return {
+            "elapsed": elapsed,
+            "stages": {stage: histogram.summary() for stage, histogram in latencies},
+            "symbols": {symbol: {"updates": count, "rate": count / elapsed if elapsed else None}
+                        for symbol, count in symbol_updates},
+            "alerts": {description: {"evaluations": count, "total": total}
+                       for description, (count, total) in alert_evaluations}
+        }
+
+    def dump(self, fp=None):
+        """Writes a snapshot as one line of JSON.
+
+        Args:
+            fp: The file to write to. Defaults to standard error.
+
+        """
+        fp = fp if fp is not None else sys.stderr
+        fp.write(json.dumps(self.snapshot(), sort_keys=True) + "\n")
+        fp.flush()
+
+    def start_dumping(self, interval, fp=None):
+        """Dumps a snapshot every interval seconds from a background thread until stop_dumping is called.
+
+        Args:
+            interval (float): The number of seconds between two dumps.
+            fp: The file to write to. Defaults to standard error.
+
+        """
+        self.stop_dumping()
+        stopped = threading.Event()
+
+        def dump_periodically():
+            while not stopped.wait(interval):
+                self.dump(fp)
+
+        thread = threading.Thread(target=dump_periodically, daemon=True)
+        self._dumper = (thread, stopped)
+        thread.start()
+
+    def stop_dumping(self):
+        """Stops the periodic dumps.
+
+        """
+        if self._dumper is not None:
+            thread, stopped = self._dumper
+            stopped.set()
+            thread.join()
+            self._dumper = None
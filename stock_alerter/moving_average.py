@@ -1,4 +1,52 @@
+import collections
 from datetime import timedelta
+from itertools import islice
+
+ONE_DAY = timedelta(days=1)
+
+
+class RollingSum:
+    def __init__(self, span):
+        """The running sum of the last span values of a window, kept up to date as values are appended to it.
+
+        The window itself is held by the caller, so several sums can share one window of closing prices. The sum is
+        recomputed from the window once every span values, so floating point drift stays bounded.
+
+        Args:
+            span (int): The number of values summed.
+
+        Attributes:
+            span (int): The number of values summed.
+            total: The sum of the last span values.
+            count (int): The number of values pushed so far.
+
+        """
+        self.span = span
+        self.total = 0
+        self.count = 0
+
+    def push(self, value, window):
+        """Adds a value about to be appended to window, dropping the value that leaves the last span.
+
+        Args:
+            value: The value appended.
+            window (collections.deque): The values before value is appended.
+
+        """
+        span = self.span
+        if len(window) >= span:
+            self.total -= window[-span]
+        self.count += 1
+        if self.count % span:
+            self.total += value
+        else:
+            self.total = sum(islice(window, max(len(window) - span + 1, 0), None)) + value
+
+    def revise(self, value, window):
+        """Replaces the last value of window, which is about to be set to value, in the sum.
+
+        """
+        self.total += value - window[-1]
 
 
 class MovingAverage:
@@ -31,3 +79,135 @@ class MovingAverage:
         closing_prices = [self.series.get_closing_price(date) for date in dates]
         average_closing_price = sum(closing_prices) / self.time_span
         return average_closing_price
+
+
+class RollingMovingAverage(MovingAverage):
+    def __init__(self, series, time_span):
+        """A MovingAverage kept up to date as daily closing prices land in its series.
+
+        The closing prices of the last time_span days are held in a window with their running sum, so folding in a new
+        or revised daily close costs O(1) per calendar day. The average of every date with a full window is recorded
+        and read back by value_on instead of being recomputed from the series. When a retention policy bounds the
+        series, the averages of the dates before its first kept closing price are dropped.
+
+        Args:
+            series: The series of numbers used to calculate moving averages including timestamps and values.
+            time_span (int): The length number of items from the series used in calculating a moving average.
+
+        Attributes:
+            window (collections.deque): The closing prices of the last time_span days, oldest first.
+            rolling_sum (RollingSum): The running sum of the window.
+            last_date (datetime.date): The date of the newest closing price in the window.
+            values (dict): The moving average of each date with a full window.
+
+        """
+        super().__init__(series, time_span)
+        self.reset()
+
+    def reset(self):
+        """Empties the window and the recorded averages.
+
+        """
+        self.window = collections.deque(maxlen=self.time_span)
+        self.rolling_sum = RollingSum(self.time_span)
+        self.last_date = None
+        self.values = {}
+
+    def rebuild(self):
+        """Recomputes the window and the recorded averages from the closing prices of the series.
+
+        """
+        self.reset()
+        for on_date, closing_price in self.series.closing_prices():
+            self._add_close(on_date, closing_price)
+
+    def get_state(self):
+        """Returns the window and the recorded averages, for storage.
+
+        Returns:
+            A dict of the window as a list, its running sum, the date of its newest closing price, the recorded
+            averages and the number of closing prices appended so far.
+
+        """
+        return {"window": list(self.window), "total": self.rolling_sum.total, "last_date": self.last_date,
+                "values": self.values, "appended": self.rolling_sum.count}
+
+    def set_state(self, state):
+        """Restores the window and the recorded averages from a dict returned by get_state.
+
+        """
+        self.window = collections.deque(state["window"], maxlen=self.time_span)
+        self.rolling_sum = RollingSum(self.time_span)
+        self.rolling_sum.total = state["total"]
+        self.rolling_sum.count = state["appended"]
+        self.last_date = state["last_date"]
+        self.values = dict(state["values"])
+
+    def update(self, timestamp):
+        """Folds the closing price of timestamp's date into the moving average.
+
+        Meant to be called after each update of the series. An update dated before the newest closing price in the
+        window rebuilds the moving average from the series.
+
+        Args:
+            timestamp (datetime.datetime): The timestamp of the update made to the series.
+
+        """
+        on_date = timestamp.date()
+        if self.last_date is not None and on_date < self.last_date:
+            self.rebuild()
+        else:
+            self._add_close(on_date, self.series.get_closing_price(timestamp))
+
+    def _add_close(self, on_date, closing_price):
+        if on_date == self.last_date:
+            self.rolling_sum.revise(closing_price, self.window)
+            self.window[-1] = closing_price
+            self._record(on_date)
+            return
+        if self.last_date is not None:
+            previous_closing_price = self.window[-1]
+            day = self.last_date + ONE_DAY
+            while day < on_date:
+                self._append(day, previous_closing_price)
+                day += ONE_DAY
+        self._append(on_date, closing_price)
+        self.last_date = on_date
+
+    def _append(self, on_date, closing_price):
+        self.rolling_sum.push(closing_price, self.window)
+        self.window.append(closing_price)
+        self._record(on_date)
+        if self.series.bounded:
+            first_date = self.series.first_date
+            # Averages are recorded for every calendar day, so a bounded series keeps at most this many of them. They
+            # are trimmed once twice as many are recorded, which costs O(1) amortized per day.
+            if len(self.values) > 2 * ((on_date - first_date).days + 1):
+                self.values = {day: value for day, value in self.values.items() if day >= first_date}
+
+    def _record(self, on_date):
+        if len(self.window) == self.time_span:
+            self.values[on_date] = self.rolling_sum.total / self.time_span
+
+    def value_on(self, on_date):
+        """Returns the moving average of a stock's closing prices from a given on_date.
+
+        Recorded averages are returned directly. Dates after the newest closing price carry it forward, and anything
+        else is calculated from the series.
+
+        Args:
+            on_date (datetime.datetime): The on_date from which the moving average is being calculated.
+
+        Returns:
+            The average closing price for the given range.
+
+        """
+        date = on_date.date()
+        value = self.values.get(date)
+        if value is not None:
+            return value
+        if self.last_date is not None and date > self.last_date and len(self.window) == self.time_span:
+            carried_days = min((date - self.last_date).days, self.time_span)
+            kept_prices = list(self.window)[carried_days:]
+            return (sum(kept_prices) + carried_days * self.window[-1]) / self.time_span
+        return super().value_on(on_date)
@@ -1,19 +1,291 @@
+import os
+import time
+from itertools import islice
+
+from stock_alerter import metrics
+from stock_alerter.symbols import put
+
+
 class Processor:
-    def __init__(self, reader, exchange):
+    def __init__(self, reader, exchange, batch_size=None):
         """Applies updates from a reader to an exchange of stocks.
 
+        With a batch_size, updates are read batch_size at a time and the updates of each symbol in a batch are applied
+        together with Stock.update_many, so a stock's update_event fires once per batch instead of once per update.
+        The updates of a symbol keep their order, but alerts only see the state at the end of each batch.
+
         Args:
             reader: The source of stock updates.
             exchange: The list of stocks.
+            batch_size (Optional[int]): The number of updates read per batch.
 
         """
         self.reader = reader
         self.exchange = exchange
+        self.batch_size = batch_size
 
     def process(self):
         """Executes all the updates in self.reader.
 
         """
+        if self.batch_size:
+            self._process_batches()
+            return
+        collector = metrics.collector
+        if collector is not None:
+            self._process_measured(collector)
+            return
+        exchange = self.exchange
+        # Stocks are kept in a list indexed by symbol ID. The exchange, which an Exchange creates stocks in, is only
+        # looked up on the first update of each symbol, when the ID of the symbol is recorded.
+        ids = {}
+        stocks = []
         for symbol, timestamp, price in self.reader.get_updates():
+            try:
+                stock = stocks[ids[symbol]]
+            except KeyError:
+                stock = exchange[symbol]
+                ids[symbol] = stock.symbol_id
+                put(stocks, stock.symbol_id, stock)
+            stock.update(timestamp, price)
+
+    def _process_measured(self, collector):
+        for symbol, timestamp, price in self.reader.get_updates():
+            start = time.perf_counter()
+            stock = self.exchange[symbol]
+            stock.update(timestamp, price)
+            collector.observe("processor.update", time.perf_counter() - start)
+            collector.count_updates(symbol)
+
+    def _process_batches(self):
+        updates = self.reader.get_updates()
+        while True:
+            batch = list(islice(updates, self.batch_size))
+            if not batch:
+                return
+            runs = {}
+            for symbol, timestamp, price in batch:
+                run = runs.get(symbol)
+                if run is None:
+                    run = runs[symbol] = []
+                run.append((timestamp, price))
+            collector = metrics.collector
+            for symbol, run in runs.items():
+                if collector is None:
+                    self.exchange[symbol].update_many(run)
+                    continue
+                start = time.perf_counter()
+                self.exchange[symbol].update_many(run)
+                collector.observe("processor.update_many", time.perf_counter() - start)
+                collector.count_updates(symbol, len(run))
+
+
+class AsyncProcessor(Processor):
+    def __init__(self, reader, exchange, executor=None):
+        """A Processor applying updates from an asynchronous reader.
+
+        When an AsyncActionExecutor is given, the processor waits for it to drain below its pending limit before
+        applying each update, so a backlog of alert deliveries slows ingestion down instead of growing without bound.
+
+        Args:
+            reader: The asynchronous source of stock updates, such as an AsyncReader.
+            exchange: The list of stocks.
+            executor (Optional[AsyncActionExecutor]): The executor running the actions of the exchange's alerts.
+
+        """
+        super().__init__(reader, exchange)
+        self.executor = executor
+
+    async def process(self):
+        """Executes all the updates in self.reader.
+
+        """
+        executor = self.executor
+        async for symbol, timestamp, price in self.reader.get_updates():
+            if executor is not None and executor.is_full():
+                await executor.wait_for_capacity()
             stock = self.exchange[symbol]
             stock.update(timestamp, price)
+
+
+class ParallelProcessor(Processor):
+    CHUNK_SIZE = 10000
+    QUEUE_SIZE = 8
+    POLL_INTERVAL = 0.5
+
+    def __init__(self, reader, exchange, processes=None):
+        """A Processor that shards the exchange by symbol across worker processes.
+
+        Each worker is forked with a copy of the exchange and owns a disjoint set of symbols. The parent reads the
+        updates, routes each one to the worker owning its symbol in chunks of CHUNK_SIZE, and so keeps the updates of a
+        symbol in reader order. Symbols whose stocks are watched by the same alert, connected on its own or added to an
+        AlertEngine or a ThresholdEngine, are owned by the same worker, so alert rules see consistent prices and their
+        actions run in that worker. When the workers finish, the state of every updated stock is merged back into the
+        parent's exchange.
+
+        Forking is required; without it, or with a single process, updates are processed serially. Waits on the workers
+        time out every POLL_INTERVAL seconds to check that they are still alive, so a worker killed without reporting
+        an error, by a signal or os._exit, fails the processing instead of hanging it.
+
+        Args:
+            reader: The source of stock updates.
+            exchange: The list of stocks.
+            processes (Optional[int]): The number of worker processes. Defaults to the number of CPUs.
+
+        """
+        super().__init__(reader, exchange)
+        self.processes = processes or os.cpu_count() or 1
+
+    def process(self):
+        """Executes all the updates in self.reader across the worker processes.
+
+        Raises:
+            KeyError: If an update is for a symbol that is not in the exchange, and the exchange does not create it.
+            RuntimeError: If a worker process raises an exception or exits before reporting its results.
+
+        """
+        import multiprocessing
+
+        if self.processes < 2 or "fork" not in multiprocessing.get_all_start_methods():
+            super().process()
+            return
+
+        context = multiprocessing.get_context("fork")
+        queues = [context.Queue(self.QUEUE_SIZE) for _ in range(self.processes)]
+        results = context.Queue()
+        workers = [context.Process(target=_process_shard, args=(self.exchange, queue, results), daemon=True)
+                   for queue in queues]
+        for worker in workers:
+            worker.start()
+        try:
+            self._route_updates(queues, workers)
+            for queue, worker in zip(queues, workers):
+                self._put(queue, None, worker)
+            for states in self._collect_results(results, workers):
+                for symbol, state in states.items():
+                    vars(self.exchange[symbol]).update(state)
+        except BaseException:
+            for worker in workers:
+                worker.terminate()
+            raise
+        finally:
+            for worker in workers:
+                worker.join()
+
+    def _route_updates(self, queues, workers):
+        owners = self._assign_owners()
+        chunks = [[] for _ in queues]
+        for update in self.reader.get_updates():
+            owner = owners.get(update[0])
+            if owner is None:
+                # Raises KeyError unless the exchange creates stocks on demand, as an Exchange does.
+                self.exchange[update[0]]
+                owner = owners[update[0]] = len(owners) % len(queues)
+            chunk = chunks[owner]
+            chunk.append(update)
+            if len(chunk) >= self.CHUNK_SIZE:
+                self._put(queues[owner], chunk, workers[owner])
+                chunks[owner] = []
+        for queue, chunk, worker in zip(queues, chunks, workers):
+            if chunk:
+                self._put(queue, chunk, worker)
+
+    def _put(self, queue, item, worker):
+        """Puts an item on the queue of a worker, waiting while it is full as long as the worker is alive.
+
+        Raises:
+            RuntimeError: If the worker has exited.
+
+        """
+        from queue import Full
+
+        while True:
+            try:
+                queue.put(item, timeout=self.POLL_INTERVAL)
+                return
+            except Full:
+                if worker.exitcode is not None:
+                    raise RuntimeError("worker process exited with code {}".format(worker.exitcode))
+
+    def _collect_results(self, results, workers):
+        """A generator returning the stock states reported by each worker.
+
+        Raises:
+            RuntimeError: If a worker reports an error, or exits without reporting.
+
+        """
+        from queue import Empty
+
+        pending = len(workers)
+        all_exited = False
+        while pending:
+            try:
+                states, error = results.get(timeout=self.POLL_INTERVAL)
+            except Empty:
+                for worker in workers:
+                    if worker.exitcode not in (None, 0):
+                        raise RuntimeError("worker process exited with code {}".format(worker.exitcode))
+                # A worker flushes its results before it exits, so once every worker has exited, a further wait
+                # that times out means a result will never arrive.
+                if all_exited:
+                    raise RuntimeError("worker process exited without reporting")
+                all_exited = all(worker.exitcode is not None for worker in workers)
+                continue
+            if error is not None:
+                raise RuntimeError("worker process failed: {}".format(error))
+            pending -= 1
+            yield states
+
+    def _assign_owners(self):
+        """Maps each symbol of the exchange to the index of the worker owning it.
+
+        Symbols are grouped by the listeners of their stocks whose objects report, through a symbol_groups method, the
+        sets of symbols they read together, as alerts and alert engines do. The groups are spread over the workers from
+        the largest down, each to the worker owning the fewest symbols so far.
+
+        """
+        groups = {symbol: {symbol} for symbol in self.exchange}
+        visited = set()
+        for symbol in self.exchange:
+            for listener in self.exchange[symbol].update_event.listeners:
+                owner = getattr(listener, "__self__", None)
+                symbol_groups = getattr(owner, "symbol_groups", None)
+                if symbol_groups is None or id(owner) in visited:
+                    continue
+                visited.add(id(owner))
+                for dependent in symbol_groups():
+                    members = [member for member in dependent if member in groups]
+                    for other in members[1:]:
+                        if groups[other] is not groups[members[0]]:
+                            merged = groups[members[0]] | groups[other]
+                            for member in merged:
+                                groups[member] = merged
+
+        owners = {}
+        loads = [0] * self.processes
+        unique_groups = {id(group): group for group in groups.values()}.values()
+        for group in sorted(unique_groups, key=len, reverse=True):
+            owner = loads.index(min(loads))
+            loads[owner] += len(group)
+            for symbol in group:
+                owners[symbol] = owner
+        return owners
+
+
+def _process_shard(exchange, queue, results):
+    """Applies the chunks of updates arriving on queue to exchange until a None sentinel arrives.
+
+    Puts the state of every updated stock, or the error that stopped the worker, on results.
+
+    """
+    symbols = set()
+    try:
+        for chunk in iter(queue.get, None):
+            for symbol, timestamp, price in chunk:
+                exchange[symbol].update(timestamp, price)
+            symbols.update(update[0] for update in chunk)
+        results.put(({symbol: exchange[symbol].__getstate__() for symbol in symbols}, None))
+    except Exception as error:
+        results.put(({}, repr(error)))
+        for _ in iter(queue.get, None):
+            pass
@@ -0,0 +1,48 @@
+import threading
+import time
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity=1, clock=time.monotonic):
+        """Caps how often something may happen, allowing bursts of up to capacity.
+
+        The bucket holds up to capacity tokens and refills at rate tokens per second. Each allowed event takes a token,
+        so events beyond the burst are allowed at rate per second on average. The tokens are refilled lazily when
+        taken, so an idle bucket costs nothing. Safe to share between threads.
+
+        Args:
+            rate (float): The number of tokens added per second.
+            capacity (float): The largest number of tokens held, which is the largest burst allowed.
+            clock: A function returning the current time in seconds.
+
+        Attributes:
+            rate (float): The number of tokens added per second.
+            capacity (float): The largest number of tokens held, which is the largest burst allowed.
+            tokens (float): The number of tokens held when last refilled.
+
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = capacity
+        self._refilled = clock()
+        self._lock = threading.Lock()
+
+    def consume(self, tokens=1):
+        """Takes tokens from the bucket if it holds enough of them.
+
+        Args:
+            tokens (float): The number of tokens to take.
+
+        Returns:
+            True if the tokens were taken, False if the bucket held too few and nothing was taken.
+
+        """
+        with self._lock:
+            now = self.clock()
+            self.tokens = min(self.capacity, self.tokens + (now - self._refilled) * self.rate)
+            self._refilled = now
+            if self.tokens < tokens:
+                return False
+            self.tokens -= tokens
+            return True
@@ -53,6 +53,89 @@ class PriceRule:
         return {self.symbol}
 
 
+class ThresholdRule:
+    COMPARISONS = ("gt", "lt", "ge", "le", "between")
+
+    def __init__(self, symbol, comparison, threshold, upper=None):
+        """A declarative PriceRule comparing a stock's price to fixed thresholds.
+
+        Unlike the condition of a PriceRule, the comparison is known, so the rule can be indexed by its thresholds.
+        A between rule matches prices from threshold to upper, both included.
+
+        Args:
+            symbol (str): The stock's symbol.
+            comparison (str): One of "gt", "lt", "ge", "le" or "between".
+            threshold (float): The value the price is compared to, or the lower bound of a between rule.
+            upper (Optional[float]): The upper bound of a between rule.
+
+        Attributes:
+            symbol (str): The stock's symbol.
+            comparison (str): One of "gt", "lt", "ge", "le" or "between".
+            threshold (float): The value the price is compared to, or the lower bound of a between rule.
+            upper (Optional[float]): The upper bound of a between rule.
+
+        Raises:
+            ValueError: If the comparison is unknown, or a between rule has no upper bound.
+
+        """
+        if comparison not in self.COMPARISONS:
+            raise ValueError("unknown comparison {!r}".format(comparison))
+        if (comparison == "between") != (upper is not None):
+            raise ValueError("only a between rule takes an upper bound")
+        self.symbol = symbol
+        self.comparison = comparison
+        self.threshold = threshold
+        self.upper = upper
+
+    def holds(self, price):
+        """Checks a price against the thresholds.
+
+        Args:
+            price: The price being checked.
+
+        Returns:
+            True if the price satisfies the comparison, False if not or if there is no price yet.
+
+        """
+        if not price:
+            return False
+        comparison = self.comparison
+        if comparison == "gt":
+            return price > self.threshold
+        if comparison == "lt":
+            return price < self.threshold
+        if comparison == "ge":
+            return price >= self.threshold
+        if comparison == "le":
+            return price <= self.threshold
+        return self.threshold <= price <= self.upper
+
+    def matches(self, exchange):
+        """Checks if there is a match in the stock exchange for the Rule instance.
+
+        Args:
+            exchange: The stock exchange being checked.
+
+        Returns:
+            True if there is a match in the exchange, False if not.
+
+        """
+        try:
+            stock = exchange[self.symbol]
+        except KeyError:
+            return False
+        return self.holds(stock.price)
+
+    def boundaries(self):
+        """Returns the thresholds at which the result of the rule can change.
+
+        """
+        return (self.threshold,) if self.upper is None else (self.threshold, self.upper)
+
+    def depends_on(self):
+        return {self.symbol}
+
+
 class AndRule:
     def __init__(self, *args):
         """A composite PriceRule class used for comparing multiple and/or composite PriceRules.
@@ -78,11 +161,111 @@ class AndRule:
             True if the AndRule finds matches in the exchange, False if not.
 
         """
-        matches_bool = all([rule.matches(exchange) for rule in self.rules])
+        matches_bool = all(rule.matches(exchange) for rule in self.rules)
         return matches_bool
 
+    @staticmethod
+    def combine(results):
+        """Combines the results of the component rules into the result of the AndRule.
+
+        Args:
+            results: The result of each component rule.
+
+        Returns:
+            True if every component rule matched, False if not.
+
+        """
+        return all(results)
+
     def depends_on(self):
         depends = set()
         for rule in self.rules:
             depends = depends.union(rule.depends_on())
         return depends
+
+
+class OrRule:
+    def __init__(self, *args):
+        """A composite rule that matches when any of its component rules matches.
+
+        Args:
+            *args (Optional[PriceRule, AndRule, OrRule, NotRule]): The rules being checked.
+
+        Attributes:
+            rules (tuple): The rules being checked.
+
+        """
+        self.rules = args
+
+    def matches(self, exchange):
+        """Determines if any of the component rules matches.
+
+        Args:
+            exchange: The stock exchange being checked.
+
+        Returns:
+            True if a component rule matches in the exchange, False if not.
+
+        """
+        return any(rule.matches(exchange) for rule in self.rules)
+
+    @staticmethod
+    def combine(results):
+        """Combines the results of the component rules into the result of the OrRule.
+
+        Args:
+            results: The result of each component rule.
+
+        Returns:
+            True if any component rule matched, False if not.
+
+        """
+        return any(results)
+
+    def depends_on(self):
+        depends = set()
+        for rule in self.rules:
+            depends = depends.union(rule.depends_on())
+        return depends
+
+
+class NotRule:
+    def __init__(self, rule):
+        """A composite rule that matches when its component rule does not.
+
+        Args:
+            rule (Optional[PriceRule, AndRule, OrRule, NotRule]): The rule being negated.
+
+        Attributes:
+            rules (tuple): The rule being negated, as the only component rule.
+
+        """
+        self.rules = (rule,)
+
+    def matches(self, exchange):
+        """Determines if the component rule does not match.
+
+        Args:
+            exchange: The stock exchange being checked.
+
+        Returns:
+            True if the component rule does not match in the exchange, False if it does.
+
+        """
+        return not self.rules[0].matches(exchange)
+
+    @staticmethod
+    def combine(results):
+        """Combines the result of the component rule into the result of the NotRule.
+
+        Args:
+            results: The result of the component rule.
+
+        Returns:
+            True if the component rule did not match, False if it did.
+
+        """
+        return not all(results)
+
+    def depends_on(self):
+        return self.rules[0].depends_on()
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""Snapshots of the state of an exchange, for warm restarts.
+
+A snapshot holds, for every stock, the updates of its TimeSeries, its closing updates and the state of its moving
+averages, so a restarted alerter can load it and carry on from the feed offset it was taken at instead of replaying the
+whole feed. Every sequence is stored as the raw bytes of a typed array and is loaded back with a single copy.
+
+The file starts with a header giving the feed offset, -1 when there is none, and the number of stocks. Each stock
+follows as its settings, its symbol, the updates and closing updates of its series and the state of its short and long
+term moving averages. An array is stored as its length followed by its items. All values are little-endian.
+
+"""
+import struct
+import sys
+from array import array
+from datetime import date
+
+from stock_alerter.exchange import Exchange
+from stock_alerter.stock import Stock
+from stock_alerter.timeseries import ArrayTimeSeries, TimeSeries
+
+MAGIC = b"STKS"
+VERSION = 1
+HEADER = struct.Struct("<4sHHqQ")
+STOCK = struct.Struct("<HBBqq")
+MOVING_AVERAGE = struct.Struct("<Qdqq")
+ARRAY_LENGTH = struct.Struct("<Q")
+
+SERIES_CLASSES = (TimeSeries, ArrayTimeSeries)
+
+
+def save_snapshot(exchange, filename, offset=None):
+    """Writes the state of every stock of an exchange to a snapshot file.
+
+    Args:
+        exchange: The list of stocks.
+        filename (str): The name of the snapshot file to write.
+        offset (Optional[int]): The number of feed updates applied to the exchange, to resume the feed from.
+
+    """
+    with open(filename, "wb") as fp:
+        fp.write(HEADER.pack(MAGIC, VERSION, 0, -1 if offset is None else offset, len(exchange)))
+        for symbol, stock in exchange.items():
+            history = stock.history
+            encoded = symbol.encode()
+            fp.write(STOCK.pack(len(encoded), 1 if hasattr(history, "timestamps") else 0, history.compact,
+                                _optional(history.max_ticks), _optional(history.max_days)))
+            fp.write(encoded)
+            for sequence in history.to_arrays():
+                _write_array(fp, sequence)
+            for moving_average in (stock.short_term_moving_average, stock.long_term_moving_average):
+                state = moving_average.get_state()
+                last_date = state["last_date"]
+                fp.write(MOVING_AVERAGE.pack(moving_average.time_span, state["total"],
+                                             last_date.toordinal() if last_date is not None else 0, state["appended"]))
+                _write_array(fp, array("d", state["window"]))
+                _write_array(fp, array("q", [on_date.toordinal() for on_date in state["values"]]))
+                _write_array(fp, array("d", state["values"].values()))
+
+
+def load_snapshot(filename):
+    """Reads the stocks of a snapshot file.
+
+    The stocks have no listeners, so alerts must be connected to them again. Prices are loaded as floats.
+
+    Args:
+        filename (str): The name of the snapshot file to read.
+
+    Returns:
+        An Exchange of the stocks, and the feed offset the snapshot was taken at or None.
+
+    Raises:
+        ValueError: If the file is not a snapshot file, or its moving averages do not have the time spans of Stock.
+
+    """
+    with open(filename, "rb") as fp:
+        data = memoryview(fp.read())
+    if len(data) < HEADER.size:
+        raise ValueError("{} is not a version {} snapshot file".format(filename, VERSION))
+    magic, version, _, offset, count = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("{} is not a version {} snapshot file".format(filename, VERSION))
+    position = HEADER.size
+    exchange = Exchange()
+    for _ in range(count):
+        symbol_length, kind, compact, max_ticks, max_days = STOCK.unpack_from(data, position)
+        position += STOCK.size
+        symbol = bytes(data[position:position + symbol_length]).decode()
+        position += symbol_length
+        history = SERIES_CLASSES[kind](_required(max_ticks), _required(max_days), bool(compact))
+        arrays = []
+        for typecode in "qdqd":
+            sequence, position = _read_array(data, position, typecode)
+            arrays.append(sequence)
+        history.load_arrays(*arrays)
+        stock = Stock(symbol, history)
+        for moving_average in (stock.short_term_moving_average, stock.long_term_moving_average):
+            time_span, total, last_date, appended = MOVING_AVERAGE.unpack_from(data, position)
+            position += MOVING_AVERAGE.size
+            if time_span != moving_average.time_span:
+                raise ValueError("{} has a moving average over {} days instead of {}".format(
+                    symbol, time_span, moving_average.time_span))
+            window, position = _read_array(data, position, "d")
+            value_dates, position = _read_array(data, position, "q")
+            values, position = _read_array(data, position, "d")
+            moving_average.set_state({
+                "window": window,
+                "total": total,
+                "last_date": date.fromordinal(last_date) if last_date else None,
+                "values": dict(zip(map(date.fromordinal, value_dates), values)),
+                "appended": appended
+            })
+        exchange[symbol] = stock
+    return exchange, (offset if offset >= 0 else None)
+
+
+def _optional(value):
+    return -1 if value is None else value
+
+
+def _required(value):
+    return None if value < 0 else value
+
+
+def _write_array(fp, sequence):
+    fp.write(ARRAY_LENGTH.pack(len(sequence)))
+    if sys.byteorder != "little":
+        sequence = array(sequence.typecode, sequence)
+        sequence.byteswap()
+    sequence.tofile(fp)
+
+
+def _read_array(data, position, typecode):
+    length, = ARRAY_LENGTH.unpack_from(data, position)
+    position += ARRAY_LENGTH.size
+    sequence = array(typecode)
+    end = position + length * sequence.itemsize
+    sequence.frombytes(data[position:end])
+    if sys.byteorder != "little":
+        sequence.byteswap()
+    return sequence, end
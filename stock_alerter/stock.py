@@ -1,10 +1,13 @@
+from array import array
 from datetime import timedelta
 from enum import Enum
+from itertools import accumulate
 
-from event import Event
-from timeseries import TimeSeries
-
-from stock_alerter.moving_average import MovingAverage
+from stock_alerter.event import Event
+from stock_alerter.indicators import IndicatorEngine
+from stock_alerter.moving_average import RollingMovingAverage
+from stock_alerter.symbols import symbol_id
+from stock_alerter.timeseries import TimeSeries
 
 
 class StockSignal(Enum):
@@ -17,21 +20,47 @@ class Stock:
     LONG_TERM_TIME_SPAN = 10
     SHORT_TERM_TIME_SPAN = 5
 
-    def __init__(self, symbol):
+    def __init__(self, symbol, history=None):
         """A Stock object representing its price history.
 
         Args:
             symbol (str): The stock symbol.
+            history (Optional[TimeSeries]): The series to record updates in. Defaults to an empty TimeSeries. A
+                bounded series is made to keep the closing prices of at least LONG_TERM_TIME_SPAN + 1 dates, which the
+                crossover signal reads.
 
         Attributes:
             symbol (str): The stock symbol.
+            symbol_id (int): The interned ID of the symbol, as returned by symbols.symbol_id.
             price (float): The most recent price.
             history (TimeSeries): The record of stock price updates by timestamp and price.
             update_event (Event): The event that is called when an update occurs to the stocks history.
+            short_term_moving_average (RollingMovingAverage): The short term moving average of the closing prices.
+            long_term_moving_average (RollingMovingAverage): The long term moving average of the closing prices.
+            indicators (IndicatorEngine): Further indicators of the closing prices, none until some are added.
 
         """
         self.symbol = symbol
-        self.history = TimeSeries()
+        self.symbol_id = symbol_id(symbol)
+        self.history = history if history is not None else TimeSeries()
+        self.history.retained_dates = max(self.history.retained_dates, self.LONG_TERM_TIME_SPAN + 1)
+        self.update_event = Event()
+        self.short_term_moving_average = RollingMovingAverage(self.history, self.SHORT_TERM_TIME_SPAN)
+        self.long_term_moving_average = RollingMovingAverage(self.history, self.LONG_TERM_TIME_SPAN)
+        self.indicators = IndicatorEngine(self.history)
+
+    def __getstate__(self):
+        """Returns the stock's state without its update_event, whose listeners are not carried along.
+
+        """
+        state = self.__dict__.copy()
+        del state["update_event"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        # IDs are assigned per process, so the ID of a stock pickled by another process is looked up again.
+        self.symbol_id = symbol_id(self.symbol)
         self.update_event = Event()
 
     @property
@@ -61,6 +90,39 @@ class Stock:
         if price < 0:
             raise ValueError("price should not be negative")
         self.history.update(timestamp, price)
+        self.short_term_moving_average.update(timestamp)
+        self.long_term_moving_average.update(timestamp)
+        self.indicators.update(timestamp)
+        self.update_event.fire(self)
+
+    def update_many(self, updates):
+        """Updates the stock's price history with several updates and fires a single event.
+
+        The updates are applied with one sort and merge, and listeners are notified once with the resulting state, so
+        a burst of updates costs one evaluation of the alerts on the stock.
+
+        Args:
+            updates: The (timestamp, price) pairs of the updates.
+
+        Raises:
+            ValueError: If any price is less than zero. No update is applied then.
+
+        """
+        updates = list(updates)
+        if not updates:
+            return
+        if any(price < 0 for _, price in updates):
+            raise ValueError("price should not be negative")
+        self.history.extend(updates)
+        latest_timestamps = {}
+        for timestamp, _ in updates:
+            on_date = timestamp.date()
+            if on_date not in latest_timestamps or timestamp > latest_timestamps[on_date]:
+                latest_timestamps[on_date] = timestamp
+        for timestamp in sorted(latest_timestamps.values()):
+            self.short_term_moving_average.update(timestamp)
+            self.long_term_moving_average.update(timestamp)
+            self.indicators.update(timestamp)
         self.update_event.fire(self)
 
     @property
@@ -87,8 +149,8 @@ class Stock:
 
         Args:
             on_date (datetime.datetime): The date on which the cross over signal is to be checked.
-            ma (MovingAverage): The moving average.
-            reference_ma (MovingAverage): The reference moving average.
+            ma (RollingMovingAverage): The moving average.
+            reference_ma (RollingMovingAverage): The reference moving average.
 
         Returns:
             True if there is a crossover, False if not.
@@ -118,13 +180,54 @@ class Stock:
         if self.history.has_sufficient_update_history(on_date, self.LONG_TERM_TIME_SPAN):
             return StockSignal.neutral
 
-        long_term_moving_average = MovingAverage(self.history, self.LONG_TERM_TIME_SPAN)
-        short_term_moving_average = MovingAverage(self.history, self.SHORT_TERM_TIME_SPAN)
-
-        if self._is_crossover_below_to_above(on_date, short_term_moving_average, long_term_moving_average):
+        if self._is_crossover_below_to_above(on_date, self.short_term_moving_average, self.long_term_moving_average):
             return StockSignal.buy
 
-        if self._is_crossover_below_to_above(on_date, long_term_moving_average, short_term_moving_average):
+        if self._is_crossover_below_to_above(on_date, self.long_term_moving_average, self.short_term_moving_average):
             return StockSignal.sell
 
         return StockSignal.neutral
+
+    def get_crossover_signals(self, start_date, end_date):
+        """Determines the crossover signal of every day from start_date to end_date inclusive in one pass.
+
+        Gives the same signals as calling get_crossover_signal for each day, but the daily closing prices of the range
+        are read once and both moving averages are taken from their running sums, so the cost is O(days) overall.
+
+        Args:
+            start_date (datetime.datetime): The first date on which the cross over signal is to be checked.
+            end_date (datetime.datetime): The last date on which the cross over signal is to be checked.
+
+        Returns:
+            array.array: The value of the StockSignal of each day as a signed byte. StockSignal(code) turns a code back
+            into its signal.
+
+        """
+        first_date = start_date.date()
+        num_of_days = max((end_date.date() - first_date).days + 1, 0)
+        signals = array("b", [StockSignal.neutral.value]) * num_of_days
+        if not num_of_days or not len(self.history):
+            return signals
+
+        long_span = self.LONG_TERM_TIME_SPAN
+        short_span = self.SHORT_TERM_TIME_SPAN
+        first_signal_date = max(first_date, self.history.first_date + timedelta(days=long_span))
+        if first_signal_date > end_date.date():
+            return signals
+
+        closing_prices = self.history.daily_closing_prices(first_signal_date - timedelta(days=long_span),
+                                                            end_date.date())
+        sums = [0]
+        sums.extend(accumulate(closing_prices))
+        position = (first_signal_date - first_date).days
+        for day in range(long_span, len(closing_prices)):
+            previous_short = (sums[day] - sums[day - short_span]) / short_span
+            previous_long = (sums[day] - sums[day - long_span]) / long_span
+            short = (sums[day + 1] - sums[day + 1 - short_span]) / short_span
+            long = (sums[day + 1] - sums[day + 1 - long_span]) / long_span
+            if previous_short < previous_long and short > long:
+                signals[position] = StockSignal.buy.value
+            elif previous_long < previous_short and long > short:
+                signals[position] = StockSignal.sell.value
+            position += 1
+        return signals
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""Interning of stock symbols to small integer IDs.
+
+A symbol gets its ID the first time it is interned, in order from 0, and keeps it for the life of the process, so every
+stock, exchange and alert engine agrees on the ID of a symbol. Per-symbol state on the hot path is kept in lists indexed
+by these IDs, which are cheaper to index than dicts keyed by symbol strings.
+
+"""
+import sys
+
+symbols = []
+_ids = {}
+
+
+def symbol_id(symbol):
+    """Returns the ID of a symbol, assigning it the next free ID if the symbol was never interned.
+
+    Args:
+        symbol (str): The stock symbol.
+
+    Returns:
+        The ID of the symbol, an index into symbols.
+
+    """
+    try:
+        return _ids[symbol]
+    except KeyError:
+        symbol = sys.intern(symbol)
+        _ids[symbol] = len(symbols)
+        symbols.append(symbol)
+        return _ids[symbol]
+
+
+def put(values, symbol_id, value):
+    """Sets the item of a list indexed by symbol ID, padding the list with None up to it.
+
+    Args:
+        values (list): The list indexed by symbol ID.
+        symbol_id (int): The ID of the symbol.
+        value: The value stored for the symbol.
+
+    """
+    if symbol_id >= len(values):
+        values.extend([None] * (symbol_id + 1 - len(values)))
+    values[symbol_id] = value
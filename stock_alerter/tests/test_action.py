@@ -1,8 +1,14 @@
+import asyncio
+import email
 import smtplib
+import socketserver
+import threading
 import unittest
 from unittest import mock
 
-from stock_alerter.action import PrintAction, EmailAction
+from stock_alerter.action import (AsyncAction, AsyncActionExecutor, EmailDigest, PooledEmailAction, PrintAction,
+                                  EmailAction, RateLimitedAction, SMTPConnectionPool)
+from stock_alerter.ratelimit import TokenBucket
 
 
 class MessageMatcher:
@@ -16,6 +22,49 @@ class MessageMatcher:
                self.expected["Message"] == other._payload
 
 
+class StandInSMTPServer(socketserver.ThreadingTCPServer):
+    """A local SMTP server speaking just enough of the protocol for smtplib, recording what it receives."""
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), StandInSMTPHandler)
+        self.connections = 0
+        self.messages = []
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class StandInSMTPHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        self.server.connections += 1
+        self.reply("220 stand-in ready")
+        for line in self.rfile:
+            command = line.decode().strip().upper()
+            if command.startswith("QUIT"):
+                self.reply("221 bye")
+                return
+            if command.startswith("DATA"):
+                self.reply("354 go ahead")
+                data = []
+                for data_line in self.rfile:
+                    if data_line.rstrip(b"\r\n") == b".":
+                        break
+                    data.append(data_line)
+                self.server.messages.append(email.message_from_bytes(b"".join(data)))
+            self.reply("250 ok")
+
+    def reply(self, text):
+        self.wfile.write(text.encode() + b"\r\n")
+
+
 @mock.patch("builtins.print")
 class PrintActionTest(unittest.TestCase):
     def test_executing_action_prints_message(self, mock_print):
@@ -69,3 +118,96 @@ class EmailActionTest(unittest.TestCase):
         mock_smtp = mock_smtp_class.return_value
         self.action.execute("MSFT has crossed $10 price level")
         mock_smtp.send_message.assert_called_with(MessageMatcher(expected_message))
+
+
+class AsyncActionExecutorTest(unittest.TestCase):
+    def test_submitted_actions_are_executed_before_the_executor_closes(self):
+        action = mock.Mock()
+
+        async def run():
+            async with AsyncActionExecutor(max_concurrency=2) as executor:
+                for content in ["GOOG > $10", "MSFT > $10", "AAPL > $10"]:
+                    AsyncAction(action, executor).execute(content)
+
+        asyncio.run(run())
+        self.assertEqual(3, action.execute.call_count)
+
+    def test_a_failing_action_does_not_stop_other_actions(self):
+        failing_action = mock.Mock()
+        failing_action.execute.side_effect = smtplib.SMTPServerDisconnected()
+        action = mock.Mock()
+
+        async def run():
+            async with AsyncActionExecutor(max_concurrency=1) as executor:
+                executor.submit(failing_action, "GOOG > $10")
+                executor.submit(action, "MSFT > $10")
+
+        with self.assertLogs("stock_alerter.action"):
+            asyncio.run(run())
+        action.execute.assert_called_with("MSFT > $10")
+
+    def test_executor_is_full_at_max_pending_until_an_action_is_taken(self):
+        async def run():
+            async with AsyncActionExecutor(max_concurrency=1, max_pending=2) as executor:
+                executor.submit(mock.Mock(), "GOOG > $10")
+                executor.submit(mock.Mock(), "MSFT > $10")
+                self.assertTrue(executor.is_full())
+                await asyncio.wait_for(executor.wait_for_capacity(), timeout=1)
+                self.assertFalse(executor.is_full())
+
+        asyncio.run(run())
+
+    def test_closing_an_executor_that_was_never_started_does_nothing(self):
+        async def run():
+            executor = AsyncActionExecutor()
+            await executor.close()
+            async with executor:
+                pass
+            await executor.close()
+
+        asyncio.run(run())
+
+
+class PooledEmailActionTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StandInSMTPServer()
+        self.pool = SMTPConnectionPool("127.0.0.1", self.server.port)
+
+    def tearDown(self):
+        self.pool.close()
+        self.server.stop()
+
+    def test_alerts_are_sent_on_a_single_connection(self):
+        action = PooledEmailAction("bsmukasa@gmail.com", EmailDigest(self.pool))
+        action.execute("MSFT has crossed $10 price level")
+        action.execute("GOOG has crossed $10 price level")
+        self.assertEqual(1, self.server.connections)
+        self.assertEqual(["New Stock Alert"] * 2, [message["Subject"] for message in self.server.messages])
+        self.assertEqual("bsmukasa@gmail.com", self.server.messages[0]["To"])
+
+    def test_stale_connection_is_replaced(self):
+        self.pool.max_idle = -1
+        action = PooledEmailAction("bsmukasa@gmail.com", EmailDigest(self.pool))
+        action.execute("MSFT has crossed $10 price level")
+        action.execute("GOOG has crossed $10 price level")
+        self.assertEqual(2, self.server.connections)
+        self.assertEqual(2, len(self.server.messages))
+
+    def test_alerts_to_the_same_recipient_are_sent_as_one_digest(self):
+        digest = EmailDigest(self.pool, window=60)
+        PooledEmailAction("bsmukasa@gmail.com", digest).execute("MSFT has crossed $10 price level")
+        PooledEmailAction("bsmukasa@gmail.com", digest).execute("GOOG has crossed $10 price level")
+        PooledEmailAction("alerts@example.com", digest).execute("AAPL has crossed $10 price level")
+        digest.close()
+        subjects = sorted(message["Subject"] for message in self.server.messages)
+        self.assertEqual(["2 New Stock Alerts", "New Stock Alert"], subjects)
+
+
+class RateLimitedActionTest(unittest.TestCase):
+    def test_executions_beyond_the_rate_are_dropped(self):
+        action = mock.MagicMock()
+        limited = RateLimitedAction(action, TokenBucket(rate=1, capacity=1, clock=lambda: 0))
+        for _ in range(3):
+            limited.execute("sample alert")
+        action.execute.assert_called_once_with("sample alert")
+        self.assertEqual(2, limited.dropped)
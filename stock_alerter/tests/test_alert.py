@@ -6,14 +6,16 @@ from event import Event
 from rule import PriceRule
 from stock import Stock
 
-from stock_alerter.alert import Alert
+from stock_alerter.alert import Alert, AlertEngine
+from stock_alerter.ratelimit import TokenBucket
+from stock_alerter.rule import AndRule
 
 
 class AlertTest(unittest.TestCase):
     def test_action_is_executed_when_rule_matches(self):
         goog = mock.MagicMock(spec=Stock)
-        goog.updated = Event()
-        goog.update.side_effect = lambda date, value: goog.updated.fire(self)
+        goog.update_event = Event()
+        goog.update.side_effect = lambda date, value: goog.update_event.fire(self)
         exchange = {"GOOG": goog}
         rule = mock.MagicMock(spec=PriceRule)
         rule.matches.return_value = True
@@ -23,3 +25,85 @@ class AlertTest(unittest.TestCase):
         alert.connect(exchange)
         exchange["GOOG"].update(datetime(2014, 2, 10), 11)
         action.execute.assert_called_with("sample alert")
+
+    def test_action_is_not_executed_once_disconnected(self):
+        exchange = {"GOOG": Stock("GOOG")}
+        action = mock.MagicMock()
+        alert = Alert("sample alert", PriceRule("GOOG", lambda stock: stock.price > 10), action)
+        alert.connect(exchange)
+        alert.disconnect()
+        exchange["GOOG"].update(datetime(2014, 2, 10), 11)
+        self.assertFalse(action.execute.called)
+
+
+class AlertModeTest(unittest.TestCase):
+    def setUp(self):
+        self.action = mock.MagicMock()
+        self.now = 0.0
+
+    def alert(self, **kwargs):
+        return Alert("sample alert", mock.MagicMock(), self.action, clock=lambda: self.now, **kwargs)
+
+    def test_level_alert_executes_on_every_match(self):
+        alert = self.alert()
+        for matched in (True, True, False, True):
+            alert.trigger(matched)
+        self.assertEqual(3, self.action.execute.call_count)
+
+    def test_edge_alert_executes_only_when_the_rule_starts_matching(self):
+        alert = self.alert(mode="edge")
+        for matched in (True, True, False, True, True):
+            alert.trigger(matched)
+        self.assertEqual(2, self.action.execute.call_count)
+
+    def test_alert_does_not_execute_during_its_cooldown(self):
+        alert = self.alert(cooldown=60)
+        for self.now in (0, 30, 59, 60, 100):
+            alert.trigger(True)
+        self.assertEqual(2, self.action.execute.call_count)
+
+    def test_limiter_caps_the_rate_of_executions(self):
+        alert = self.alert(limiter=TokenBucket(rate=1, capacity=2, clock=lambda: self.now))
+        for self.now in (0, 0, 0, 0.5, 1):
+            alert.trigger(True)
+        self.assertEqual(3, self.action.execute.call_count)
+
+    def test_an_unknown_mode_throws_ValueError(self):
+        self.assertRaises(ValueError, self.alert, mode="sometimes")
+
+
+class AlertEngineTest(unittest.TestCase):
+    def setUp(self):
+        self.exchange = {"GOOG": Stock("GOOG"), "MSFT": Stock("MSFT")}
+        self.engine = AlertEngine(self.exchange)
+        self.action = mock.MagicMock()
+        self.rule = AndRule(PriceRule("GOOG", lambda stock: stock.price > 10),
+                            PriceRule("MSFT", lambda stock: stock.price > 20))
+        self.engine.add(Alert("sample alert", self.rule, self.action))
+
+    def test_action_is_executed_when_the_rule_matches(self):
+        self.exchange["GOOG"].update(datetime(2014, 2, 10), 11)
+        self.exchange["MSFT"].update(datetime(2014, 2, 10), 21)
+        self.action.execute.assert_called_once_with("sample alert")
+
+    def test_action_is_not_executed_when_the_rule_stops_matching(self):
+        self.exchange["GOOG"].update(datetime(2014, 2, 10), 11)
+        self.exchange["MSFT"].update(datetime(2014, 2, 10), 21)
+        self.exchange["GOOG"].update(datetime(2014, 2, 11), 9)
+        self.action.execute.assert_called_once_with("sample alert")
+
+    def test_only_leaves_of_the_updated_symbol_are_evaluated(self):
+        msft_rule = mock.MagicMock(spec=PriceRule)
+        msft_rule.matches.return_value = True
+        msft_rule.depends_on.return_value = {"MSFT"}
+        self.engine.add(Alert("msft alert", msft_rule, self.action))
+        msft_rule.matches.reset_mock()
+        self.exchange["GOOG"].update(datetime(2014, 2, 10), 11)
+        self.assertFalse(msft_rule.matches.called)
+
+    def test_edge_alerts_execute_once_while_the_rule_matches(self):
+        action = mock.MagicMock()
+        self.engine.add(Alert("edge alert", PriceRule("GOOG", lambda stock: stock.price > 10), action, mode="edge"))
+        for day, price in enumerate([11, 12, 9, 13], start=10):
+            self.exchange["GOOG"].update(datetime(2014, 2, day), price)
+        self.assertEqual(2, action.execute.call_count)
@@ -0,0 +1,63 @@
+import unittest
+from datetime import datetime, timedelta
+
+from stock_alerter.bars import Bar, BarResampler
+from stock_alerter.exchange import Exchange
+from stock_alerter.processor import Processor
+from stock_alerter.reader import ListReader
+
+
+class BarResamplerTest(unittest.TestCase):
+    def resample(self, updates, interval=timedelta(minutes=1)):
+        self.resampler = BarResampler(ListReader(updates), interval)
+        return list(self.resampler.get_bars())
+
+    def test_ticks_of_an_interval_make_one_bar(self):
+        bars = self.resample([("GOOG", datetime(2014, 2, 10, 9, 30, 5), 10),
+                              ("GOOG", datetime(2014, 2, 10, 9, 30, 20), 12),
+                              ("GOOG", datetime(2014, 2, 10, 9, 30, 40), 9),
+                              ("GOOG", datetime(2014, 2, 10, 9, 30, 59), 11)])
+        self.assertEqual([Bar("GOOG", datetime(2014, 2, 10, 9, 30), 10, 12, 9, 11, 4)], bars)
+
+    def test_a_bar_is_emitted_once_any_tick_reaches_its_end(self):
+        resampler = BarResampler(ListReader([("GOOG", datetime(2014, 2, 10, 9, 30, 5), 10),
+                                             ("AAPL", datetime(2014, 2, 10, 9, 30, 30), 20),
+                                             ("AAPL", datetime(2014, 2, 10, 9, 31), 21),
+                                             ("AAPL", datetime(2014, 2, 10, 9, 31, 30), 22)]))
+        bars = resampler.get_bars()
+        self.assertEqual("GOOG", next(bars).symbol)
+        self.assertEqual(Bar("AAPL", datetime(2014, 2, 10, 9, 30), 20, 20, 20, 20, 1), next(bars))
+        self.assertEqual(Bar("AAPL", datetime(2014, 2, 10, 9, 31), 21, 22, 21, 22, 2), next(bars))
+        self.assertRaises(StopIteration, next, bars)
+
+    def test_bars_do_not_straddle_midnight(self):
+        bars = self.resample([("GOOG", datetime(2014, 2, 10, 23, 0), 10),
+                              ("GOOG", datetime(2014, 2, 11, 0, 30), 11)], timedelta(hours=5))
+        self.assertEqual([datetime(2014, 2, 10, 20), datetime(2014, 2, 11)], [bar.start for bar in bars])
+
+    def test_a_tick_within_the_open_bar_but_out_of_order_does_not_move_the_close(self):
+        bars = self.resample([("GOOG", datetime(2014, 2, 10, 9, 30, 30), 10),
+                              ("GOOG", datetime(2014, 2, 10, 9, 30, 10), 8)])
+        self.assertEqual([Bar("GOOG", datetime(2014, 2, 10, 9, 30), 10, 10, 8, 10, 2)], bars)
+
+    def test_late_ticks_are_counted_and_dropped(self):
+        bars = self.resample([("GOOG", datetime(2014, 2, 10, 9, 30, 30), 10),
+                              ("GOOG", datetime(2014, 2, 10, 9, 31, 30), 11),
+                              ("GOOG", datetime(2014, 2, 10, 9, 30, 45), 12)])
+        self.assertEqual([10, 11], [bar.close for bar in bars])
+        self.assertEqual(1, self.resampler.late)
+
+    def test_interval_should_be_positive(self):
+        self.assertRaises(ValueError, BarResampler, ListReader([]), timedelta(0))
+
+    def test_stocks_fed_with_bars_keep_the_daily_closing_prices_of_the_ticks(self):
+        updates = [("GOOG", datetime(2014, 2, 10) + timedelta(seconds=seconds), 10 + seconds % 7)
+                   for seconds in range(0, 3 * 24 * 3600, 997)]
+        ticks, bars = Exchange(), Exchange()
+        Processor(ListReader(updates), ticks).process()
+        Processor(BarResampler(ListReader(updates), timedelta(hours=1)), bars).process()
+        self.assertLess(len(bars["GOOG"].history), len(ticks["GOOG"].history))
+        for day in range(10, 13):
+            on_date = datetime(2014, 2, day)
+            self.assertEqual(ticks["GOOG"].history.get_closing_price(on_date),
+                             bars["GOOG"].history.get_closing_price(on_date))
@@ -0,0 +1,25 @@
+import unittest
+
+from stock_alerter.benchmarks.feeds import generate_updates
+from stock_alerter.benchmarks.suite import compare, run
+
+
+class FeedTest(unittest.TestCase):
+    def test_generated_updates_are_in_timestamp_order_with_positive_prices(self):
+        updates = list(generate_updates(num_symbols=3, num_ticks=500))
+        timestamps = [timestamp for _, timestamp, _ in updates]
+        self.assertEqual(sorted(timestamps), timestamps)
+        self.assertEqual({"S00000", "S00001", "S00002"}, {symbol for symbol, _, _ in updates})
+        self.assertTrue(all(price >= 1 for _, _, price in updates))
+
+
+class SuiteTest(unittest.TestCase):
+    def test_run_returns_a_result_per_measurement(self):
+        results = run(["memory_per_symbol"], scale=0.01)
+        self.assertEqual(["ArrayTimeSeries", "TimeSeries"],
+                         sorted(entry["params"]["series"] for entry in results["results"]))
+
+    def test_compare_gives_the_ratio_to_the_baseline(self):
+        baseline = {"results": [{"benchmark": "b", "metric": "m", "value": 2.0, "unit": "s", "params": {"n": 1}}]}
+        current = {"results": [{"benchmark": "b", "metric": "m", "value": 3.0, "unit": "s", "params": {"n": 1}}]}
+        self.assertEqual([1.5], [ratio for _, ratio in compare(baseline, current)])
@@ -0,0 +1,107 @@
+from datetime import datetime
+from unittest import TestCase, mock
+
+from stock import Stock
+
+from stock_alerter.compiler import CompiledRule, compile_rule
+from stock_alerter.rule import AndRule, NotRule, OrRule, PriceRule, ThresholdRule
+
+
+def above(threshold):
+    return lambda stock: stock.price > threshold
+
+
+def below(threshold):
+    return lambda stock: stock.price < threshold
+
+
+class CompileRuleTest(TestCase):
+    def setUp(self):
+        goog = Stock("GOOG")
+        goog.update(datetime(2014, 2, 10), 11)
+        msft = Stock("MSFT")
+        msft.update(datetime(2014, 2, 11), 12)
+        self.exchange = {"GOOG": goog, "MSFT": msft, "AAPL": Stock("AAPL")}
+
+    def test_a_compiled_rule_matches_like_the_rule_tree(self):
+        rules = [
+            PriceRule("GOOG", above(10)),
+            AndRule(PriceRule("GOOG", above(10)), PriceRule("MSFT", above(10))),
+            AndRule(PriceRule("GOOG", above(10)), PriceRule("MSFT", below(10))),
+            OrRule(PriceRule("GOOG", below(10)), PriceRule("MSFT", above(10))),
+            OrRule(PriceRule("GOOG", below(10)), PriceRule("AAPL", above(1))),
+            AndRule(ThresholdRule("GOOG", "between", 10, 12), ThresholdRule("MSFT", "ge", 12)),
+            OrRule(ThresholdRule("GOOG", "le", 10), ThresholdRule("AAPL", "gt", 1)),
+            NotRule(AndRule(PriceRule("GOOG", above(10)),
+                            OrRule(PriceRule("MSFT", below(10)),
+                                   PriceRule("GOOG", above(5)))))
+        ]
+        for rule in rules:
+            with self.subTest(rule=rule):
+                self.assertIs(rule.matches(self.exchange), compile_rule(rule)(self.exchange))
+
+    def test_empty_composites_match_like_the_rule_tree(self):
+        rules = [
+            AndRule(),
+            OrRule(),
+            NotRule(AndRule()),
+            AndRule(PriceRule("GOOG", above(10)), AndRule()),
+            AndRule(PriceRule("GOOG", above(10)), OrRule()),
+            OrRule(PriceRule("GOOG", below(10)), AndRule()),
+            OrRule(PriceRule("GOOG", below(10)), OrRule())
+        ]
+        for rule in rules:
+            with self.subTest(rule=rule):
+                self.assertIs(rule.matches(self.exchange), compile_rule(rule)(self.exchange))
+
+    def test_a_compiled_rule_is_False_if_a_stock_is_not_in_the_exchange(self):
+        rule = AndRule(PriceRule("GOOG", above(10)), PriceRule("IBM", above(1)))
+        self.assertFalse(compile_rule(rule)(self.exchange))
+
+    def test_a_compiled_rule_is_True_if_a_negated_stock_is_not_in_the_exchange(self):
+        rule = NotRule(PriceRule("IBM", above(1)))
+        self.assertTrue(compile_rule(rule)(self.exchange))
+
+    def test_a_compiled_AndRule_stops_at_the_first_false_component(self):
+        condition = mock.Mock(return_value=True)
+        rule = AndRule(PriceRule("GOOG", below(10)), PriceRule("MSFT", condition))
+        compile_rule(rule, {rule.rules[0]: 0.1})(self.exchange)
+        self.assertFalse(condition.called)
+
+    def test_components_less_likely_to_match_come_first_in_an_AndRule(self):
+        first = PriceRule("GOOG", above(10))
+        second = PriceRule("MSFT", above(10))
+        evaluate = compile_rule(AndRule(first, second), {first: 0.9, second: 0.1})
+        self.assertLess(evaluate.source.index("stock_1)"), evaluate.source.index("stock_0)"))
+
+    def test_components_more_likely_to_match_come_first_in_an_OrRule(self):
+        first = PriceRule("GOOG", above(10))
+        second = PriceRule("MSFT", above(10))
+        evaluate = compile_rule(OrRule(first, second), {first: 0.1, second: 0.9})
+        self.assertLess(evaluate.source.index("stock_1)"), evaluate.source.index("stock_0)"))
+
+    def test_threshold_comparisons_are_inlined(self):
+        evaluate = compile_rule(ThresholdRule("GOOG", "gt", 10))
+        self.assertIn("price_0 > threshold_0", evaluate.source)
+        self.assertTrue(evaluate(self.exchange))
+
+    def test_a_stock_is_looked_up_once_per_evaluation(self):
+        exchange = mock.MagicMock()
+        exchange.__getitem__.return_value = self.exchange["GOOG"]
+        rule = AndRule(PriceRule("GOOG", above(10)), PriceRule("GOOG", below(20)))
+        compile_rule(rule)(exchange)
+        exchange.__getitem__.assert_called_once_with("GOOG")
+
+    def test_rules_without_a_compiled_form_are_matched_directly(self):
+        opaque = mock.Mock()
+        opaque.matches.return_value = True
+        rule = AndRule(PriceRule("GOOG", above(10)), opaque)
+        self.assertTrue(compile_rule(rule)(self.exchange))
+        opaque.matches.assert_called_once_with(self.exchange)
+
+
+class CompiledRuleTest(TestCase):
+    def test_a_CompiledRule_depends_on_the_stocks_of_its_rule(self):
+        rule = CompiledRule(OrRule(PriceRule("GOOG", above(10)),
+                                   PriceRule("MSFT", above(10))))
+        self.assertEqual({"GOOG", "MSFT"}, rule.depends_on())
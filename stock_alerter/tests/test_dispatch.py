@@ -0,0 +1,93 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from stock_alerter.dispatch import ActionDispatcher, DispatchedAction, _encode
+
+
+class RecordingAction:
+    """A picklable action recording its executions in a file, so they can be seen across processes.
+
+    """
+    def __init__(self, filename):
+        self.filename = filename
+
+    def execute(self, content):
+        with open(self.filename, "a") as fp:
+            fp.write(content + "\n")
+
+
+class ActionDispatcherTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.journal = os.path.join(self.directory, "journal")
+        self.record = os.path.join(self.directory, "record")
+
+    def tearDown(self):
+        for filename in (self.journal, self.record):
+            if os.path.exists(filename):
+                os.remove(filename)
+        os.rmdir(self.directory)
+
+    def recorded(self):
+        with open(self.record) as fp:
+            return sorted(fp.read().split())
+
+    def test_dispatched_actions_are_executed_before_the_dispatcher_closes(self):
+        action = mock.Mock()
+        with ActionDispatcher(workers=2) as dispatcher:
+            for i in range(10):
+                DispatchedAction(action, dispatcher).execute("alert {}".format(i))
+        self.assertEqual(10, action.execute.call_count)
+        self.assertEqual(10, dispatcher.executed)
+
+    def test_submitting_does_not_wait_for_the_action(self):
+        started = threading.Event()
+        release = threading.Event()
+        action = mock.Mock()
+        action.execute.side_effect = lambda content: (started.set(), release.wait())
+        with ActionDispatcher(workers=1) as dispatcher:
+            dispatcher.submit(action, "slow alert")
+            dispatcher.submit(action, "queued alert")
+            self.assertTrue(started.wait(5))
+            release.set()
+
+    def test_a_failing_action_is_retried(self):
+        action = mock.Mock()
+        action.execute.side_effect = [ConnectionError, ConnectionError, None]
+        with ActionDispatcher(retries=3, backoff=0) as dispatcher:
+            dispatcher.submit(action, "sample alert")
+        self.assertEqual(3, action.execute.call_count)
+        self.assertEqual((1, 0), (dispatcher.executed, dispatcher.failed))
+
+    def test_an_action_out_of_retries_is_logged_and_dropped(self):
+        action = mock.Mock()
+        action.execute.side_effect = ConnectionError
+        with self.assertLogs("stock_alerter.dispatch"):
+            with ActionDispatcher(retries=2, backoff=0) as dispatcher:
+                dispatcher.submit(action, "sample alert")
+        self.assertEqual(3, action.execute.call_count)
+        self.assertEqual((0, 1), (dispatcher.executed, dispatcher.failed))
+
+    def test_actions_left_in_the_journal_are_executed_on_start(self):
+        action = RecordingAction(self.record)
+        with ActionDispatcher(journal=self.journal) as dispatcher:
+            dispatcher.submit(action, "done")
+        with open(self.journal, "w") as fp:
+            fp.write(json.dumps({"id": 0, "action": _encode(action), "content": "lost"}) + "\n")
+            fp.write(json.dumps({"id": 1, "action": _encode(action), "content": "done"}) + "\n")
+            fp.write(json.dumps({"id": 1, "done": True}) + "\n")
+            fp.write('{"id": 2, "act')
+        with ActionDispatcher(journal=self.journal):
+            pass
+        self.assertEqual(["done", "lost"], self.recorded())
+        self.assertEqual(0, os.path.getsize(self.journal))
+
+    def test_actions_can_run_in_worker_processes(self):
+        with ActionDispatcher(workers=2, processes=True) as dispatcher:
+            for i in range(4):
+                dispatcher.submit(RecordingAction(self.record), "alert{}".format(i))
+        self.assertEqual(["alert0", "alert1", "alert2", "alert3"], self.recorded())
@@ -1,3 +1,4 @@
+import gc
 import unittest
 from unittest import mock
 
@@ -18,3 +19,81 @@ class EventTest(unittest.TestCase):
         event.connect(listener)
         event.fire(5, shape="square")
         listener.assert_called_with(5, shape="square")
+
+    def test_a_listener_connected_twice_is_notified_once(self):
+        listener = mock.Mock()
+        event = Event()
+        event.connect(listener)
+        event.connect(listener)
+        event.fire()
+        self.assertEqual(1, listener.call_count)
+
+    def test_a_disconnected_listener_is_not_notified(self):
+        listener = mock.Mock()
+        event = Event()
+        event.connect(listener)
+        event.disconnect(listener)
+        event.fire()
+        self.assertFalse(listener.called)
+
+    def test_listeners_are_notified_by_priority(self):
+        calls = []
+        event = Event()
+        event.connect(lambda: calls.append("low"), priority=-1)
+        event.connect(lambda: calls.append("default"))
+        event.connect(lambda: calls.append("high"), priority=1)
+        event.fire()
+        self.assertEqual(["high", "default", "low"], calls)
+
+    def test_a_raising_listener_does_not_stop_the_others(self):
+        listener = mock.Mock()
+        event = Event()
+        event.connect(mock.Mock(side_effect=ValueError("first")))
+        event.connect(mock.Mock(side_effect=KeyError("second")))
+        event.connect(listener)
+        with self.assertRaisesRegex(ValueError, "first"):
+            event.fire()
+        self.assertTrue(listener.called)
+
+    def test_exceptions_are_passed_to_the_error_handler(self):
+        error_handler = mock.Mock()
+        error = ValueError()
+        failing = mock.Mock(side_effect=error)
+        event = Event(error_handler)
+        event.connect(failing)
+        event.fire()
+        error_handler.assert_called_once_with(failing, error)
+
+
+class WeakListenerTest(unittest.TestCase):
+    class Listener:
+        def __init__(self):
+            self.calls = 0
+
+        def on_event(self):
+            self.calls += 1
+
+    def test_a_weak_listener_is_notified_while_alive(self):
+        listener = self.Listener()
+        event = Event()
+        event.connect(listener.on_event, weak=True)
+        event.fire()
+        self.assertEqual(1, listener.calls)
+        self.assertEqual([listener.on_event], event.listeners)
+
+    def test_a_weak_listener_is_disconnected_once_collected(self):
+        listener = self.Listener()
+        event = Event()
+        event.connect(listener.on_event, weak=True)
+        del listener
+        gc.collect()
+        self.assertEqual([], event.listeners)
+        self.assertEqual((), event._snapshot)
+
+    def test_a_weak_listener_can_be_disconnected(self):
+        listener = self.Listener()
+        event = Event()
+        event.connect(listener.on_event, weak=True)
+        event.disconnect(listener.on_event)
+        event.fire()
+        self.assertEqual(0, listener.calls)
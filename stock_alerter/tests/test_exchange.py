@@ -0,0 +1,47 @@
+import unittest
+from datetime import datetime
+
+from stock_alerter.exchange import Exchange
+from stock_alerter.processor import Processor
+from stock_alerter.reader import ListReader
+from stock_alerter.rule import PriceRule
+from stock_alerter.stock import Stock
+from stock_alerter.symbols import symbol_id
+from stock_alerter.timeseries import ArrayTimeSeries
+
+
+class ExchangeTest(unittest.TestCase):
+    def test_a_stock_is_created_on_its_first_update(self):
+        exchange = Exchange()
+        Processor(ListReader([("GOOG", datetime(2014, 2, 10), 11), ("GOOG", datetime(2014, 2, 11), 12)]),
+                  exchange).process()
+        self.assertEqual(["GOOG"], list(exchange))
+        self.assertEqual(12, exchange["GOOG"].price)
+
+    def test_created_stocks_use_the_series_factory(self):
+        exchange = Exchange(series_factory=ArrayTimeSeries)
+        self.assertIsInstance(exchange["GOOG"].history, ArrayTimeSeries)
+
+    def test_register_creates_the_missing_stocks(self):
+        exchange = Exchange([Stock("GOOG")])
+        self.assertEqual(2, exchange.register(["AAPL", "GOOG", "MSFT"]))
+        self.assertEqual(["GOOG", "AAPL", "MSFT"], list(exchange))
+
+    def test_stocks_are_looked_up_by_the_id_of_their_symbol(self):
+        exchange = Exchange([Stock("GOOG")])
+        ids = [exchange.symbol_id(symbol) for symbol in ("GOOG", "AAPL", "GOOG", "YHOO")]
+        self.assertEqual(ids[0], ids[2])
+        self.assertEqual(3, len(set(ids)))
+        for symbol, stock_id in zip(("GOOG", "AAPL", "GOOG", "YHOO"), ids):
+            self.assertEqual(stock_id, exchange[symbol].symbol_id)
+            self.assertIs(exchange[symbol], exchange.stock_by_id(stock_id))
+        self.assertRaises(IndexError, exchange.stock_by_id, symbol_id("NOT IN THE EXCHANGE"))
+
+    def test_symbols_are_interned(self):
+        exchange = Exchange()
+        exchange.register(["".join(["GO", "OG"])])
+        self.assertIs("GOOG", next(iter(exchange)))
+
+    def test_a_rule_on_a_stock_without_updates_does_not_match(self):
+        rule = PriceRule("GOOG", lambda stock: stock.price > 10)
+        self.assertFalse(rule.matches(Exchange()))
@@ -0,0 +1,78 @@
+import random
+import unittest
+from datetime import datetime, timedelta
+
+from stock_alerter.indicators import (ExponentialMovingAverage, IndicatorEngine, RollingMaximum, RollingMinimum,
+                                      SimpleMovingAverage)
+from stock_alerter.timeseries import TimeSeries
+
+
+def daily_closes(series, last_date):
+    first_date = next(series.closing_prices())[0]
+    return series.daily_closing_prices(first_date, last_date)
+
+
+def expected_value(name, closes, span):
+    """Computes an indicator from scratch over a list of daily closes, the last one included.
+
+    """
+    if name == "ema":
+        average = closes[0]
+        for close in closes[1:]:
+            average += 2 / (span + 1) * (close - average)
+        return average
+    if len(closes) < span:
+        return None
+    window = closes[-span:]
+    return {"sma": sum(window) / span, "min": min(window), "max": max(window)}[name]
+
+
+class IndicatorEngineTest(unittest.TestCase):
+    SPANS = {"sma": 5, "ema": 4, "min": 3, "max": 6}
+
+    def setUp(self):
+        self.series = TimeSeries()
+        self.engine = IndicatorEngine(self.series)
+        self.engine.add("sma", SimpleMovingAverage(5))
+        self.engine.add("ema", ExponentialMovingAverage(4))
+        self.engine.add("min", RollingMinimum(3))
+        self.engine.add("max", RollingMaximum(6))
+
+    def update(self, timestamp, price):
+        self.series.update(timestamp, price)
+        self.engine.update(timestamp)
+
+    def assertValues(self, last_date):
+        closes = daily_closes(self.series, last_date)
+        for name, span in self.SPANS.items():
+            expected = expected_value(name, closes, span)
+            committed = expected_value(name, closes[:-1], span) if len(closes) > 1 else None
+            if expected is None:
+                self.assertIsNone(self.engine.value(name), name)
+            else:
+                self.assertAlmostEqual(expected, self.engine.value(name), msg=name)
+            if committed is None:
+                self.assertIsNone(self.engine.committed_value(name), name)
+            else:
+                self.assertAlmostEqual(committed, self.engine.committed_value(name), msg=name)
+
+    def test_indicators_match_a_computation_from_scratch(self):
+        rng = random.Random(0)
+        timestamp = datetime(2014, 2, 1, 10)
+        for _ in range(200):
+            timestamp += timedelta(hours=rng.choice([1, 5, 24, 49]))
+            self.update(timestamp, rng.randint(1, 100))
+            self.assertValues(timestamp.date())
+
+    def test_an_update_to_a_past_day_rebuilds_the_indicators(self):
+        for day in range(1, 10):
+            self.update(datetime(2014, 2, day, 16), day * 10)
+        self.update(datetime(2014, 2, 3, 17), 500)
+        self.assertValues(datetime(2014, 2, 9).date())
+
+    def test_an_indicator_added_later_starts_from_the_history(self):
+        for day in range(1, 10):
+            self.update(datetime(2014, 2, day, 16), day * 10)
+        self.engine.add("sma3", SimpleMovingAverage(3))
+        self.assertEqual((70 + 80 + 90) / 3, self.engine.value("sma3"))
+        self.assertEqual((60 + 70 + 80) / 3, self.engine.committed_value("sma3"))
@@ -0,0 +1,115 @@
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+from stock_alerter.__main__ import load_alerts, main
+from stock_alerter.benchmarks.feeds import write_csv
+from stock_alerter.exchange import Exchange
+from stock_alerter.tickfile import convert
+
+PACKAGE_DIRECTORY = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class MainTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, "updates.csv")
+        write_csv(self.filename, [("GOOG", datetime(2014, 2, 10) + timedelta(minutes=i), price)
+                                  for i, price in enumerate([10, 12, 9, 13, 14])])
+        self.config = os.path.join(self.directory, "alerts.json")
+
+    def tearDown(self):
+        for name in os.listdir(self.directory):
+            os.remove(os.path.join(self.directory, name))
+        os.rmdir(self.directory)
+
+    def replay(self, alerts, *args):
+        with open(self.config, "w") as fp:
+            json.dump({"alerts": alerts}, fp)
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            main([self.filename, "--config", self.config] + list(args))
+        return stdout.getvalue().splitlines(), stderr.getvalue()
+
+    def test_alerts_of_the_config_are_executed_during_the_replay(self):
+        printed, stats = self.replay([{"description": "GOOG above 11", "mode": "edge",
+                                       "rule": {"symbol": "GOOG", "comparison": "gt", "threshold": 11}}])
+        self.assertEqual(["GOOG above 11", "GOOG above 11"], printed)
+        self.assertIn("replayed 5 updates of 1 symbols", stats)
+        self.assertIn("2 alert actions executed", stats)
+
+    def test_tick_files_and_bars_are_replayed(self):
+        convert(self.filename, os.path.join(self.directory, "updates.ticks"))
+        self.filename = os.path.join(self.directory, "updates.ticks")
+        printed, stats = self.replay([{"description": "GOOG above 13", "rule": {"symbol": "GOOG", "comparison": "gt",
+                                                                               "threshold": 13}}], "--bars", "3600")
+        self.assertEqual(["GOOG above 13"], printed)
+        self.assertIn("replayed 5 updates", stats)
+
+    def test_an_invalid_config_exits_with_an_error(self):
+        with contextlib.redirect_stderr(io.StringIO()):
+            self.assertRaises(SystemExit, self.replay,
+                              [{"description": "bad", "action": "beep",
+                                "rule": {"symbol": "GOOG", "comparison": "gt", "threshold": 1}}])
+
+    def test_invalid_input_exits_with_an_error(self):
+        with open(self.config, "w") as fp:
+            json.dump([1, 2], fp)
+        missing = os.path.join(self.directory, "missing")
+        for argv in ([self.filename, "--config", self.config], [self.filename, "--config", missing], [missing],
+                     [self.filename, "--offset", "-1"], [self.filename, "--bars", "-60"],
+                     [self.filename, "--batch-size", "0"]):
+            with self.subTest(argv=argv), contextlib.redirect_stderr(io.StringIO()) as stderr:
+                self.assertRaises(SystemExit, main, argv)
+                self.assertIn("error:", stderr.getvalue())
+
+    def test_updates_with_a_negative_price_are_skipped(self):
+        write_csv(self.filename, [("GOOG", datetime(2014, 2, 10), 10), ("GOOG", datetime(2014, 2, 11), -1),
+                                  ("GOOG", datetime(2014, 2, 12), 12)])
+        printed, stats = self.replay([{"description": "GOOG above 11",
+                                       "rule": {"symbol": "GOOG", "comparison": "gt", "threshold": 11}}])
+        self.assertEqual(["GOOG above 11"], printed)
+        self.assertIn("replayed 3 updates of 1 symbols", stats)
+        self.assertIn("1 skipped for a negative price", stats)
+
+    def test_a_failing_action_does_not_stop_the_replay(self):
+        with mock.patch("stock_alerter.action.EmailAction.execute", side_effect=OSError("unknown host")):
+            printed, stats = self.replay([
+                {"description": "GOOG above 11", "action": {"email": "a@b.com"}, "mode": "edge",
+                 "rule": {"symbol": "GOOG", "comparison": "gt", "threshold": 11}},
+                {"description": "GOOG above 13", "rule": {"symbol": "GOOG", "comparison": "gt", "threshold": 13}}])
+        self.assertEqual(["GOOG above 13"], printed)
+        self.assertIn("replayed 5 updates", stats)
+        self.assertIn("1 alert actions executed, 2 failed", stats)
+
+    def test_a_malformed_update_stops_the_replay_with_an_error(self):
+        with open(self.filename, "a") as fp:
+            fp.write("GOOG,not a timestamp,12\n")
+        with self.assertRaises(SystemExit) as raised:
+            main([self.filename])
+        self.assertIn("replay of {} stopped".format(self.filename), str(raised.exception.code))
+
+    def test_replaying_does_not_import_the_unused_modules(self):
+        code = ("import sys; from stock_alerter.__main__ import main; main([{!r}]); "
+                "print(sorted(set(sys.modules) & {{'asyncio', 'email', 'logging', 'multiprocessing', 'smtplib'}}))")
+        output = subprocess.run([sys.executable, "-c", code.format(self.filename)], cwd=PACKAGE_DIRECTORY,
+                                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, universal_newlines=True).stdout
+        self.assertEqual("[]", output.strip())
+
+
+class LoadAlertsTest(unittest.TestCase):
+    def test_composite_rules_are_loaded(self):
+        exchange = Exchange()
+        alerts = load_alerts({"alerts": [{"description": "GOOG and not AAPL", "action": {"email": "a@b.com"},
+                                          "rule": {"and": [{"symbol": "GOOG", "comparison": "gt", "threshold": 10},
+                                                           {"not": {"symbol": "AAPL", "comparison": "between",
+                                                                    "threshold": 5, "upper": 8}}]}}]}, exchange)
+        self.assertEqual({"GOOG", "AAPL"}, alerts[0].rule.depends_on())
+        self.assertEqual({"GOOG", "AAPL"}, set(exchange))
@@ -0,0 +1,94 @@
+import io
+import json
+import unittest
+from datetime import datetime
+from unittest import mock
+
+from stock_alerter import metrics
+from stock_alerter.alert import Alert, AlertEngine
+from stock_alerter.processor import Processor
+from stock_alerter.reader import ListReader
+from stock_alerter.rule import PriceRule, ThresholdRule
+from stock_alerter.stock import Stock
+from stock_alerter.threshold import ThresholdEngine
+
+
+class HistogramTest(unittest.TestCase):
+    def test_percentile_is_the_upper_bound_of_its_bucket(self):
+        histogram = metrics.Histogram()
+        for microseconds in [1, 2, 3, 100]:
+            histogram.observe(microseconds / 1e6)
+        self.assertEqual(4, histogram.count)
+        self.assertAlmostEqual(4e-6, histogram.percentile(0.5))
+        self.assertAlmostEqual(100e-6, histogram.percentile(1.0))
+
+
+class MetricsTest(unittest.TestCase):
+    def setUp(self):
+        self.exchange = {"GOOG": Stock("GOOG")}
+        self.action = mock.MagicMock()
+        Alert("GOOG > $10", PriceRule("GOOG", lambda stock: stock.price > 10), self.action).connect(self.exchange)
+        self.reader = ListReader([("GOOG", datetime(2014, 2, 11), 5), ("GOOG", datetime(2014, 2, 12), 15)])
+
+    def tearDown(self):
+        metrics.disable()
+
+    def test_nothing_is_collected_by_default(self):
+        self.assertIsNone(metrics.collector)
+        Processor(self.reader, self.exchange).process()
+        self.assertTrue(self.action.execute.called)
+
+    def test_hot_path_stages_are_measured_when_enabled(self):
+        collector = metrics.enable()
+        Processor(self.reader, self.exchange).process()
+        snapshot = collector.snapshot()
+        self.assertEqual(2, snapshot["stages"]["processor.update"]["count"])
+        self.assertEqual(2, snapshot["stages"]["event.fire"]["count"])
+        self.assertEqual(2, snapshot["stages"]["rule.matches"]["count"])
+        self.assertEqual(1, snapshot["stages"]["action.execute"]["count"])
+        self.assertEqual(2, snapshot["symbols"]["GOOG"]["updates"])
+        self.assertEqual(2, snapshot["alerts"]["GOOG > $10"]["evaluations"])
+
+    def test_alerts_of_the_engines_are_measured_when_enabled(self):
+        # An AlertEngine triggers its alerts on every update, a ThresholdEngine only when their rule result changes.
+        for engine_class, evaluations in ((AlertEngine, 2), (ThresholdEngine, 1)):
+            exchange = {"GOOG": Stock("GOOG")}
+            engine = engine_class(exchange)
+            engine.add(Alert("GOOG above 10", ThresholdRule("GOOG", "gt", 10), self.action, mode="edge"))
+            collector = metrics.enable()
+            Processor(ListReader([("GOOG", datetime(2014, 2, 11), 5), ("GOOG", datetime(2014, 2, 12), 15)]),
+                      exchange).process()
+            snapshot = collector.snapshot()
+            with self.subTest(engine=engine_class.__name__):
+                self.assertEqual(2, snapshot["stages"]["rule.matches"]["count"])
+                self.assertEqual(1, snapshot["stages"]["action.execute"]["count"])
+                self.assertEqual(evaluations, snapshot["alerts"]["GOOG above 10"]["evaluations"])
+
+    def test_events_are_no_longer_measured_once_disabled(self):
+        collector = metrics.enable()
+        metrics.disable()
+        metrics.collector = collector
+        self.addCleanup(setattr, metrics, "collector", None)
+        Processor(self.reader, self.exchange).process()
+        self.assertNotIn("event.fire", collector.snapshot()["stages"])
+
+    def test_dump_writes_a_line_of_json(self):
+        collector = metrics.enable()
+        Processor(self.reader, self.exchange).process()
+        fp = io.StringIO()
+        collector.dump(fp)
+        self.assertEqual(2, json.loads(fp.getvalue())["symbols"]["GOOG"]["updates"])
+
+    def test_periodic_dumps_survive_symbols_added_while_dumping(self):
+        collector = metrics.enable()
+        fp = io.StringIO()
+        collector.start_dumping(0, fp)
+        self.addCleanup(collector.stop_dumping)
+        for i in range(20000):
+            collector.count_updates("S{}".format(i))
+            collector.observe("stage{}".format(i % 100), 1e-6)
+            collector.observe_alert("alert {}".format(i), 1e-6)
+        thread, _ = collector._dumper
+        self.assertTrue(thread.is_alive())
+        collector.stop_dumping()
+        self.assertTrue(fp.getvalue())
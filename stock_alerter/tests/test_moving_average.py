@@ -1,9 +1,10 @@
+import collections
 import unittest
-from datetime import datetime
+from datetime import date, datetime
 
 from timeseries import TimeSeries
 
-from stock_alerter.moving_average import MovingAverage
+from stock_alerter.moving_average import MovingAverage, RollingMovingAverage, RollingSum
 
 
 class StockCrossoverSignalTest(unittest.TestCase):
@@ -17,3 +18,49 @@ class StockCrossoverSignalTest(unittest.TestCase):
     def test_calculation_of_three_day_moving_average(self):
         expected_moving_average = (42.63 + 78.39 + 71.54) / 3
         self.assertAlmostEquals(expected_moving_average, self.current_ma.value_on(datetime(2014, 4, 23)), places=4)
+
+
+class RollingSumTest(unittest.TestCase):
+    def test_sums_of_different_spans_share_one_window(self):
+        window = collections.deque()
+        sums = [RollingSum(2), RollingSum(3)]
+        for value in [0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7]:
+            for rolling_sum in sums:
+                rolling_sum.push(value, window)
+            window.append(value)
+            for rolling_sum in sums:
+                self.assertAlmostEqual(sum(list(window)[-rolling_sum.span:]), rolling_sum.total)
+
+    def test_the_last_value_is_revised(self):
+        window = collections.deque([1, 2])
+        rolling_sum = RollingSum(2)
+        rolling_sum.total = 3
+        rolling_sum.revise(5, window)
+        self.assertEqual(6, rolling_sum.total)
+
+
+class RollingMovingAverageTest(unittest.TestCase):
+    def setUp(self):
+        self.series = TimeSeries()
+        self.rolling_ma = RollingMovingAverage(self.series, 3)
+
+    def _update(self, timestamp, value):
+        self.series.update(timestamp, value)
+        self.rolling_ma.update(timestamp)
+
+    def test_rolling_average_matches_recalculated_average(self):
+        self._update(datetime(2014, 4, 21), 42.63)
+        self._update(datetime(2014, 4, 22), 78.39)
+        self._update(datetime(2014, 4, 24), 71.54)
+        self._update(datetime(2014, 4, 24, 12), 70.12)
+        for day in (23, 24, 27):
+            on_date = datetime(2014, 4, day)
+            self.assertAlmostEqual(MovingAverage(self.series, 3).value_on(on_date),
+                                   self.rolling_ma.value_on(on_date), places=4)
+
+    def test_rolling_average_is_rebuilt_after_an_out_of_order_update(self):
+        self._update(datetime(2014, 4, 21), 42.63)
+        self._update(datetime(2014, 4, 23), 71.54)
+        self._update(datetime(2014, 4, 22), 78.39)
+        expected_moving_average = (42.63 + 78.39 + 71.54) / 3
+        self.assertAlmostEqual(expected_moving_average, self.rolling_ma.values[date(2014, 4, 23)], places=4)
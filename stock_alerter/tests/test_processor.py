@@ -0,0 +1,114 @@
+import asyncio
+import multiprocessing
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from unittest import mock
+
+from stock_alerter.alert import Alert, AlertEngine
+from stock_alerter.exchange import Exchange
+from stock_alerter.processor import AsyncProcessor, ParallelProcessor, Processor
+from stock_alerter.reader import AsyncReader, ListReader
+from stock_alerter.rule import AndRule, ThresholdRule
+from stock_alerter.stock import Stock
+
+
+class ProcessorTest(unittest.TestCase):
+    def setUp(self):
+        self.exchange = {"GOOG": Stock("GOOG"), "AAPL": Stock("AAPL"), "MSFT": Stock("MSFT")}
+        self.updates = [
+            ("GOOG", datetime(2014, 2, 11, 14, 10), 5),
+            ("AAPL", datetime(2014, 2, 11, 14, 10), 8),
+            ("GOOG", datetime(2014, 2, 11, 14, 11), 3),
+            ("MSFT", datetime(2014, 2, 11, 14, 11), 30),
+            ("AAPL", datetime(2014, 2, 11, 14, 12), 10),
+            ("GOOG", datetime(2014, 2, 11, 14, 12), 15)
+        ]
+
+    def test_processor_updates_the_stocks_in_the_exchange(self):
+        Processor(ListReader(self.updates), self.exchange).process()
+        self.assertEqual(15, self.exchange["GOOG"].price)
+        self.assertEqual(10, self.exchange["AAPL"].price)
+
+    def test_batching_processor_fires_one_event_per_symbol_per_batch(self):
+        listener = mock.Mock()
+        self.exchange["GOOG"].update_event.connect(listener)
+        Processor(ListReader(self.updates), self.exchange, batch_size=4).process()
+        self.assertEqual(2, listener.call_count)
+        self.assertEqual([5, 3, 15], [update.value for update in self.exchange["GOOG"].history])
+
+    def test_async_processor_updates_the_stocks_in_the_exchange(self):
+        asyncio.run(AsyncProcessor(AsyncReader(ListReader(self.updates)), self.exchange).process())
+        self.assertEqual(15, self.exchange["GOOG"].price)
+        self.assertEqual(30, self.exchange["MSFT"].price)
+
+    @unittest.skipUnless("fork" in multiprocessing.get_all_start_methods(), "requires the fork start method")
+    def test_parallel_processor_merges_the_stocks_updated_by_its_workers(self):
+        ParallelProcessor(ListReader(self.updates), self.exchange, processes=2).process()
+        self.assertEqual([5, 3, 15], [update.value for update in self.exchange["GOOG"].history])
+        self.assertEqual(10, self.exchange["AAPL"].price)
+        self.assertEqual(30, self.exchange["MSFT"].price)
+
+    def test_parallel_processor_throws_KeyError_for_a_symbol_not_in_the_exchange(self):
+        processor = ParallelProcessor(ListReader([("YHOO", datetime(2014, 2, 11), 9)]), self.exchange, processes=2)
+        self.assertRaises(KeyError, processor.process)
+
+    @unittest.skipUnless("fork" in multiprocessing.get_all_start_methods(), "requires the fork start method")
+    def test_parallel_processor_creates_the_stocks_of_an_Exchange(self):
+        exchange = Exchange()
+        ParallelProcessor(ListReader(self.updates), exchange, processes=2).process()
+        self.assertEqual(["GOOG", "AAPL", "MSFT"], list(exchange))
+        self.assertEqual([5, 3, 15], [update.value for update in exchange["GOOG"].history])
+
+    def test_parallel_processor_gives_the_symbols_of_an_engine_alert_to_one_worker(self):
+        engine = AlertEngine(self.exchange)
+        engine.add(Alert("GOOG and AAPL", AndRule(ThresholdRule("GOOG", "gt", 5), ThresholdRule("AAPL", "gt", 5)),
+                         mock.Mock()))
+        owners = ParallelProcessor(ListReader([]), self.exchange, processes=2)._assign_owners()
+        self.assertEqual(owners["GOOG"], owners["AAPL"])
+
+    @unittest.skipUnless("fork" in multiprocessing.get_all_start_methods(), "requires the fork start method")
+    def test_parallel_processor_executes_engine_alerts_on_several_symbols(self):
+        directory = tempfile.mkdtemp()
+        filename = os.path.join(directory, "alerts")
+        self.addCleanup(os.rmdir, directory)
+        self.addCleanup(os.remove, filename)
+        engine = AlertEngine(self.exchange)
+        engine.add(Alert("GOOG and AAPL", AndRule(ThresholdRule("GOOG", "gt", 5), ThresholdRule("AAPL", "gt", 5)),
+                         FileAction(filename), mode="edge"))
+        ParallelProcessor(ListReader(self.updates), self.exchange, processes=2).process()
+        with open(filename) as fp:
+            self.assertEqual(["GOOG and AAPL"], fp.read().splitlines())
+
+    @unittest.skipUnless("fork" in multiprocessing.get_all_start_methods(), "requires the fork start method")
+    def test_parallel_processor_throws_RuntimeError_when_a_worker_dies(self):
+        for exit_code in (0, 1):
+            exchange = {"GOOG": Stock("GOOG"), "AAPL": Stock("AAPL")}
+            exchange["GOOG"].update_event.connect(lambda stock, exit_code=exit_code: os._exit(exit_code))
+            updates = [("GOOG", datetime(2014, 2, 11), 5)] + [("AAPL", datetime(2014, 2, 11), 8)] * 100
+            processor = ParallelProcessor(ListReader(updates), exchange, processes=2)
+            processor.CHUNK_SIZE = 1
+            processor.POLL_INTERVAL = 0.05
+            with self.subTest(exit_code=exit_code):
+                self.assertRaises(RuntimeError, processor.process)
+
+    @unittest.skipUnless("fork" in multiprocessing.get_all_start_methods(), "requires the fork start method")
+    def test_parallel_processor_throws_RuntimeError_when_a_worker_dies_with_its_queue_full(self):
+        exchange = {"GOOG": Stock("GOOG"), "AAPL": Stock("AAPL")}
+        exchange["GOOG"].update_event.connect(lambda stock: os._exit(1))
+        updates = [("GOOG", datetime(2014, 2, 11), 5)] * 100
+        processor = ParallelProcessor(ListReader(updates), exchange, processes=2)
+        processor.CHUNK_SIZE = 1
+        processor.POLL_INTERVAL = 0.05
+        self.assertRaises(RuntimeError, processor.process)
+
+
+class FileAction:
+    def __init__(self, filename):
+        self.filename = filename
+        open(filename, "w").close()
+
+    def execute(self, content):
+        with open(self.filename, "a") as fp:
+            fp.write(content + "\n")
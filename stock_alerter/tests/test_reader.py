@@ -0,0 +1,40 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime
+
+from stock_alerter.reader import FileReader, ListReader, TIMESTAMP_FORMAT, parse_timestamp
+
+
+class ParseTimestampTest(unittest.TestCase):
+    def test_timestamp_is_parsed_like_strptime(self):
+        for timestamp in ["2014-02-11T14:10:22.13", "2014-02-11T00:00:00.0", "2014-02-11T09:05:01.123456"]:
+            self.assertEqual(datetime.strptime(timestamp, TIMESTAMP_FORMAT), parse_timestamp(timestamp))
+
+    def test_malformed_timestamp_throws_ValueError(self):
+        self.assertRaises(ValueError, parse_timestamp, "2014-02-11T14:10:22")
+
+
+class FileReaderTest(unittest.TestCase):
+    def setUp(self):
+        fd, self.filename = tempfile.mkstemp(suffix=".csv")
+        with os.fdopen(fd, "w") as fp:
+            fp.write("GOOG,2014-02-11T14:10:22.13,5\n\nAAPL,2014-02-11T00:00:00.0,8\n")
+
+    def tearDown(self):
+        os.remove(self.filename)
+
+    def test_file_reader_yields_each_update_and_skips_blank_lines(self):
+        updates = list(FileReader(self.filename).get_updates())
+        self.assertEqual([
+            ("GOOG", datetime(2014, 2, 11, 14, 10, 22, 130000), 5),
+            ("AAPL", datetime(2014, 2, 11), 8)
+        ], updates)
+
+    def test_file_reader_skips_the_updates_before_its_offset(self):
+        updates = list(FileReader(self.filename, offset=1).get_updates())
+        self.assertEqual([("AAPL", datetime(2014, 2, 11), 8)], updates)
+
+    def test_a_negative_offset_throws_ValueError(self):
+        self.assertRaises(ValueError, FileReader, self.filename, offset=-1)
+        self.assertRaises(ValueError, ListReader, [], offset=-1)
@@ -3,7 +3,7 @@ from unittest import TestCase
 
 from stock import Stock
 
-from stock_alerter.rule import PriceRule, AndRule
+from stock_alerter.rule import PriceRule, AndRule, OrRule, NotRule, ThresholdRule
 
 
 class TestPriceRule(TestCase):
@@ -110,3 +110,93 @@ class TestAndRule(TestCase):
                             PriceRule("YHOO", lambda stock: stock.price < 10))
         rule = AndRule(and_rule2, and_rule3)
         self.assertTrue(rule.matches(self.exchange))
+
+
+class TestOrRule(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        goog = Stock("GOOG")
+        goog.update(datetime(2014, 2, 10), 11)
+        msft = Stock("MSFT")
+        msft.update(datetime(2014, 2, 11), 12)
+        cls.exchange = {"GOOG": goog, "MSFT": msft}
+
+    def test_an_OrRule_matches_if_any_component_rule_is_true(self):
+        """Tests if True is returned if one component rule of an OrRule is true.
+
+        """
+        rule = OrRule(PriceRule("GOOG", lambda stock: stock.price < 8),
+                      PriceRule("MSFT", lambda stock: stock.price > 10))
+        self.assertTrue(rule.matches(self.exchange))
+
+    def test_an_OrRule_is_False_if_no_component_rule_is_true(self):
+        """Tests if False is returned if no component rule of an OrRule is true.
+
+        """
+        rule = OrRule(PriceRule("GOOG", lambda stock: stock.price < 8),
+                      PriceRule("MSFT", lambda stock: stock.price < 10))
+        self.assertFalse(rule.matches(self.exchange))
+
+    def test_an_OrRule_depends_on_the_stocks_of_its_components(self):
+        """Tests if an OrRule depends on the stocks of all its component rules.
+
+        """
+        rule = OrRule(PriceRule("GOOG", lambda stock: stock.price < 8),
+                      PriceRule("MSFT", lambda stock: stock.price < 10))
+        self.assertEqual({"GOOG", "MSFT"}, rule.depends_on())
+
+
+class TestNotRule(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        goog = Stock("GOOG")
+        goog.update(datetime(2014, 2, 10), 11)
+        cls.exchange = {"GOOG": goog}
+
+    def test_a_NotRule_matches_if_its_component_rule_is_false(self):
+        """Tests if True is returned if the component rule of a NotRule is false.
+
+        """
+        rule = NotRule(PriceRule("GOOG", lambda stock: stock.price < 8))
+        self.assertTrue(rule.matches(self.exchange))
+
+    def test_a_NotRule_is_False_if_its_component_rule_is_true(self):
+        """Tests if False is returned if the component rule of a NotRule is true.
+
+        """
+        rule = NotRule(PriceRule("GOOG", lambda stock: stock.price > 8))
+        self.assertFalse(rule.matches(self.exchange))
+
+
+class TestThresholdRule(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        goog = Stock("GOOG")
+        goog.update(datetime(2014, 2, 10), 11)
+        cls.exchange = {"GOOG": goog, "AAPL": Stock("AAPL")}
+
+    def test_a_ThresholdRule_compares_the_price_to_its_thresholds(self):
+        """Tests each comparison against the price of the stock.
+
+        """
+        cases = [("gt", 10, None, True), ("gt", 11, None, False), ("ge", 11, None, True), ("lt", 11, None, False),
+                 ("le", 11, None, True), ("between", 11, 12, True), ("between", 5, 10, False)]
+        for comparison, threshold, upper, expected in cases:
+            with self.subTest(comparison=comparison, threshold=threshold):
+                rule = ThresholdRule("GOOG", comparison, threshold, upper)
+                self.assertIs(expected, rule.matches(self.exchange))
+
+    def test_a_ThresholdRule_is_False_if_the_stock_hasnt_got_an_update_yet(self):
+        """Tests if False is returned if the stock has no price or is not in the exchange.
+
+        """
+        self.assertFalse(ThresholdRule("AAPL", "lt", 10).matches(self.exchange))
+        self.assertFalse(ThresholdRule("MSFT", "lt", 10).matches(self.exchange))
+
+    def test_a_between_ThresholdRule_needs_an_upper_bound(self):
+        """Tests if a between rule without an upper bound is rejected.
+
+        """
+        self.assertRaises(ValueError, ThresholdRule, "GOOG", "between", 10)
+        self.assertRaises(ValueError, ThresholdRule, "GOOG", "gt", 10, 20)
+        self.assertRaises(ValueError, ThresholdRule, "GOOG", "eq", 10)
@@ -0,0 +1,75 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from stock import Stock
+
+from stock_alerter.snapshot import load_snapshot, save_snapshot
+from stock_alerter.timeseries import ArrayTimeSeries, TimeSeries
+
+
+def feed(start, days):
+    """Returns a few updates a day, with prices wandering up and down so that crossover signals occur.
+
+    """
+    updates = []
+    for day in range(days):
+        for hour in (10, 13, 16):
+            price = 20 + (day * 7 + hour) % 11
+            updates.append((start + timedelta(days=day, hours=hour), price))
+    return updates
+
+
+class SnapshotTest(unittest.TestCase):
+    def setUp(self):
+        fd, self.filename = tempfile.mkstemp(suffix=".snapshot")
+        os.close(fd)
+        self.updates = feed(datetime(2014, 2, 1), 30)
+
+    def tearDown(self):
+        os.remove(self.filename)
+
+    def exchange(self, history):
+        stock = Stock("GOOG", history)
+        for timestamp, price in self.updates[:60]:
+            stock.update(timestamp, price)
+        return {"GOOG": stock, "AAPL": Stock("AAPL")}
+
+    def assertSameState(self, expected, actual):
+        self.assertEqual(expected.price, actual.price)
+        self.assertEqual(list(expected.history.series), list(actual.history.series))
+        self.assertEqual(list(expected.history.closing_prices()), list(actual.history.closing_prices()))
+        for moving_average in ("short_term_moving_average", "long_term_moving_average"):
+            self.assertEqual(getattr(expected, moving_average).get_state(), getattr(actual, moving_average).get_state())
+        on_dates = [datetime(2014, 2, 1) + timedelta(days=day) for day in range(30)]
+        self.assertEqual([expected.get_crossover_signal(on_date).value for on_date in on_dates],
+                         [actual.get_crossover_signal(on_date).value for on_date in on_dates])
+
+    def test_loaded_stocks_have_the_saved_state(self):
+        for history in (TimeSeries(), ArrayTimeSeries(max_days=20, compact=True)):
+            with self.subTest(series=type(history).__name__):
+                exchange = self.exchange(history)
+                save_snapshot(exchange, self.filename, offset=60)
+                loaded, offset = load_snapshot(self.filename)
+                self.assertEqual(60, offset)
+                self.assertEqual(["GOOG", "AAPL"], list(loaded))
+                self.assertIsNone(loaded["AAPL"].price)
+                self.assertEqual((history.max_days, history.compact),
+                                 (loaded["GOOG"].history.max_days, loaded["GOOG"].history.compact))
+                self.assertSameState(exchange["GOOG"], loaded["GOOG"])
+
+    def test_loaded_stocks_continue_like_the_saved_ones(self):
+        exchange = self.exchange(TimeSeries())
+        save_snapshot(exchange, self.filename)
+        loaded, offset = load_snapshot(self.filename)
+        self.assertIsNone(offset)
+        for timestamp, price in self.updates[60:]:
+            exchange["GOOG"].update(timestamp, float(price))
+            loaded["GOOG"].update(timestamp, price)
+        self.assertSameState(exchange["GOOG"], loaded["GOOG"])
+
+    def test_file_that_is_not_a_snapshot_file_throws_ValueError(self):
+        with open(self.filename, "wb") as fp:
+            fp.write(b"GOOG,2014-02-11T14:10:22.13,5\n")
+        self.assertRaises(ValueError, load_snapshot, self.filename)
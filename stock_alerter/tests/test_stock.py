@@ -1,7 +1,10 @@
 import unittest
-from datetime import datetime
+from datetime import datetime, timedelta
+from unittest import mock
 
+from stock_alerter.indicators import SimpleMovingAverage
 from stock_alerter.stock import Stock, StockSignal
+from stock_alerter.timeseries import TimeSeries
 
 
 class StockTest(unittest.TestCase):
@@ -24,6 +27,25 @@ class StockTest(unittest.TestCase):
         self.stock.update(datetime(2014, 2, 16), price=23.12)
         self.assertAlmostEqual(23.12, self.stock.price, places=4)
 
+    def test_update_many_fires_a_single_event_with_the_latest_price(self):
+        listener = mock.Mock()
+        self.stock.update_event.connect(listener)
+        self.stock.update_many([(datetime(2014, 2, 12), 10), (datetime(2014, 2, 14), 14), (datetime(2014, 2, 13), 13)])
+        listener.assert_called_once_with(self.stock)
+        self.assertEqual(14, self.stock.price)
+
+    def test_update_many_with_a_negative_price_throws_ValueError(self):
+        updates = [(datetime(2014, 2, 12), 10), (datetime(2014, 2, 13), -1)]
+        self.assertRaises(ValueError, self.stock.update_many, updates)
+        self.assertIsNone(self.stock.price)
+
+    def test_indicators_are_updated_with_the_stock(self):
+        self.stock.indicators.add("sma2", SimpleMovingAverage(2))
+        self.stock.update(datetime(2014, 2, 12), 10)
+        self.stock.update_many([(datetime(2014, 2, 13), 13), (datetime(2014, 2, 14), 14)])
+        self.assertEqual(13.5, self.stock.indicators.value("sma2"))
+        self.assertEqual(11.5, self.stock.indicators.committed_value("sma2"))
+
     def test_price_is_the_latest_even_if_updates_are_made_out_of_order(self):
         self.stock.update(datetime(2014, 2, 10), price=10.2)
         self.stock.update(datetime(2014, 2, 15), price=15.789)
@@ -118,3 +140,52 @@ class StockCrossoverSignalTest(unittest.TestCase):
 
     def test_insufficient_data_returns_neutral_stock_signal(self):
         self.assertEquals(StockSignal.neutral, self.stock.get_crossover_signal(datetime(2014, 5, 9)))
+
+    def test_batch_signals_match_the_signal_of_each_day(self):
+        start_date, end_date = datetime(2014, 5, 1), datetime(2014, 5, 25)
+        signals = self.stock.get_crossover_signals(start_date, end_date)
+        expected_signals = [self.stock.get_crossover_signal(start_date + timedelta(days=i)).value
+                            for i in range((end_date - start_date).days + 1)]
+        self.assertEqual(expected_signals, signals.tolist())
+
+    def test_batch_signals_of_a_stock_without_updates_are_neutral(self):
+        apple = Stock("AAPL")
+        signals = apple.get_crossover_signals(datetime(2014, 5, 1), datetime(2014, 5, 3))
+        self.assertEqual([StockSignal.neutral] * 3, [StockSignal(code) for code in signals])
+
+    def test_crossover_signal_with_bounded_history_matches_full_history(self):
+        bounded = Stock("GOOG", TimeSeries(max_days=Stock.LONG_TERM_TIME_SPAN + 1, compact=True))
+        for update in self.stock.history:
+            bounded.update(update.timestamp, update.value)
+        self.assertEquals(StockSignal.sell, bounded.get_crossover_signal(datetime(2014, 5, 20)))
+        self.assertLessEqual(len(bounded.long_term_moving_average.values), Stock.LONG_TERM_TIME_SPAN + 2)
+
+    def test_closing_prices_and_averages_stay_bounded_under_max_ticks_and_compact(self):
+        for history in (TimeSeries(max_ticks=10), TimeSeries(compact=True)):
+            full, bounded = Stock("GOOG"), Stock("GOOG", history)
+            on_date = datetime(2000, 1, 3, 10)
+            for day in range(2000):
+                for hour in (0, 6):
+                    price = 100 + (day * 7 + hour) % 23
+                    full.update(on_date + timedelta(hours=hour), price)
+                    bounded.update(on_date + timedelta(hours=hour), price)
+                on_date += timedelta(days=1 + (day % 5 == 4) * 2)
+            with self.subTest(max_ticks=history.max_ticks, compact=history.compact):
+                self.assertLessEqual(len(history), 2 * history.retained_dates)
+                self.assertEqual(history.retained_dates, len(list(history.closing_prices())))
+                self.assertLessEqual(len(bounded.long_term_moving_average.values), 6 * history.retained_dates)
+                for days in range(Stock.LONG_TERM_TIME_SPAN):
+                    signal_date = on_date - timedelta(days=1 + days)
+                    self.assertEqual(full.get_crossover_signal(signal_date), bounded.get_crossover_signal(signal_date))
+
+    def test_crossover_signal_with_bounded_history_matches_full_history_over_weekends(self):
+        full = Stock("GOOG")
+        bounded = Stock("GOOG", TimeSeries(max_days=Stock.LONG_TERM_TIME_SPAN + 1, compact=True))
+        on_date = datetime(2014, 5, 5, 16)
+        for day in range(120):
+            if on_date.weekday() < 5:
+                price = 100 + (day * 7) % 23
+                full.update(on_date, price)
+                bounded.update(on_date, price)
+                self.assertEqual(full.get_crossover_signal(on_date).value, bounded.get_crossover_signal(on_date).value)
+            on_date += timedelta(days=1)
@@ -0,0 +1,66 @@
+import unittest
+from datetime import datetime
+from unittest import mock
+
+from stock import Stock
+
+from stock_alerter.alert import Alert
+from stock_alerter.rule import PriceRule, ThresholdRule
+from stock_alerter.threshold import ThresholdEngine, ThresholdIndex
+
+
+class ThresholdIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.index = ThresholdIndex()
+        self.entries = [self.entry(ThresholdRule("GOOG", "gt", threshold)) for threshold in range(10, 20)]
+        for entry in self.entries:
+            self.index.add(entry)
+
+    @staticmethod
+    def entry(rule):
+        return mock.Mock(rule=rule, value=False)
+
+    def test_only_rules_with_thresholds_between_the_prices_are_matched(self):
+        self.index.move(10.5)
+        with mock.patch.object(ThresholdRule, "holds", autospec=True, side_effect=ThresholdRule.holds) as holds:
+            changed = self.index.move(13.5)
+        self.assertEqual([11, 12, 13], [entry.rule.threshold for entry in changed])
+        self.assertEqual(3, holds.call_count)
+
+    def test_results_change_back_when_the_price_falls(self):
+        self.index.move(15.5)
+        changed = self.index.move(9)
+        self.assertEqual(list(range(10, 16)), [entry.rule.threshold for entry in changed])
+        self.assertFalse(any(entry.value for entry in self.entries))
+
+    def test_a_between_rule_changes_once_per_crossed_bound(self):
+        entry = self.entry(ThresholdRule("GOOG", "between", 12, 14))
+        self.index.add(entry)
+        self.index.move(11)
+        self.assertIn(entry, self.index.move(13))
+        self.assertNotIn(entry, self.index.move(13.5))
+        self.assertIn(entry, self.index.move(15))
+
+
+class ThresholdEngineTest(unittest.TestCase):
+    def setUp(self):
+        self.exchange = {"GOOG": Stock("GOOG")}
+        self.engine = ThresholdEngine(self.exchange)
+        self.action = mock.MagicMock()
+        self.engine.add(Alert("above 10", ThresholdRule("GOOG", "gt", 10), self.action))
+        self.engine.add(Alert("below 5", ThresholdRule("GOOG", "lt", 5), self.action))
+
+    def test_action_is_executed_when_the_rule_starts_matching(self):
+        self.exchange["GOOG"].update(datetime(2014, 2, 10), 11)
+        self.exchange["GOOG"].update(datetime(2014, 2, 11), 12)
+        self.action.execute.assert_called_once_with("above 10")
+
+    def test_action_is_executed_again_after_the_rule_stopped_matching(self):
+        for day, price in enumerate([11, 8, 4, 12], start=10):
+            self.exchange["GOOG"].update(datetime(2014, 2, day), price)
+        self.assertEqual([mock.call("above 10"), mock.call("below 5"), mock.call("above 10")],
+                         self.action.execute.call_args_list)
+
+    def test_alerts_without_a_threshold_rule_are_rejected(self):
+        alert = Alert("opaque", PriceRule("GOOG", lambda stock: stock.price > 10), self.action)
+        self.assertRaises(ValueError, self.engine.add, alert)
@@ -0,0 +1,47 @@
+import os
+import tempfile
+import unittest
+
+from stock_alerter.reader import FileReader
+from stock_alerter.tickfile import TickFileReader, convert
+
+
+class TickFileTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.csv_filename = os.path.join(directory, "updates.csv")
+        self.tick_filename = os.path.join(directory, "updates.ticks")
+        with open(self.csv_filename, "w") as fp:
+            fp.write("GOOG,2014-02-11T14:10:22.13,5\n"
+                     "AAPL,2014-02-11T00:00:00.0,8\n"
+                     "GOOG,2014-02-11T14:11:22.13,3\n")
+
+    def tearDown(self):
+        os.remove(self.csv_filename)
+        os.remove(self.tick_filename)
+        os.rmdir(os.path.dirname(self.csv_filename))
+
+    def test_converted_file_yields_the_same_updates(self):
+        self.assertEqual(3, convert(self.csv_filename, self.tick_filename))
+        self.assertEqual(list(FileReader(self.csv_filename).get_updates()),
+                         list(TickFileReader(self.tick_filename).get_updates()))
+
+    def test_updates_are_yielded_in_batches(self):
+        convert(self.csv_filename, self.tick_filename)
+        batches = list(TickFileReader(self.tick_filename).get_batches(batch_size=2))
+        self.assertEqual([2, 1], [len(batch) for batch in batches])
+
+    def test_tick_file_reader_skips_the_updates_before_its_offset(self):
+        convert(self.csv_filename, self.tick_filename)
+        self.assertEqual(list(FileReader(self.csv_filename, offset=2).get_updates()),
+                         list(TickFileReader(self.tick_filename, offset=2).get_updates()))
+
+    def test_a_negative_offset_throws_ValueError(self):
+        convert(self.csv_filename, self.tick_filename)
+        self.assertRaises(ValueError, TickFileReader, self.tick_filename, offset=-1)
+
+    def test_file_that_is_not_a_tick_file_throws_ValueError(self):
+        os.rename(self.csv_filename, self.tick_filename)
+        self.csv_filename = self.tick_filename + ".csv"
+        open(self.csv_filename, "w").close()
+        self.assertRaises(ValueError, list, TickFileReader(self.tick_filename).get_updates())
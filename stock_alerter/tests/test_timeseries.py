@@ -0,0 +1,127 @@
+import unittest
+from datetime import datetime, timedelta
+
+from stock_alerter.stock import Stock
+from stock_alerter.timeseries import ArrayTimeSeries, TimeSeries, Update
+
+
+class TimeSeriesClosingPriceTest(unittest.TestCase):
+    def setUp(self):
+        self.series = TimeSeries()
+        self.series.update(datetime(2014, 3, 10, 10, 0), 5)
+        self.series.update(datetime(2014, 3, 10, 15, 0), 7)
+        self.series.update(datetime(2014, 3, 12, 11, 0), 9)
+
+    def test_closing_price_is_the_last_update_of_the_date(self):
+        self.assertEqual(7, self.series.get_closing_price(datetime(2014, 3, 10)))
+
+    def test_closing_price_is_not_changed_by_an_earlier_update_on_the_same_date(self):
+        self.series.update(datetime(2014, 3, 10, 12, 0), 3)
+        self.assertEqual(7, self.series.get_closing_price(datetime(2014, 3, 10)))
+
+    def test_closing_price_falls_back_to_the_previous_date_with_updates(self):
+        self.assertEqual(7, self.series.get_closing_price(datetime(2014, 3, 11)))
+
+    def test_closing_price_after_a_long_gap_does_not_recurse(self):
+        self.assertEqual(9, self.series.get_closing_price(datetime(2030, 1, 1)))
+
+    def test_closing_price_before_the_first_update_throws_ValueError(self):
+        self.assertRaises(ValueError, self.series.get_closing_price, datetime(2014, 3, 9))
+
+
+class ArrayTimeSeriesTest(unittest.TestCase):
+    def setUp(self):
+        self.series = ArrayTimeSeries()
+        self.series.update(datetime(2014, 3, 10, 10, 0), 5)
+        self.series.update(datetime(2014, 3, 12, 11, 0), 9)
+        self.series.update(datetime(2014, 3, 10, 15, 0, 0, 250), 7)
+
+    def test_updates_are_kept_in_timestamp_order(self):
+        self.assertEqual([
+            Update(datetime(2014, 3, 10, 10, 0), 5),
+            Update(datetime(2014, 3, 10, 15, 0, 0, 250), 7),
+            Update(datetime(2014, 3, 12, 11, 0), 9)
+        ], self.series[:])
+
+    def test_last_update_is_the_latest(self):
+        self.assertEqual(Update(datetime(2014, 3, 12, 11, 0), 9), self.series[-1])
+
+    def test_closing_price_falls_back_to_the_previous_date_with_updates(self):
+        self.assertEqual(7, self.series.get_closing_price(datetime(2014, 3, 11)))
+
+    def test_stock_can_record_its_history_in_an_array_time_series(self):
+        stock = Stock("GOOG", ArrayTimeSeries())
+        stock.update(datetime(2014, 3, 10), 5)
+        self.assertEqual(5, stock.price)
+
+
+class TimeSeriesOrderingTest(unittest.TestCase):
+    def _check_out_of_order_updates_are_merged_in_order(self, series):
+        timestamps = [datetime(2014, 3, 10, 10, minute) for minute in (0, 5, 3, 9, 1, 7)]
+        for value, timestamp in enumerate(timestamps):
+            series.update(timestamp, value)
+        self.assertEqual(sorted(timestamps), [update.timestamp for update in series[:]])
+        self.assertEqual(len(timestamps), len(series))
+
+    def test_out_of_order_updates_are_merged_in_order(self):
+        self._check_out_of_order_updates_are_merged_in_order(TimeSeries())
+
+    def test_out_of_order_updates_are_merged_in_order_in_an_array_time_series(self):
+        self._check_out_of_order_updates_are_merged_in_order(ArrayTimeSeries())
+
+    def test_reorder_buffer_is_merged_when_full(self):
+        series = TimeSeries()
+        series.update(datetime(2014, 3, 11), 0)
+        for second in range(TimeSeries.REORDER_BUFFER_SIZE):
+            series.update(datetime(2014, 3, 10) + timedelta(seconds=second), second)
+        self.assertEqual([], series._pending)
+
+    def test_updates_with_equal_timestamps_keep_their_arrival_order(self):
+        series = TimeSeries()
+        series.update(datetime(2014, 3, 10, 10, 0), 9)
+        series.update(datetime(2014, 3, 10, 10, 0), 4)
+        self.assertEqual([9, 4], [update.value for update in series[:]])
+        self.assertEqual(4, series.get_closing_price(datetime(2014, 3, 10)))
+
+
+class TimeSeriesRetentionTest(unittest.TestCase):
+    def _update_every_hour(self, series, days):
+        for hour in range(days * 24):
+            series.update(datetime(2014, 3, 1) + timedelta(hours=hour), hour)
+
+    def test_at_most_half_as_many_again_as_max_ticks_are_kept(self):
+        series = TimeSeries(max_ticks=10)
+        self._update_every_hour(series, 3)
+        self.assertLessEqual(len(series), 15)
+        self.assertEqual(71, series[-1].value)
+
+    def test_only_max_days_of_closing_prices_are_kept(self):
+        series = TimeSeries(max_days=2)
+        self._update_every_hour(series, 5)
+        self.assertEqual(datetime(2014, 3, 3).date(), series.first_date)
+        self.assertEqual(datetime(2014, 3, 3), series[0].timestamp)
+        self.assertRaises(ValueError, series.get_closing_price, datetime(2014, 3, 2))
+
+    def test_the_latest_closing_price_before_the_max_days_window_is_kept(self):
+        series = TimeSeries(max_days=3)
+        for day in (3, 7, 8, 9, 10, 11, 14):
+            series.update(datetime(2014, 3, day, 16), day)
+        self.assertEqual(datetime(2014, 3, 11).date(), series.first_date)
+        self.assertEqual(11, series.get_closing_price(datetime(2014, 3, 12)))
+        self.assertFalse(series.has_sufficient_update_history(datetime(2014, 3, 14), 10))
+
+    def test_compacted_days_keep_only_their_closing_update(self):
+        series = ArrayTimeSeries(compact=True)
+        self._update_every_hour(series, 3)
+        self.assertEqual([23, 47] + list(range(48, 72)), [update.value for update in series[:]])
+        self.assertEqual(23, series.get_closing_price(datetime(2014, 3, 1)))
+
+
+class TimeSeriesExtendTest(unittest.TestCase):
+    def test_extended_updates_are_merged_in_order(self):
+        for series in (TimeSeries(), ArrayTimeSeries()):
+            series.update(datetime(2014, 3, 10, 12), 1)
+            series.extend([(datetime(2014, 3, 11), 4), (datetime(2014, 3, 10, 9), 2), (datetime(2014, 3, 10, 15), 3)])
+            self.assertEqual([2, 1, 3, 4], [update.value for update in series[:]])
+            self.assertEqual(3, series.get_closing_price(datetime(2014, 3, 10)))
+            self.assertEqual(4, series[-1].value)
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""Matching of many ThresholdRule alerts through per-symbol sorted threshold indexes.
+
+The result of a ThresholdRule only changes when the price of its stock crosses one of its thresholds. Each symbol keeps
+the thresholds of its rules in a sorted list, so a price move from p0 to p1 finds the rules whose result may have
+changed by bisecting the list for the thresholds between p0 and p1, whatever the number of rules on the symbol.
+
+"""
+import bisect
+import time
+
+from stock_alerter import metrics
+from stock_alerter.symbols import put
+
+
+class ThresholdIndex:
+    def __init__(self, price=None):
+        """The threshold rules of one symbol, sorted by threshold.
+
+        Args:
+            price: The current price of the symbol.
+
+        Attributes:
+            price: The price the rule results were last computed for.
+            thresholds (list): Every threshold of every rule, in ascending order.
+            entries (list): The entry of the rule each threshold belongs to, in the order of thresholds.
+
+        """
+        self.price = price
+        self.thresholds = []
+        self.entries = []
+
+    def add(self, entry):
+        """Indexes the rule of an entry and computes its result for the current price.
+
+        Args:
+            entry: The entry being indexed, holding an alert, its rule and the rule's result.
+
+        """
+        entry.value = entry.rule.holds(self.price)
+        for threshold in entry.rule.boundaries():
+            index = bisect.bisect_right(self.thresholds, threshold)
+            self.thresholds.insert(index, threshold)
+            self.entries.insert(index, entry)
+
+    def move(self, price):
+        """Moves the index to a new price.
+
+        Args:
+            price: The new price of the symbol.
+
+        Returns:
+            The entries whose rule result changed, with their new result in their value attribute.
+
+        """
+        previous = self.price
+        self.price = price
+        if not previous or not price:
+            candidates = self.entries
+        else:
+            low, high = (previous, price) if previous <= price else (price, previous)
+            candidates = self.entries[bisect.bisect_left(self.thresholds, low):
+                                      bisect.bisect_right(self.thresholds, high)]
+        changed = []
+        for entry in candidates:
+            value = entry.rule.holds(price)
+            if value != entry.value:
+                entry.value = value
+                changed.append(entry)
+        return changed
+
+
+class ThresholdEngine:
+    def __init__(self, exchange):
+        """Evaluates many alerts on ThresholdRules, matching only the rules whose thresholds a price move crossed.
+
+        Alert.trigger is only called for the alerts whose rule result changed, rather than on each update, since finding
+        every matching rule would take as long as checking them all. The action of an alert is therefore executed when
+        its rule starts matching whatever its mode, and its cooldown and limiter still apply.
+
+        Args:
+            exchange: The list of stocks.
+
+        Attributes:
+            exchange: The list of stocks.
+            alerts (list): The alerts added to the engine.
+            indexes (dict): The ThresholdIndex of each symbol, which updates look up by symbol ID.
+
+        """
+        self.exchange = exchange
+        self.alerts = []
+        self.indexes = {}
+        self._indexes_by_id = []
+
+    def add(self, alert):
+        """Adds an alert, connecting the engine to the update_event of its stock.
+
+        Args:
+            alert (Alert): The alert being added.
+
+        Raises:
+            ValueError: If the rule of the alert is not a ThresholdRule.
+
+        """
+        if not hasattr(alert.rule, "boundaries"):
+            raise ValueError("{} does not have a threshold rule".format(alert.description))
+        symbol = alert.rule.symbol
+        index = self.indexes.get(symbol)
+        if index is None:
+            stock = self.exchange[symbol]
+            index = self.indexes[symbol] = ThresholdIndex(stock.price)
+            put(self._indexes_by_id, stock.symbol_id, index)
+            stock.update_event.connect(self.on_update)
+        index.add(_ThresholdEntry(alert))
+        self.alerts.append(alert)
+
+    def symbol_groups(self):
+        """Returns the sets of symbols whose stocks the engine reads together, one per alert.
+
+        """
+        return [alert.rule.depends_on() for alert in self.alerts]
+
+    def on_update(self, stock):
+        """Finds the rules on an updated stock that started matching and executes the actions of their alerts.
+
+        Args:
+            stock (Stock): The updated stock.
+
+        """
+        collector = metrics.collector
+        if collector is None:
+            self._evaluate(stock)
+            return
+        start = time.perf_counter()
+        self._evaluate_measured(stock, collector)
+        collector.observe("threshold.on_update", time.perf_counter() - start)
+
+    def _evaluate(self, stock):
+        for entry in self._indexes_by_id[stock.symbol_id].move(stock.price):
+            entry.alert.trigger(entry.value)
+
+    def _evaluate_measured(self, stock, collector):
+        """Evaluates like _evaluate, reporting the index move, and each alert with its action, to the collector.
+
+        The index move matches the rules of every alert whose thresholds the price crossed, and is reported as one
+        rule.matches observation.
+
+        """
+        start = time.perf_counter()
+        changed = self._indexes_by_id[stock.symbol_id].move(stock.price)
+        collector.observe("rule.matches", time.perf_counter() - start)
+        for entry in changed:
+            start = time.perf_counter()
+            executed = entry.alert.trigger(entry.value)
+            elapsed = time.perf_counter() - start
+            if executed:
+                collector.observe("action.execute", elapsed)
+            collector.observe_alert(entry.alert.description, elapsed)
+
+
+class _ThresholdEntry:
+    __slots__ = ("alert", "rule", "value")
+
+    def __init__(self, alert):
+        self.alert = alert
+        self.rule = alert.rule
+        self.value = False
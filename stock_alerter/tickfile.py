@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""Compact binary tick files.
+
+A tick file holds the updates of a feed so that it can be replayed without parsing text. It starts with a header giving
+the number of records and the offset of the symbol table. Fixed-width records follow, each made of a symbol id, a
+timestamp in epoch microseconds and a price. The symbol table at the end lists every symbol, in id order. All values are
+little-endian.
+
+"""
+import mmap
+import struct
+import sys
+
+from stock_alerter.reader import FileReader
+from stock_alerter.timeseries import from_epoch_microseconds, to_epoch_microseconds
+
+MAGIC = b"STKT"
+VERSION = 1
+HEADER = struct.Struct("<4sHHQQ")
+RECORD = struct.Struct("<Iqd")
+SYMBOL_LENGTH = struct.Struct("<H")
+
+
+def convert(csv_filename, tick_filename):
+    """Converts a feed in the FileReader csv format to a tick file.
+
+    Args:
+        csv_filename (str): The name of the csv file to read.
+        tick_filename (str): The name of the tick file to write.
+
+    Returns:
+        The number of records written.
+
+    """
+    symbol_ids = {}
+    count = 0
+    with open(tick_filename, "wb") as fp:
+        fp.write(HEADER.pack(MAGIC, VERSION, 0, 0, 0))
+        for symbol, timestamp, price in FileReader(csv_filename).get_updates():
+            symbol_id = symbol_ids.get(symbol)
+            if symbol_id is None:
+                symbol_id = symbol_ids[symbol] = len(symbol_ids)
+            fp.write(RECORD.pack(symbol_id, to_epoch_microseconds(timestamp), price))
+            count += 1
+        symbol_table_offset = fp.tell()
+        for symbol in symbol_ids:
+            encoded = symbol.encode()
+            fp.write(SYMBOL_LENGTH.pack(len(encoded)))
+            fp.write(encoded)
+        fp.seek(0)
+        fp.write(HEADER.pack(MAGIC, VERSION, 0, count, symbol_table_offset))
+    return count
+
+
+class TickFileReader:
+    BATCH_SIZE = 10000
+
+    def __init__(self, filename, offset=0):
+        """A reader using a tick file source from where stock updates are coming.
+
+        The file is memory-mapped and its records are unpacked straight from the mapping, so nothing is parsed or
+        copied ahead of the updates being yielded, and an offset is skipped in O(1). Prices are yielded as floats.
+
+        Args:
+            filename (str): The name of the tick file containing the stock updates.
+            offset (int): The number of updates to skip, such as those already applied before a snapshot.
+
+        Raises:
+            ValueError: If offset is negative.
+
+        """
+        if offset < 0:
+            raise ValueError("offset should not be negative")
+        self.filename = filename
+        self.offset = offset
+
+    def get_updates(self):
+        """A generator returning each stock update from the tick file.
+
+        """
+        for batch in self.get_batches():
+            yield from batch
+
+    def get_batches(self, batch_size=None):
+        """A generator returning the stock updates from the tick file in lists of up to batch_size updates.
+
+        Args:
+            batch_size (Optional[int]): The number of updates per list. Defaults to BATCH_SIZE.
+
+        Raises:
+            ValueError: If the file is not a tick file.
+
+        """
+        batch_size = batch_size or self.BATCH_SIZE
+        with open(self.filename, "rb") as fp, mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as mapping:
+            if len(mapping) < HEADER.size:
+                raise ValueError("{} is not a version {} tick file".format(self.filename, VERSION))
+            magic, version, _, count, symbol_table_offset = HEADER.unpack_from(mapping)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError("{} is not a version {} tick file".format(self.filename, VERSION))
+            symbols = self._read_symbols(mapping, symbol_table_offset)
+            start = HEADER.size + min(self.offset, count) * RECORD.size
+            end = HEADER.size + count * RECORD.size
+            while start < end:
+                stop = min(start + batch_size * RECORD.size, end)
+                with memoryview(mapping)[start:stop] as records:
+                    batch = [(symbols[symbol_id], from_epoch_microseconds(timestamp), price)
+                             for symbol_id, timestamp, price in RECORD.iter_unpack(records)]
+                yield batch
+                start = stop
+
+    @staticmethod
+    def _read_symbols(mapping, offset):
+        symbols = []
+        while offset < len(mapping):
+            length, = SYMBOL_LENGTH.unpack_from(mapping, offset)
+            offset += SYMBOL_LENGTH.size
+            symbols.append(sys.intern(mapping[offset:offset + length].decode()))
+            offset += length
+        return symbols
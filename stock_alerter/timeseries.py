@@ -1,23 +1,119 @@
 import bisect
 import collections
-
-from datetime import timedelta
+import heapq
+import operator
+from array import array
+from datetime import datetime, timedelta
 
 Update = collections.namedtuple("Update", ["timestamp", "value"])
 
+TIMESTAMP_KEY = operator.attrgetter("timestamp")
+
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+ONE_DAY = timedelta(days=1)
+
+
+def to_epoch_microseconds(timestamp):
+    """Converts a naive timestamp to whole microseconds since the epoch.
+
+    """
+    return (timestamp - EPOCH) // MICROSECOND
+
+
+def from_epoch_microseconds(microseconds):
+    """Converts whole microseconds since the epoch back to a naive timestamp.
+
+    """
+    return EPOCH + timedelta(microseconds=microseconds)
+
 
 class TimeSeries:
-    def __init__(self):
+    REORDER_BUFFER_SIZE = 64
+    RETAINED_DATES = 31
+
+    def __init__(self, max_ticks=None, max_days=None, compact=False):
         """An object that manages TimeSeries that include a timestamp and value.
 
+        Updates are ordered by timestamp, and updates sharing a timestamp keep their arrival order. An update at or
+        after the latest timestamp is appended in amortized O(1). An earlier update is held in a reorder buffer of at
+        most REORDER_BUFFER_SIZE updates, which is merged into the series when it fills up or when the series is
+        read. Merging k buffered updates costs O(k log k + m), where m is the number of updates newer than the oldest
+        buffered one, so a feed that is in order or only slightly out of order is ingested in linear time.
+
+        Alongside the chronological record of updates, a per-date index of closing updates is kept so that closing
+        prices are found without scanning the series.
+
+        Every update is kept unless a retention policy bounds the series. With max_ticks, at least the latest max_ticks
+        updates are kept and older ones are trimmed in batches. With max_days, only the updates and closing prices of
+        the newest date and the max_days dates before it are kept, along with the latest closing price before them,
+        which dates without updates at the start of the window carry forward. Older updates are ignored. With compact,
+        the updates of a day are replaced by its closing update once an update for a later day arrives. A closing price
+        stays available for as long as its date is kept, even once its updates are trimmed or compacted. With max_ticks
+        or compact but no max_days, the closing prices of the newest retained_dates dates with updates are kept, and
+        with compact the updates of older dates are dropped too, so a bounded series never grows with its lifetime.
+
+        Args:
+            max_ticks (Optional[int]): The number of latest updates to keep.
+            max_days (Optional[int]): The number of days before the newest date to keep.
+            compact (bool): Whether to compact the updates of past days into their closing updates.
+
         Attributes:
             series (Update): The chronological record of updates to the instance.
+            max_ticks (Optional[int]): The number of latest updates to keep.
+            max_days (Optional[int]): The number of days before the newest date to keep.
+            compact (bool): Whether to compact the updates of past days into their closing updates.
+            retained_dates (int): The number of dates whose closing prices are kept without max_days. Defaults to
+                RETAINED_DATES.
+
+        """
+        self.max_ticks = max_ticks
+        self.max_days = max_days
+        self.compact = compact
+        self.retained_dates = self.RETAINED_DATES
+        self._init_storage()
+        self._pending = []
+        self._last_timestamp = None
+        self._closing_updates = {}
+        self._closing_dates = []
+        self._first_update_date = None
+
+    def _init_storage(self):
+        self._updates = []
+
+    @property
+    def series(self):
+        """Returns the chronological record of updates, merging in the reorder buffer first.
+
+        """
+        if self._pending:
+            self._flush()
+        return self._updates
+
+    @property
+    def bounded(self):
+        """Returns whether a retention policy bounds the series.
 
         """
-        self.series = []
+        return self.max_ticks is not None or self.max_days is not None or self.compact
+
+    @property
+    def first_date(self):
+        """Returns the earliest date with a closing price still kept.
+
+        Raises:
+            IndexError: If there have not been any updates.
+
+        """
+        return self._closing_dates[0]
 
     def __getitem__(self, index):
-        return self.series[index]
+        if self._pending:
+            self._flush()
+        return self._updates[index]
+
+    def __len__(self):
+        return len(self._updates) + len(self._pending)
 
     def update(self, timestamp, value):
         """Updates the TimeSeries instance's series with a new entry.
@@ -27,33 +123,273 @@ class TimeSeries:
             value (int) The value of the update.
 
         """
-        bisect.insort_left(self.series, Update(timestamp, value))
+        if (self.max_days is not None and self._closing_dates and
+                timestamp.date() < self._closing_dates[-1] - timedelta(days=self.max_days)):
+            return
+        update = Update(timestamp, value)
+        last_timestamp = self._last_timestamp
+        if last_timestamp is None or timestamp >= last_timestamp:
+            if self.compact and last_timestamp is not None and timestamp.date() != last_timestamp.date():
+                self._compact(last_timestamp.date())
+            self._append(update)
+            self._last_timestamp = timestamp
+            if self.max_ticks is not None:
+                stored = len(self) - len(self._pending)
+                if stored > self.max_ticks + max(self.max_ticks // 2, 1):
+                    self._delete(0, stored - self.max_ticks)
+        else:
+            self._pending.append(update)
+            if len(self._pending) >= self.REORDER_BUFFER_SIZE:
+                self._flush()
+        self._index_closing_update(update)
+
+    def extend(self, updates):
+        """Updates the TimeSeries instance's series with several entries at once.
+
+        The entries are sorted once and then appended, or merged into the series in a single pass if any of them is
+        earlier than the latest timestamp. A series with a retention policy applies them one by one, in order.
+
+        Args:
+            updates: The (timestamp, value) pairs of the entries.
+
+        """
+        updates = sorted(map(Update._make, updates), key=TIMESTAMP_KEY)
+        if not updates:
+            return
+        if self.bounded:
+            for update in updates:
+                self.update(*update)
+            return
+        last_timestamp = self._last_timestamp
+        if last_timestamp is None or updates[0].timestamp >= last_timestamp:
+            self._extend(updates)
+            self._last_timestamp = updates[-1].timestamp
+        else:
+            self._pending.extend(updates)
+            self._flush()
+            self._last_timestamp = max(last_timestamp, updates[-1].timestamp)
+        for update in updates:
+            self._index_closing_update(update)
+
+    def _compact(self, on_date):
+        """Replaces the stored updates of on_date, which must be the newest date stored, by its closing update.
+
+        """
+        if self._pending:
+            self._flush()
+        stored = len(self)
+        count = 0
+        while count < stored and self[-1 - count].timestamp.date() == on_date:
+            count += 1
+        if count > 1:
+            self._delete(stored - count, stored - 1)
+
+    def _retain_days(self):
+        """Drops the closing prices and updates of the dates older than max_days before the newest date.
+
+        The latest closing price on or before the cutoff is kept as the one carried forward into the window.
+
+        """
+        dates = self._closing_dates
+        cutoff = dates[-1] - timedelta(days=self.max_days)
+        expired = bisect.bisect_right(dates, cutoff) - 1
+        if expired <= 0:
+            return
+        for on_date in dates[:expired]:
+            del self._closing_updates[on_date]
+        del dates[:expired]
+        if self._pending:
+            self._flush()
+        count = 0
+        stored = len(self)
+        while count < stored and self[count].timestamp.date() < cutoff:
+            count += 1
+        self._delete(0, count)
+
+    def _retain_dates(self):
+        """Drops the closing prices of the dates before the newest retained_dates, and with compact their updates.
+
+        """
+        dates = self._closing_dates
+        expired = len(dates) - self.retained_dates
+        if expired <= 0:
+            return
+        for on_date in dates[:expired]:
+            del self._closing_updates[on_date]
+        del dates[:expired]
+        if not self.compact:
+            return
+        if self._pending:
+            self._flush()
+        count = 0
+        stored = len(self)
+        while count < stored and self[count].timestamp.date() < dates[0]:
+            count += 1
+        self._delete(0, count)
+
+    def _flush(self):
+        """Merges the reorder buffer into the series.
+
+        """
+        pending = sorted(self._pending, key=TIMESTAMP_KEY)
+        self._pending = []
+        self._merge(pending)
+
+    def _append(self, update):
+        self._updates.append(update)
+
+    def _extend(self, updates):
+        self._updates.extend(updates)
+
+    def _delete(self, start, stop):
+        del self._updates[start:stop]
+
+    def _merge(self, pending):
+        updates = self._updates
+        position = len(updates)
+        oldest_timestamp = pending[0].timestamp
+        while position and updates[position - 1].timestamp > oldest_timestamp:
+            position -= 1
+        updates[position:] = heapq.merge(updates[position:], pending, key=TIMESTAMP_KEY)
+
+    def _index_closing_update(self, update):
+        """Records an update in the closing price index if it is the latest update of its date.
+
+        Args:
+            update (Update): The update being indexed.
+
+        """
+        on_date = update.timestamp.date()
+        closing_update = self._closing_updates.get(on_date)
+        if closing_update is None:
+            bisect.insort(self._closing_dates, on_date)
+            if self._first_update_date is None or on_date < self._first_update_date:
+                self._first_update_date = on_date
+            self._closing_updates[on_date] = update
+            if self.max_days is not None:
+                self._retain_days()
+            elif self.max_ticks is not None or self.compact:
+                self._retain_dates()
+        elif update.timestamp >= closing_update.timestamp:
+            self._closing_updates[on_date] = update
 
     def get_closing_price(self, on_date):
         """Returns a given dates closing price.
 
-        This is the stock's last price from an update on the date or the closing price for the previous day if an
-        update has not occurred.
+        This is the stock's last price from an update on the date or the closing price of the most recent earlier date
+        with an update if an update has not occurred. Lookups use the closing price index, so an exact date costs O(1)
+        and an earlier date costs O(log d) for d dates with updates.
 
         Args:
             on_date (datetime.datetime): The on_date being checked for a closing price.
 
         Raises:
-            ValueError: If stock has not had any updates.
+            ValueError: If stock has not had any updates, or none on or before on_date.
 
         Returns:
-            Closing price if it exists, executes self.closing_price(previous day) if not.
+            Closing price on on_date if it exists, the closing price of the most recent earlier date if not.
 
         """
-        if self.series:
-            date_history = [update for update in self.series if update.timestamp.date() == on_date.date()]
-            return date_history[-1].value if date_history else self.get_closing_price(on_date - timedelta(days=1))
-        else:
+        if not self._closing_dates:
             raise ValueError("stock has not had any updates")
+        date = on_date.date()
+        closing_update = self._closing_updates.get(date)
+        if closing_update is None:
+            position = bisect.bisect_right(self._closing_dates, date)
+            if position == 0:
+                raise ValueError("stock has not had any updates on or before {}".format(date))
+            closing_update = self._closing_updates[self._closing_dates[position - 1]]
+        return closing_update.value
+
+    def closing_prices(self):
+        """A generator returning the closing price of every date with updates, in date order.
+
+        """
+        for on_date in self._closing_dates:
+            yield on_date, self._closing_updates[on_date].value
+
+    def daily_closing_prices(self, start_date, end_date):
+        """Returns the closing price of every calendar day from start_date to end_date inclusive.
+
+        Days without updates carry the previous closing price forward, as get_closing_price does. Costs O(log d) to find
+        start_date plus O(1) per day returned.
+
+        Args:
+            start_date (datetime.date): The first day.
+            end_date (datetime.date): The last day.
+
+        Raises:
+            ValueError: If stock has not had any updates on or before start_date.
+
+        Returns:
+            A list with one closing price per day.
+
+        """
+        dates = self._closing_dates
+        position = bisect.bisect_right(dates, start_date)
+        if position == 0:
+            raise ValueError("stock has not had any updates on or before {}".format(start_date))
+        closing_price = self._closing_updates[dates[position - 1]].value
+        closing_prices = []
+        on_date = start_date
+        while on_date <= end_date:
+            if position < len(dates) and dates[position] == on_date:
+                closing_price = self._closing_updates[on_date].value
+                position += 1
+            closing_prices.append(closing_price)
+            on_date += ONE_DAY
+        return closing_prices
+
+    def to_arrays(self):
+        """Returns the updates and the closing updates as typed arrays, for bulk storage.
+
+        Returns:
+            The timestamps of the updates in epoch microseconds, their values, the timestamps of the closing updates in
+            date order and their values, as array('q'), array('d'), array('q') and array('d').
+
+        """
+        timestamps, values = self._stored_arrays()
+        closing_updates = [self._closing_updates[on_date] for on_date in self._closing_dates]
+        return (timestamps, values, array("q", [to_epoch_microseconds(update.timestamp) for update in closing_updates]),
+                array("d", [update.value for update in closing_updates]))
+
+    def load_arrays(self, timestamps, values, closing_timestamps, closing_values):
+        """Replaces the updates and the closing updates by those of typed arrays, as returned by to_arrays.
+
+        Values are loaded as floats. The retention policy is not applied to the loaded updates.
+
+        Args:
+            timestamps (array.array): The timestamps of the updates, in epoch microseconds and chronological order.
+            values (array.array): The values of the updates.
+            closing_timestamps (array.array): The timestamps of the closing updates, in epoch microseconds and date
+                order.
+            closing_values (array.array): The values of the closing updates.
+
+        """
+        self._init_storage()
+        self._load(timestamps, values)
+        self._pending = []
+        self._last_timestamp = from_epoch_microseconds(timestamps[-1]) if timestamps else None
+        closing_updates = [Update(from_epoch_microseconds(timestamp), value)
+                           for timestamp, value in zip(closing_timestamps, closing_values)]
+        self._closing_updates = {update.timestamp.date(): update for update in closing_updates}
+        self._closing_dates = [update.timestamp.date() for update in closing_updates]
+        self._first_update_date = self._closing_dates[0] if self._closing_dates else None
+
+    def _stored_arrays(self):
+        updates = self.series
+        return (array("q", [to_epoch_microseconds(update.timestamp) for update in updates]),
+                array("d", [update.value for update in updates]))
+
+    def _load(self, timestamps, values):
+        self._updates = [Update(from_epoch_microseconds(timestamp), value)
+                         for timestamp, value in zip(timestamps, values)]
 
     def has_sufficient_update_history(self, on_date, num_of_days):
         """Checks for sufficient update history data from a given date backwards with a given number of days.
 
+        The check is against the earliest date ever updated, so dates dropped by max_days still count as history.
+
         Args:
             on_date (datetime.datetime): The date on which the cross over signal is to be checked.
             num_of_days (int): The number of days of history.
@@ -61,6 +397,92 @@ class TimeSeries:
         Returns:
             True if there is sufficient data, False if not.
 
+        Raises:
+            IndexError: If there have not been any updates.
+
         """
+        if self._first_update_date is None:
+            raise IndexError("series has not had any updates")
         earliest_date = on_date.date() - timedelta(days=num_of_days)
-        return earliest_date < self.series[0].timestamp.date()
+        return earliest_date < self._first_update_date
+
+
+class ArrayTimeSeries(TimeSeries):
+    def __init__(self, max_ticks=None, max_days=None, compact=False):
+        """A TimeSeries storing its updates in parallel typed arrays instead of a list of Update tuples.
+
+        Timestamps are held as int64 microseconds since the epoch and values as float64, which takes 16 bytes per
+        update. Ordering, the reorder buffer, retention and their complexity are the same as for TimeSeries. Indexing
+        rebuilds Update tuples on demand, so the object can stand in for a TimeSeries anywhere. Timestamps must be
+        naive.
+
+        Args:
+            max_ticks (Optional[int]): The number of latest updates to keep.
+            max_days (Optional[int]): The number of days before the newest date to keep.
+            compact (bool): Whether to compact the updates of past days into their closing updates.
+
+        Attributes:
+            timestamps (array.array): The timestamps of the updates, in epoch microseconds.
+            values (array.array): The values of the updates.
+
+        """
+        super().__init__(max_ticks, max_days, compact)
+
+    def _init_storage(self):
+        self.timestamps = array("q")
+        self.values = array("d")
+
+    @property
+    def series(self):
+        """Returns the chronological record of updates as a list of Update tuples.
+
+        """
+        return self[:]
+
+    def __getitem__(self, index):
+        if self._pending:
+            self._flush()
+        if isinstance(index, slice):
+            return [Update(from_epoch_microseconds(timestamp), value)
+                    for timestamp, value in zip(self.timestamps[index], self.values[index])]
+        return Update(from_epoch_microseconds(self.timestamps[index]), self.values[index])
+
+    def __len__(self):
+        return len(self.timestamps) + len(self._pending)
+
+    def _stored_arrays(self):
+        if self._pending:
+            self._flush()
+        return array("q", self.timestamps), array("d", self.values)
+
+    def _load(self, timestamps, values):
+        self.timestamps = array("q", timestamps)
+        self.values = array("d", values)
+
+    def _append(self, update):
+        self.timestamps.append(to_epoch_microseconds(update.timestamp))
+        self.values.append(update.value)
+
+    def _extend(self, updates):
+        self.timestamps.extend(to_epoch_microseconds(update.timestamp) for update in updates)
+        self.values.extend(update.value for update in updates)
+
+    def _delete(self, start, stop):
+        del self.timestamps[start:stop]
+        del self.values[start:stop]
+
+    def _merge(self, pending):
+        timestamps = self.timestamps
+        position = len(timestamps)
+        oldest_timestamp = to_epoch_microseconds(pending[0].timestamp)
+        while position and timestamps[position - 1] > oldest_timestamp:
+            position -= 1
+        merged = list(heapq.merge(
+            zip(timestamps[position:], self.values[position:]),
+            ((to_epoch_microseconds(update.timestamp), update.value) for update in pending),
+            key=operator.itemgetter(0)
+        ))
+        del timestamps[position:]
+        del self.values[position:]
+        timestamps.extend(timestamp for timestamp, _ in merged)
+        self.values.extend(value for _, value in merged)